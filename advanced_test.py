@@ -2,7 +2,6 @@
 """
 Advanced test script for Flutter app interaction
 """
-import time
 import os
 from selenium import webdriver
 from selenium.webdriver.common.by import By
@@ -12,6 +11,9 @@ from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
+from test_config import TestConfig
+from flutter_idle import wait_for_flutter_app, wait_for_flutter_idle
+from semantics_snapshot import SemanticsSnapshot
 
 def advanced_test():
     """Run advanced tests of the Flutter application"""
@@ -27,7 +29,8 @@ def advanced_test():
     options.add_argument("--disable-logging")
     options.add_argument("--disable-web-security")
     options.add_argument("--allow-running-insecure-content")
-    options.add_argument("--remote-debugging-port=9222")
+    TestConfig.apply_worker_isolation(options)
+    TestConfig.apply_asset_proxy(options)
     options.add_argument("--window-size=1920,1080")
     
     # Set Chrome binary location
@@ -38,7 +41,7 @@ def advanced_test():
     driver = None
     try:
         print("Creating Chrome driver...")
-        driver = webdriver.Chrome(options=options)
+        driver = webdriver.Chrome(service=Service(TestConfig.get_chromedriver_path()), options=options)
         print("SUCCESS: Chrome driver created")
         
         # Navigate to the app
@@ -47,7 +50,11 @@ def advanced_test():
         
         # Wait for Flutter app to load
         print("Waiting for Flutter app to load...")
-        time.sleep(20)  # Give plenty of time for Flutter to initialize
+        waited = wait_for_flutter_app(driver)
+        if waited is not None:
+            print(f"Flutter app settled after {waited:.2f}s")
+        else:
+            print("WARNING: Flutter app did not mount in time")
         
         # Test 1: Check if app loaded
         print("\n--- Test 1: App Loading ---")
@@ -60,41 +67,40 @@ def advanced_test():
             print("ERROR: Flutter app failed to load")
             return False
         
+        # One round trip for the whole semantics tree; lookups below are local
+        SemanticsSnapshot.enable_semantics(driver)
+        wait_for_flutter_idle(driver)
+        snapshot = SemanticsSnapshot(driver).capture()
+        
         # Test 2: Look for main navigation elements
         print("\n--- Test 2: Navigation Elements ---")
-        nav_selectors = [
-            "//*[contains(text(), 'Sugar Records')]",
-            "//*[contains(text(), 'Inventory')]",
-            "//*[contains(text(), 'Suppliers')]",
-            "//*[contains(text(), 'Generate Insight')]",
-            "//*[contains(text(), 'View Insights')]",
-            "//*[contains(text(), 'Settings')]"
+        nav_labels = [
+            "Sugar Records",
+            "Inventory",
+            "Suppliers",
+            "Generate Insight",
+            "View Insights",
+            "Settings"
         ]
         
         found_nav = 0
-        for selector in nav_selectors:
-            try:
-                elements = driver.find_elements(By.XPATH, selector)
-                if elements:
-                    found_nav += 1
-                    element_name = selector.split("'")[1] if "'" in selector else "element"
-                    print(f"SUCCESS: Found '{element_name}'")
-                else:
-                    element_name = selector.split("'")[1] if "'" in selector else "element"
-                    print(f"WARNING: Not found '{element_name}'")
-            except Exception as e:
-                print(f"ERROR: Error finding element: {e}")
-        
-        print(f"Navigation Summary: {found_nav}/{len(nav_selectors)} elements found")
+        for label in nav_labels:
+            if snapshot.find_containing(label):
+                found_nav += 1
+                print(f"SUCCESS: Found '{label}'")
+            else:
+                print(f"WARNING: Not found '{label}'")
+        
+        print(f"Navigation Summary: {found_nav}/{len(nav_labels)} elements found")
         
         # Test 3: Try to click on Sugar Records
         print("\n--- Test 3: Sugar Records Navigation ---")
         try:
-            sugar_records = driver.find_element(By.XPATH, "//*[contains(text(), 'Sugar Records')]")
-            driver.execute_script("arguments[0].scrollIntoView(true);", sugar_records)
-            time.sleep(2)
-            sugar_records.click()
-            time.sleep(3)
+            sugar_records = snapshot.find_containing("Sugar Records")
+            if not sugar_records or not snapshot.click(sugar_records[0]):
+                raise RuntimeError("Sugar Records not found")
+            wait_for_flutter_idle(driver)
+            snapshot.refresh()
             print("SUCCESS: Clicked on Sugar Records")
             
             # Check if we're on the Sugar Records page
@@ -110,12 +116,13 @@ def advanced_test():
         # Test 4: Try to find and click Add button
         print("\n--- Test 4: Add Button Test ---")
         try:
-            add_buttons = driver.find_elements(By.XPATH, "//*[contains(text(), 'Add') or contains(text(), '+')]")
+            add_buttons = snapshot.find_containing("Add") + snapshot.find_containing("+")
             if add_buttons:
                 print(f"SUCCESS: Found {len(add_buttons)} Add buttons")
                 # Try to click the first Add button
-                add_buttons[0].click()
-                time.sleep(2)
+                snapshot.click(add_buttons[0])
+                wait_for_flutter_idle(driver)
+                snapshot.refresh()
                 print("SUCCESS: Clicked Add button")
             else:
                 print("WARNING: No Add buttons found")
@@ -144,7 +151,7 @@ def advanced_test():
         # Test 6: Check for notification elements
         print("\n--- Test 6: Notification System Test ---")
         try:
-            notification_elements = driver.find_elements(By.XPATH, "//*[contains(@class, 'notification') or contains(text(), 'notification') or contains(text(), 'alert')]")
+            notification_elements = snapshot.find_containing("notification") + snapshot.find_containing("alert")
             if notification_elements:
                 print(f"SUCCESS: Found {len(notification_elements)} notification elements")
             else:
@@ -0,0 +1,345 @@
+"""
+Flutter web app lifecycle for testing: static build server and live flutter run
+"""
+import argparse
+import collections
+import functools
+import gzip
+import hashlib
+import os
+import re
+import shutil
+import subprocess
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from build_cache import CACHE_DIR
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+APP_PORT = 3000
+BUILD_DIR = Path("build/web")
+FLUTTER_LOG = Path("reports/flutter_run.log")
+# Counted against the build cache's size cap and evicted with it
+COMPRESSED_CACHE_DIR = CACHE_DIR / "compressed"
+# Skip files too small to be worth it and variants that barely shrink (PNG, WOFF2)
+MIN_COMPRESS_SIZE = 1024
+MIN_COMPRESS_RATIO = 0.9
+RANGE_HEADER = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+def dart_define_args(defines):
+    """--dart-define flags for `flutter run` / `flutter build web` (e.g. SUPABASE_URL)"""
+    return [f"--dart-define={key}={value}" for key, value in sorted((defines or {}).items())]
+
+def wait_until_ready(url, timeout=180, interval=0.1):
+    """Poll url until it answers with a 2xx; returns seconds waited or None on timeout"""
+    start = time.monotonic()
+    while time.monotonic() - start < timeout:
+        try:
+            with urllib.request.urlopen(url, timeout=2) as response:
+                if 200 <= response.status < 300:
+                    return time.monotonic() - start
+        except (urllib.error.URLError, ConnectionError, OSError):
+            pass
+        time.sleep(interval)
+    return None
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    """Static file handler that keeps request logs out of the test output"""
+
+    def log_message(self, format, *args):
+        pass
+
+def _compress(encoding, data):
+    if encoding == "br":
+        return brotli.compress(data, quality=11)
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+class PrecompressedAssets:
+    """brotli/gzip variants of every file under a directory, cached by content hash"""
+
+    ENCODINGS = ("br", "gzip")
+    SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+    def __init__(self, directory, cache_dir=COMPRESSED_CACHE_DIR, workers=None):
+        self.directory = Path(directory)
+        self.cache_dir = Path(cache_dir)
+        self.workers = workers
+        self.files = {}
+
+    @property
+    def encodings(self):
+        return [e for e in self.ENCODINGS if e != "br" or brotli]
+
+    def build(self):
+        """Hash and compress everything once; unchanged files reuse their cached variants"""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        paths = [p for p in self.directory.rglob("*") if p.is_file()]
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for path, entry in zip(paths, pool.map(self._prepare, paths)):
+                self.files[os.path.realpath(path)] = entry
+        return self
+
+    def _prepare(self, path):
+        data = path.read_bytes()
+        digest = hashlib.sha256(data).hexdigest()
+        entry = {"sha256": digest, "size": len(data), "variants": {}}
+        if len(data) < MIN_COMPRESS_SIZE:
+            return entry
+
+        for encoding in self.encodings:
+            variant = self.cache_dir / f"{digest}{self.SUFFIXES[encoding]}"
+            skipped = variant.with_suffix(variant.suffix + ".skip")
+            if skipped.exists():
+                skipped.touch()  # mtime is last use, for the build cache's LRU eviction
+                continue
+            if variant.exists():
+                variant.touch()
+            else:
+                compressed = _compress(encoding, data)
+                if len(compressed) > len(data) * MIN_COMPRESS_RATIO:
+                    skipped.touch()
+                    continue
+                # Identical files compress in parallel; give each writer its own temp name
+                tmp = variant.with_name(f"{variant.name}.{threading.get_ident()}.tmp")
+                tmp.write_bytes(compressed)
+                os.replace(tmp, variant)
+            entry["variants"][encoding] = (variant, variant.stat().st_size)
+        return entry
+
+    def lookup(self, path):
+        return self.files.get(os.path.realpath(path))
+
+class PrecompressedHandler(QuietHandler):
+    """Serves precompressed variants by Accept-Encoding, with ETags, Range and sendfile"""
+
+    extensions_map = {**QuietHandler.extensions_map, ".wasm": "application/wasm"}
+
+    def __init__(self, *args, assets=None, **kwargs):
+        self.assets = assets
+        super().__init__(*args, **kwargs)
+
+    def do_GET(self):
+        self._serve(send_body=True)
+
+    def do_HEAD(self):
+        self._serve(send_body=False)
+
+    def _serve(self, send_body):
+        path = self.translate_path(self.path)
+        if os.path.isdir(path):
+            path = os.path.join(path, "index.html")
+        entry = self.assets.lookup(path) if self.assets else None
+        if entry is None:
+            # Not part of the startup snapshot (or a directory listing): plain handling
+            return super().do_GET() if send_body else super().do_HEAD()
+
+        encoding = self._negotiate(entry)
+        etag = f'"{entry["sha256"][:32]}-{encoding or "identity"}"'
+        if etag in [tag.strip() for tag in self.headers.get("If-None-Match", "").split(",")]:
+            self.send_response(304)
+            self._send_cache_headers(etag)
+            self.end_headers()
+            return
+
+        if encoding:
+            file_path, size = entry["variants"][encoding]
+        else:
+            file_path, size = path, entry["size"]
+
+        start, end = 0, size - 1
+        byte_range = None if encoding else self._requested_range(size, etag)
+        if byte_range == "unsatisfiable":
+            self.send_response(416)
+            self.send_header("Content-Range", f"bytes */{size}")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if byte_range:
+            start, end = byte_range
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        else:
+            self.send_response(200)
+
+        self.send_header("Content-Type", self.guess_type(path))
+        self.send_header("Content-Length", str(end - start + 1))
+        self.send_header("Accept-Ranges", "bytes")
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+        self._send_cache_headers(etag)
+        self.end_headers()
+
+        if send_body and end >= start:
+            with open(file_path, "rb") as f:
+                # socket.sendfile uses os.sendfile (zero-copy) where the platform has it
+                self.connection.sendfile(f, offset=start, count=end - start + 1)
+
+    def _negotiate(self, entry):
+        """Best available encoding the client accepts (q > 0), or None for identity"""
+        accepted = {}
+        for part in self.headers.get("Accept-Encoding", "").split(","):
+            name, _, params = part.strip().partition(";")
+            q = 1.0
+            if params.strip().startswith("q="):
+                try:
+                    q = float(params.strip()[2:])
+                except ValueError:
+                    q = 0.0
+            if name:
+                accepted[name.lower()] = q
+        for encoding in PrecompressedAssets.ENCODINGS:
+            if encoding in entry["variants"] and accepted.get(encoding, accepted.get("*", 0)) > 0:
+                return encoding
+        return None
+
+    def _requested_range(self, size, etag):
+        """(start, end) for a single satisfiable byte range, 'unsatisfiable', or None"""
+        header = self.headers.get("Range")
+        if_range = self.headers.get("If-Range")
+        if not header or (if_range and if_range != etag):
+            return None
+        match = RANGE_HEADER.match(header.strip())
+        if not match or match.groups() == ("", ""):
+            return None  # multiple or malformed ranges: send the whole file
+        first, last = match.groups()
+        if first:
+            start = int(first)
+            end = min(int(last), size - 1) if last else size - 1
+        else:
+            start, end = max(size - int(last), 0), size - 1
+        if start >= size or start > end:
+            return "unsatisfiable"
+        return start, end
+
+    def _send_cache_headers(self, etag):
+        # flutter build web keeps fixed names (main.dart.js, canvaskit.wasm), so
+        # nothing is safe to cache as immutable; the content-hash ETag makes
+        # revalidating an unchanged file a 304
+        self.send_header("ETag", etag)
+        self.send_header("Vary", "Accept-Encoding")
+        self.send_header("Cache-Control", "no-cache")
+
+class StaticAppServer:
+    """Serves a prebuilt build/web directory from an in-process threaded HTTP server"""
+
+    def __init__(self, directory=BUILD_DIR, port=APP_PORT, handler=QuietHandler,
+                 precompress=False, host="127.0.0.1"):
+        self.directory = Path(directory)
+        self.port = port
+        self.handler = handler
+        self.precompress = precompress
+        self.host = host
+        self.server = None
+        self.thread = None
+
+    @property
+    def url(self):
+        return f"http://localhost:{self.port}"
+
+    def start(self):
+        if not (self.directory / "index.html").exists():
+            raise FileNotFoundError(f"No Flutter web build in {self.directory}")
+
+        if self.precompress:
+            assets = PrecompressedAssets(self.directory).build()
+            handler = functools.partial(PrecompressedHandler, directory=str(self.directory), assets=assets)
+        else:
+            handler = functools.partial(self.handler, directory=str(self.directory))
+        self.server = ThreadingHTTPServer((self.host, self.port), handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.thread.join(timeout=5)
+            self.server = None
+
+class FlutterRunProcess:
+    """`flutter run` for live-reload sessions, with its output drained in the background"""
+
+    def __init__(self, port=APP_PORT, device="chrome", log_path=FLUTTER_LOG, tail_lines=200, dart_defines=None):
+        self.port = port
+        self.device = device
+        self.dart_defines = dart_defines or {}
+        self.log_path = Path(log_path)
+        self.tail = collections.deque(maxlen=tail_lines)
+        self.process = None
+        self.reader = None
+
+    @property
+    def url(self):
+        return f"http://localhost:{self.port}"
+
+    def start(self):
+        flutter = shutil.which("flutter") or "flutter"
+        self.process = subprocess.Popen(
+            [flutter, "run", "-d", self.device, f"--web-port={self.port}"] + dart_define_args(self.dart_defines),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+            bufsize=1,
+        )
+        self.reader = threading.Thread(target=self._drain, daemon=True)
+        self.reader.start()
+        return self
+
+    def _drain(self):
+        """Keep reading the child's output so its pipe never fills up"""
+        self.log_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.log_path, "w", encoding="utf-8") as log:
+            for line in self.process.stdout:
+                log.write(line)
+                log.flush()
+                self.tail.append(line.rstrip())
+
+    def stop(self):
+        if not self.process or self.process.poll() is not None:
+            return
+        try:
+            # Ask flutter run to quit so it closes its own Chrome instance
+            self.process.stdin.write("q\n")
+            self.process.stdin.flush()
+            self.process.wait(timeout=10)
+        except (OSError, subprocess.TimeoutExpired):
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        self.reader.join(timeout=5)
+
+def main(argv=None):
+    """Serve build/web on its own, e.g. for the on-prem kiosk"""
+    parser = argparse.ArgumentParser(description="Serve a Flutter web build with precompressed assets")
+    parser.add_argument("--directory", default=str(BUILD_DIR))
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=APP_PORT)
+    parser.add_argument("--no-precompress", action="store_true")
+    args = parser.parse_args(argv)
+
+    server = StaticAppServer(args.directory, args.port, precompress=not args.no_precompress, host=args.host)
+    server.start()
+    print(f"Serving {args.directory} on http://{args.host}:{args.port}"
+          f"{'' if brotli or args.no_precompress else ' (gzip only: pip install brotli for br)'}")
+    try:
+        server.thread.join()
+    except KeyboardInterrupt:
+        server.stop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Local caching HTTPS proxy for Flutter web runtime assets (CanvasKit, fonts)
+
+Chrome is pointed at it with --host-resolver-rules (see TestConfig), so the
+app's requests to the CDN hosts land here unchanged. Responses come from a
+content-addressed cache; misses are fetched upstream when the network allows
+and recorded either way.
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import ssl
+import subprocess
+import sys
+import threading
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+ASSET_HOSTS = ["www.gstatic.com", "fonts.gstatic.com", "fonts.googleapis.com"]
+CACHE_DIR = Path(os.environ.get("ASSET_CACHE_DIR", ".asset_cache"))
+PROXY_PORT = 8443
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+class AssetCache:
+    """URL -> sha256 index over a directory of content-addressed blobs"""
+
+    def __init__(self, cache_dir=CACHE_DIR):
+        self.cache_dir = Path(cache_dir)
+        self.objects_dir = self.cache_dir / "objects"
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self.index_file = self.cache_dir / "index.json"
+        self.misses_file = self.cache_dir / "misses.json"
+        self._lock = threading.Lock()
+        self.index = self._load(self.index_file)
+        self.misses = self._load(self.misses_file)
+
+    @staticmethod
+    def _load(path):
+        try:
+            return json.loads(path.read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self, path, data):
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(data, indent=2, sort_keys=True))
+        os.replace(tmp, path)
+
+    def lookup(self, url):
+        """(entry, blob path) for a cached URL, or (None, None)"""
+        entry = self.index.get(url)
+        if not entry:
+            return None, None
+        blob = self.objects_dir / entry["sha256"]
+        return (entry, blob) if blob.exists() else (None, None)
+
+    def store(self, url, body, content_type):
+        digest = hashlib.sha256(body).hexdigest()
+        blob = self.objects_dir / digest
+        if not blob.exists():
+            tmp = blob.with_suffix(".tmp")
+            tmp.write_bytes(body)
+            os.replace(tmp, blob)
+        with self._lock:
+            self.index[url] = {"sha256": digest, "content_type": content_type, "size": len(body)}
+            self.misses.pop(url, None)
+            self._save(self.index_file, self.index)
+            self._save(self.misses_file, self.misses)
+        return self.index[url], blob
+
+    def record_miss(self, url):
+        with self._lock:
+            self.misses[url] = self.misses.get(url, 0) + 1
+            self._save(self.misses_file, self.misses)
+
+    def fetch(self, url, timeout=30):
+        """Download url into the cache; returns (entry, blob)"""
+        request = urllib.request.Request(url, headers={"User-Agent": "hacienda-asset-proxy"})
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            body = response.read()
+            content_type = response.headers.get("Content-Type", "application/octet-stream")
+        return self.store(url, body, content_type)
+
+class AssetProxyHandler(BaseHTTPRequestHandler):
+    """Serves cached assets with immutable caching and CORS headers"""
+
+    cache = None
+    offline = False
+
+    def log_message(self, format, *args):
+        pass
+
+    def _url(self):
+        host = (self.headers.get("Host") or "").split(":")[0]
+        return f"https://{host}{self.path}"
+
+    def do_OPTIONS(self):
+        self.send_response(204)
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.send_header("Access-Control-Allow-Methods", "GET, HEAD, OPTIONS")
+        self.send_header("Access-Control-Allow-Headers", "*")
+        self.end_headers()
+
+    def do_HEAD(self):
+        self.do_GET(send_body=False)
+
+    def do_GET(self, send_body=True):
+        url = self._url()
+        entry, blob = self.cache.lookup(url)
+
+        if entry is None:
+            self.cache.record_miss(url)
+            if not self.offline:
+                try:
+                    entry, blob = self.cache.fetch(url)
+                except (urllib.error.URLError, OSError) as e:
+                    print(f"⚠️ Asset proxy could not fetch {url}: {e}")
+        if entry is None:
+            self.send_error(404, "Not in asset cache")
+            return
+
+        etag = f'"{entry["sha256"]}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", IMMUTABLE)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", entry["content_type"])
+        self.send_header("Content-Length", str(entry["size"]))
+        self.send_header("Cache-Control", IMMUTABLE)
+        self.send_header("ETag", etag)
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.end_headers()
+        if send_body:
+            with open(blob, "rb") as f:
+                shutil.copyfileobj(f, self.wfile)
+
+def ensure_certificate(cache_dir=CACHE_DIR):
+    """Self-signed certificate for the proxied hosts, generated once with openssl"""
+    cert = Path(cache_dir) / "proxy-cert.pem"
+    key = Path(cache_dir) / "proxy-key.pem"
+    if cert.exists() and key.exists():
+        return cert, key
+
+    Path(cache_dir).mkdir(parents=True, exist_ok=True)
+    names = ",".join(f"DNS:{host}" for host in ASSET_HOSTS)
+    subprocess.run([
+        "openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes",
+        "-keyout", str(key), "-out", str(cert), "-days", "3650",
+        "-subj", "/CN=hacienda-asset-proxy", "-addext", f"subjectAltName={names}",
+    ], check=True, capture_output=True)
+    return cert, key
+
+class AssetProxy:
+    """Threaded TLS server in front of an AssetCache"""
+
+    def __init__(self, port=PROXY_PORT, cache_dir=CACHE_DIR, offline=False):
+        self.port = port
+        self.cache = AssetCache(cache_dir)
+        self.offline = offline
+        self.server = None
+        self.thread = None
+
+    @property
+    def address(self):
+        return f"127.0.0.1:{self.port}"
+
+    def start(self):
+        cert, key = ensure_certificate(self.cache.cache_dir)
+        handler = type("BoundAssetProxyHandler", (AssetProxyHandler,), {
+            "cache": self.cache,
+            "offline": self.offline,
+        })
+        self.server = ThreadingHTTPServer(("127.0.0.1", self.port), handler)
+        self.server.daemon_threads = True
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(cert, key)
+        self.server.socket = context.wrap_socket(self.server.socket, server_side=True)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.thread.join(timeout=5)
+            self.server = None
+
+def seed(cache, urls):
+    """Pre-fetch URLs into the cache; returns the ones that failed"""
+    failed = []
+    for url in urls:
+        if cache.lookup(url)[0]:
+            continue
+        try:
+            entry, _ = cache.fetch(url)
+            print(f"✅ Seeded {url} ({entry['size']} bytes)")
+        except (urllib.error.URLError, OSError) as e:
+            print(f"❌ Could not seed {url}: {e}")
+            failed.append(url)
+    return failed
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Caching proxy for Flutter web runtime assets")
+    parser.add_argument("--port", type=int, default=PROXY_PORT)
+    parser.add_argument("--offline", action="store_true", help="never fetch upstream")
+    parser.add_argument("--seed", metavar="FILE", help="pre-fetch the URLs listed in FILE, one per line")
+    parser.add_argument("--seed-misses", action="store_true", help="pre-fetch every URL in the miss list")
+    args = parser.parse_args(argv)
+
+    cache = AssetCache()
+    if args.seed or args.seed_misses:
+        urls = list(cache.misses) if args.seed_misses else []
+        if args.seed:
+            urls += [line.strip() for line in Path(args.seed).read_text().splitlines() if line.strip()]
+        return not seed(cache, urls)
+
+    proxy = AssetProxy(args.port, offline=args.offline).start()
+    print(f"Asset proxy listening on {proxy.address} for {', '.join(ASSET_HOSTS)}")
+    try:
+        proxy.thread.join()
+    except KeyboardInterrupt:
+        proxy.stop()
+    return True
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
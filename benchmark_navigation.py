@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Flutter web performance benchmark: cold start and per-screen navigation latency
+"""
+import argparse
+import json
+import random
+import re
+import subprocess
+import sys
+from datetime import datetime
+from pathlib import Path
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from test_config import TestConfig
+from flutter_idle import wait_for_flutter_app, wait_for_flutter_idle
+from semantics_snapshot import SemanticsSnapshot
+from step_timing import percentile
+
+BASELINE_FILE = Path("benchmarks/baselines.json")
+RESULTS_DIR = Path("reports/benchmarks")
+# 2: navigation latency is click -> destination semantics, not click -> last frame
+BASELINE_SCHEMA = 2
+BOOTSTRAP_SAMPLES = 1000
+
+# Runs before any page script: records when flt-glass-pane mounts and when
+# Flutter reports its first frame, relative to navigation start.
+BOOT_PROBE = """
+window.__bootMarks = {};
+new MutationObserver(function (mutations, observer) {
+    if (document.querySelector('flt-glass-pane')) {
+        window.__bootMarks.glassPane = performance.now();
+        observer.disconnect();
+    }
+}).observe(document, {childList: true, subtree: true});
+window.addEventListener('flutter-first-frame', function () {
+    window.__bootMarks.firstFrame = performance.now();
+});
+"""
+
+BOOT_METRICS_SCRIPT = """
+var nav = performance.getEntriesByType('navigation')[0] || {};
+var marks = window.__bootMarks || {};
+return {
+    ttfb: nav.responseStart,
+    dom_content_loaded: nav.domContentLoadedEventEnd,
+    load: nav.loadEventEnd,
+    glass_pane: marks.glassPane,
+    first_frame: marks.firstFrame
+};
+"""
+
+# Clicks a navigation item and marks the first moment semantics nodes are
+# added afterwards: Flutter updates the semantics DOM in the frame that shows
+# the new screen, while ambient animations (spinners, clocks) add no nodes.
+NAV_CLICK_SCRIPT = """
+var el = document.querySelector('flt-semantics[data-semantics-handle="' + arguments[0] + '"]');
+if (!el) { return null; }
+var mark = window.__navMark = {clickedAt: performance.now(), renderedAt: null};
+mark.observer = new MutationObserver(function (mutations) {
+    var added = mutations.some(function (m) {
+        return Array.prototype.some.call(m.addedNodes, function (n) {
+            return n.nodeType === 1 && (n.tagName === 'FLT-SEMANTICS' || n.querySelector('flt-semantics'));
+        });
+    });
+    if (added) {
+        mark.renderedAt = performance.now();
+        mark.observer.disconnect();
+    }
+});
+mark.observer.observe(document.documentElement, {childList: true, subtree: true});
+el.click();
+return mark.clickedAt;
+"""
+
+NAV_RENDERED_SCRIPT = """
+var mark = window.__navMark;
+mark.observer.disconnect();
+return mark.renderedAt;
+"""
+
+def app_version():
+    """Version string from pubspec.yaml"""
+    match = re.search(r"^version:\s*(\S+)", Path("pubspec.yaml").read_text(), re.MULTILINE)
+    return match.group(1) if match else "unknown"
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                              capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+def bootstrap_ci(values, pct, confidence=0.95, seed=0):
+    """Bootstrap confidence interval for a percentile"""
+    if len(values) < 2:
+        value = values[0] if values else 0.0
+        return value, value
+    rng = random.Random(seed)
+    estimates = sorted(
+        percentile(sorted(rng.choices(values, k=len(values))), pct)
+        for _ in range(BOOTSTRAP_SAMPLES)
+    )
+    tail = (1 - confidence) / 2
+    return percentile(estimates, tail * 100), percentile(estimates, (1 - tail) * 100)
+
+def summarize(samples):
+    """p50/p95 with 95% bootstrap confidence intervals, in milliseconds"""
+    summary = {}
+    for metric, values in sorted(samples.items()):
+        if not values:
+            continue
+        ordered = sorted(values)
+        entry = {"n": len(values), "mean": round(sum(values) / len(values), 2)}
+        for pct in (50, 95):
+            low, high = bootstrap_ci(values, pct)
+            entry[f"p{pct}"] = round(percentile(ordered, pct), 2)
+            entry[f"p{pct}_ci"] = [round(low, 2), round(high, 2)]
+        summary[metric] = entry
+    return summary
+
+def create_driver():
+    driver = webdriver.Chrome(service=Service(TestConfig.get_chromedriver_path()),
+                              options=TestConfig.get_chrome_options())
+    driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": BOOT_PROBE})
+    return driver
+
+def measure_iteration(samples, nav_items):
+    """One cold start plus one walk through every navigation item"""
+    driver = create_driver()
+    try:
+        driver.get(TestConfig.BASE_URL)
+        if wait_for_flutter_app(driver) is None:
+            print("WARNING: Flutter app did not mount, skipping iteration")
+            return
+
+        boot = driver.execute_script(BOOT_METRICS_SCRIPT)
+        for metric, value in boot.items():
+            if value:
+                samples[f"boot.{metric}"].append(value)
+
+        SemanticsSnapshot.enable_semantics(driver)
+        wait_for_flutter_idle(driver)
+        snapshot = SemanticsSnapshot(driver).capture()
+
+        for item in nav_items:
+            snapshot.refresh()
+            nodes = snapshot.find(label=item) or snapshot.find_containing(item)
+            clicked_at = driver.execute_script(NAV_CLICK_SCRIPT, nodes[0].handle) if nodes else None
+            if clicked_at is None:
+                print(f"WARNING: Could not navigate to {item}")
+                continue
+            wait_for_flutter_idle(driver)
+            rendered_at = driver.execute_script(NAV_RENDERED_SCRIPT)
+            if rendered_at is None:
+                # The semantics tree never changed: the screen didn't render, so there is nothing to time
+                print(f"WARNING: {item} did not render after the click, sample skipped")
+                continue
+            samples[f"nav.{item}"].append(rendered_at - clicked_at)
+    finally:
+        driver.quit()
+
+def run_benchmark(iterations=5, nav_items=None):
+    """Run the benchmark and return its summary (milliseconds)"""
+    nav_items = nav_items or TestConfig.NAV_ITEMS
+    samples = {}
+    samples.update({f"boot.{m}": [] for m in ("ttfb", "dom_content_loaded", "load", "glass_pane", "first_frame")})
+    samples.update({f"nav.{item}": [] for item in nav_items})
+
+    for i in range(iterations):
+        print(f"Iteration {i + 1}/{iterations}...")
+        measure_iteration(samples, nav_items)
+
+    return {
+        "app_version": app_version(),
+        "git_rev": git_revision(),
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "iterations": iterations,
+        "metrics": summarize(samples),
+        "samples": {metric: [round(v, 2) for v in values] for metric, values in samples.items() if values},
+    }
+
+def load_baselines():
+    try:
+        baselines = json.loads(BASELINE_FILE.read_text())
+    except (OSError, ValueError):
+        baselines = {}
+    if baselines.get("schema") != BASELINE_SCHEMA:
+        # Measured differently; comparing against them would be meaningless
+        return {"schema": BASELINE_SCHEMA, "baselines": {}}
+    return baselines
+
+def save_baseline(result):
+    """Store the result as the baseline for its app version"""
+    baselines = load_baselines()
+    baselines["schema"] = BASELINE_SCHEMA
+    baselines["baselines"][result["app_version"]] = {k: v for k, v in result.items() if k != "samples"}
+    BASELINE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    BASELINE_FILE.write_text(json.dumps(baselines, indent=2))
+    print(f"Baseline saved for {result['app_version']}: {BASELINE_FILE}")
+
+def compare_to_baseline(result):
+    """Print each metric's p50 next to the baseline and flag ones outside its CI"""
+    baseline = load_baselines()["baselines"].get(result["app_version"])
+    if not baseline:
+        print(f"No baseline stored for {result['app_version']}")
+        return
+    print(f"\nCompared to baseline from {baseline['created']} ({baseline.get('git_rev')}):")
+    for metric, current in result["metrics"].items():
+        base = baseline["metrics"].get(metric)
+        if not base:
+            continue
+        low, high = base["p50_ci"]
+        flag = "SLOWER" if current["p50"] > high else "FASTER" if current["p50"] < low else "same"
+        print(f"  {metric:32} {base['p50']:9.1f} -> {current['p50']:9.1f} ms  [{flag}]")
+
+def print_summary(result):
+    print(f"\n{'metric':32} {'p50':>9} {'95% CI':>21} {'p95':>9}")
+    for metric, entry in result["metrics"].items():
+        ci = f"[{entry['p50_ci'][0]:.1f}, {entry['p50_ci'][1]:.1f}]"
+        print(f"{metric:32} {entry['p50']:9.1f} {ci:>21} {entry['p95']:9.1f}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Hacienda Elizabeth navigation benchmark")
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="store this run as the baseline for the current app version")
+    args = parser.parse_args(argv)
+
+    print("Navigation Benchmark - Hacienda Elizabeth")
+    print("=" * 50)
+
+    result = run_benchmark(args.iterations)
+    print_summary(result)
+
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    results_file = RESULTS_DIR / f"navigation_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    results_file.write_text(json.dumps(result, indent=2))
+    print(f"\nResults saved: {results_file}")
+
+    compare_to_baseline(result)
+    if args.save_baseline:
+        save_baseline(result)
+    return True
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
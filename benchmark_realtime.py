@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Realtime subscription benchmark: UI latency and lost updates at 10/100/1000 events per second
+
+Needs the app built against the local stub (run_tests.py --backend stub, or
+--dart-define=SUPABASE_URL=http://localhost:54321). The stub replays
+synthetic changes on the core tables; a MutationObserver in the page records
+when each inserted "RT-<seq>" row first shows up on screen.
+"""
+import argparse
+import json
+import sys
+import time
+import urllib.request
+from datetime import datetime
+from pathlib import Path
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from test_config import TestConfig
+from flutter_idle import wait_for_flutter_app, wait_for_flutter_idle
+from semantics_snapshot import SemanticsSnapshot
+from step_timing import percentile
+from supabase_stub import STUB_PORT, SupabaseStub
+
+RESULTS_DIR = Path("reports/benchmarks")
+DEFAULT_RATES = [10, 100, 1000]
+# Screen that renders each table, newest rows first
+SCREENS = {"sugar_records": "Sugar Records", "inventory_items": "Inventory",
+           "supplier_transactions": "Suppliers", "alerts": "Home"}
+
+# Wall-clock time each RT-<seq> marker first appears in the semantics tree,
+# plus how many observer callbacks actually revealed something new
+UI_PROBE_SCRIPT = """
+if (window.__rtProbe) { return; }
+var probe = window.__rtProbe = {seen: {}, updates: 0};
+var pattern = /RT-(\\d+)/g;
+function scan() {
+    var now = performance.timeOrigin + performance.now();
+    var host = document.querySelector('flt-semantics-host') || document.body;
+    var text = host.textContent;
+    host.querySelectorAll('[aria-label]').forEach(function (el) { text += ' ' + el.getAttribute('aria-label'); });
+    var revealed = false, match;
+    pattern.lastIndex = 0;
+    while ((match = pattern.exec(text)) !== null) {
+        if (!(match[1] in probe.seen)) { probe.seen[match[1]] = now; revealed = true; }
+    }
+    if (revealed) { probe.updates++; }
+}
+new MutationObserver(scan).observe(document.body, {
+    childList: true, subtree: true, characterData: true, attributes: true, attributeFilter: ['aria-label']
+});
+"""
+
+def stub_request(stub_url, action, payload=None):
+    data = json.dumps(payload).encode() if payload is not None else None
+    request = urllib.request.Request(f"{stub_url}/__stub/{action}", data=data, method="POST" if data else "GET")
+    with urllib.request.urlopen(request, timeout=30) as response:
+        return json.loads(response.read())
+
+def wait_for_subscription(stub_url, table, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if stub_request(stub_url, "realtime")["subscribers"].get(table):
+            return True
+        time.sleep(0.2)
+    return False
+
+def open_screen(driver, screen):
+    driver.get(TestConfig.BASE_URL)
+    if wait_for_flutter_app(driver) is None:
+        raise RuntimeError("Flutter app did not mount")
+    SemanticsSnapshot.enable_semantics(driver)
+    wait_for_flutter_idle(driver)
+    snapshot = SemanticsSnapshot(driver).capture()
+    nodes = snapshot.find(label=screen) or snapshot.find_containing(screen)
+    if nodes:
+        snapshot.click(nodes[0])
+        wait_for_flutter_idle(driver)
+    else:
+        print(f"WARNING: Could not navigate to {screen}")
+
+def analyze(events, seen, table, updates):
+    """Latency and loss for the INSERTs on the table the screen shows"""
+    inserts = sorted(int(seq) for seq, (name, kind, _) in events.items() if name == table and kind == "INSERT")
+    latencies, coalesced, dropped = [], 0, 0
+    seen_seqs = sorted(int(s) for s in seen)
+    for seq in inserts:
+        if str(seq) in seen:
+            latencies.append(max(seen[str(seq)] - events[str(seq)][2], 0.0))
+        elif seen_seqs and seen_seqs[-1] > seq:
+            coalesced += 1  # a newer row made it to screen, this one was skipped
+        else:
+            dropped += 1    # nothing after it ever rendered
+    ordered = sorted(latencies)
+    return {
+        "inserts": len(inserts),
+        "rendered": len(latencies),
+        "coalesced": coalesced,
+        "dropped": dropped,
+        "ui_updates": updates,
+        "events_per_ui_update": round(len(latencies) / updates, 2) if updates else None,
+        "latency_p50_ms": round(percentile(ordered, 50), 1) if ordered else None,
+        "latency_p95_ms": round(percentile(ordered, 95), 1) if ordered else None,
+        "latency_max_ms": round(ordered[-1], 1) if ordered else None,
+    }
+
+def run_rate(driver, stub_url, rate, duration, table, settle):
+    """Replay one rate into a freshly loaded screen and measure it"""
+    stub_request(stub_url, "reset", {})
+    open_screen(driver, SCREENS[table])
+    if not wait_for_subscription(stub_url, table):
+        raise RuntimeError(f"App never subscribed to {table} changes")
+    driver.execute_script(UI_PROBE_SCRIPT)
+
+    stub_request(stub_url, "replay", {"rate": rate, "duration": duration})
+    while stub_request(stub_url, "replay")["running"]:
+        time.sleep(0.5)
+    time.sleep(settle)
+
+    status = stub_request(stub_url, "replay")
+    probe = driver.execute_script("return window.__rtProbe;")
+    result = analyze(status["events"], probe["seen"], table, probe["updates"])
+    result.update({"rate": rate, "sent": status["sent"], "actual_rate": status["actual_rate"],
+                   "server_dropped": status["dropped"]})
+    return result
+
+def print_results(results):
+    print(f"\n{'rate/s':>7} {'sent':>6} {'inserts':>8} {'shown':>6} {'coalesced':>10} {'dropped':>8} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'ev/update':>10}")
+    for r in results:
+        print(f"{r['rate']:>7} {r['sent']:>6} {r['inserts']:>8} {r['rendered']:>6} {r['coalesced']:>10} "
+              f"{r['dropped']:>8} {r['latency_p50_ms'] or '-':>8} {r['latency_p95_ms'] or '-':>8} "
+              f"{r['events_per_ui_update'] or '-':>10}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Hacienda Elizabeth realtime subscription benchmark")
+    parser.add_argument("--rates", type=int, nargs="+", default=DEFAULT_RATES)
+    parser.add_argument("--duration", type=float, default=10, help="seconds of replay per rate")
+    parser.add_argument("--table", choices=sorted(SCREENS), default="sugar_records")
+    parser.add_argument("--settle", type=float, default=3, help="seconds to wait for the UI after the replay")
+    parser.add_argument("--stub-url", default=None,
+                        help="use an already running stub instead of starting one on port %d" % STUB_PORT)
+    args = parser.parse_args(argv)
+
+    print("Realtime Benchmark - Hacienda Elizabeth")
+    print("=" * 50)
+
+    stub = None if args.stub_url else SupabaseStub().start()
+    stub_url = args.stub_url or stub.url
+    driver = webdriver.Chrome(service=Service(TestConfig.get_chromedriver_path()),
+                              options=TestConfig.get_chrome_options())
+    results = []
+    try:
+        for rate in args.rates:
+            print(f"Replaying {rate} events/s for {args.duration:g}s...")
+            results.append(run_rate(driver, stub_url, rate, args.duration, args.table, args.settle))
+    finally:
+        driver.quit()
+        if stub:
+            stub.stop()
+
+    print_results(results)
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    results_file = RESULTS_DIR / f"realtime_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    results_file.write_text(json.dumps({"table": args.table, "duration": args.duration, "results": results}, indent=2))
+    print(f"\nResults saved: {results_file}")
+    return True
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
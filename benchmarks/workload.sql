@@ -0,0 +1,94 @@
+-- Query workload for index_advisor.py
+--
+-- Each query starts with a "-- name:" header; "-- weight:" is how often the
+-- app issues it relative to the others (default 1). The first block mirrors
+-- SupabaseService as it is today, the second the filters the reports and
+-- supplier screens apply client-side and would push down to PostgREST.
+-- Literal values match what dataset_generator.py produces.
+
+-- name: sugar_records.list
+-- weight: 10
+-- source: SupabaseService.getSugarRecords
+SELECT * FROM sugar_records ORDER BY created_at DESC;
+
+-- name: inventory_items.list
+-- weight: 10
+-- source: SupabaseService.getInventoryItems
+SELECT * FROM inventory_items ORDER BY created_at DESC;
+
+-- name: supplier_transactions.list
+-- weight: 10
+-- source: SupabaseService.getSupplierTransactions
+SELECT * FROM supplier_transactions ORDER BY created_at DESC;
+
+-- name: alerts.list
+-- weight: 10
+-- source: SupabaseService.getAlerts
+SELECT * FROM alerts ORDER BY timestamp DESC;
+
+-- name: realtime_events.list
+-- weight: 5
+-- source: SupabaseService.getEvents
+SELECT * FROM realtime_events ORDER BY timestamp DESC;
+
+-- name: sugar_records.delete_by_id
+-- weight: 2
+-- source: SupabaseService.deleteSugarRecord
+DELETE FROM sugar_records WHERE id = 'sr-1000';
+
+-- name: supplier_transactions.delete_by_id
+-- weight: 2
+-- source: SupabaseService.deleteSupplierTransaction
+DELETE FROM supplier_transactions WHERE id = 'sup-1000';
+
+-- name: connection.check
+-- weight: 1
+-- source: SupabaseService.testConnection
+SELECT * FROM sugar_records LIMIT 1;
+
+-- name: supplier_transactions.by_supplier_period
+-- weight: 8
+-- source: supplier detail / reports, one supplier over a quarter
+SELECT * FROM supplier_transactions
+WHERE supplier_name = 'AgriSupply Co.' AND date BETWEEN '2024-01-01' AND '2024-03-31'
+ORDER BY date DESC;
+
+-- name: supplier_transactions.monthly_spend
+-- weight: 4
+-- source: reports, spend per supplier per month
+SELECT supplier_name, date_trunc('month', date) AS month, sum(amount) AS total
+FROM supplier_transactions
+WHERE date >= '2024-01-01'
+GROUP BY supplier_name, month;
+
+-- name: alerts.unread
+-- weight: 8
+-- source: AlertService, newest unread alerts
+SELECT * FROM alerts WHERE read = false ORDER BY timestamp DESC LIMIT 50;
+
+-- name: alerts.unread_count
+-- weight: 8
+-- source: AlertService.getUnreadCount, AdvancedAnalytics
+SELECT count(*) FROM alerts WHERE read = false;
+
+-- name: alerts.recent_by_severity
+-- weight: 3
+-- source: AlertService, last 30 days of warnings
+SELECT * FROM alerts
+WHERE severity = 'warning' AND timestamp >= '2024-12-01'
+ORDER BY timestamp DESC;
+
+-- name: sugar_records.by_variety
+-- weight: 4
+-- source: reports, growth curve for one variety
+SELECT date, height_cm FROM sugar_records WHERE variety = 'Phil 2018' ORDER BY date;
+
+-- name: inventory_items.low_stock
+-- weight: 4
+-- source: AnalyticsService, quantity <= 10
+SELECT * FROM inventory_items WHERE quantity <= 10 ORDER BY quantity;
+
+-- name: realtime_events.recent_by_entity
+-- weight: 3
+-- source: activity feed filtered to one entity
+SELECT * FROM realtime_events WHERE entity = 'sugar' ORDER BY timestamp DESC LIMIT 100;
@@ -0,0 +1,199 @@
+"""
+Browser console and network log capture over CDP, kept in memory and written only when asked
+
+Listeners for Runtime.consoleAPICalled, Runtime.exceptionThrown,
+Log.entryAdded and Network.* run on the CDP reader thread and only append a
+small dict to a ring buffer (the last CAPACITY entries). A network request is
+one entry, filled in as its response, failure or completion arrives. Nothing
+is formatted or written until dump(): BaseTest calls it when a test fails,
+or a test can call save_browser_log() itself, so passing tests cost no I/O.
+
+Request and response headers and bodies are never kept (they carry the
+Supabase API key and session tokens).
+"""
+import json
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from pathlib import Path
+from cdp_client import CDPError, session_for
+
+LOG_DIR = Path("reports/browser_logs")
+CAPACITY = 2000
+# Characters kept from a console message or exception text
+MAX_TEXT = 2000
+SUPABASE_PATHS = ("/rest/v1/", "/auth/v1/", "/storage/v1/", "/realtime/v1/", "/functions/v1/")
+
+def _remote_value(arg):
+    """Readable form of a Runtime.RemoteObject console argument"""
+    if "value" in arg:
+        value = arg["value"]
+        return value if isinstance(value, str) else json.dumps(value)
+    return arg.get("description") or arg.get("unserializableValue") or arg.get("type", "")
+
+def _top_frame(stack):
+    frames = (stack or {}).get("callFrames") or []
+    if not frames:
+        return None
+    frame = frames[0]
+    return f"{frame.get('url', '')}:{frame.get('lineNumber', 0) + 1}:{frame.get('columnNumber', 0) + 1}"
+
+def _safe(name):
+    return re.sub(r"[^\w.-]+", "_", name).strip("_") or "browser"
+
+class BrowserLogCollector:
+    """Ring buffer of one page's console, log and network entries"""
+
+    def __init__(self, session, capacity=CAPACITY):
+        self.session = session
+        self.entries = deque(maxlen=capacity)
+        # requestId -> its entry, bounded like the ring so a page that never finishes requests can't grow it
+        self.requests = OrderedDict()
+        self.capacity = capacity
+        self.lock = threading.Lock()
+        self.listeners = {
+            "Runtime.consoleAPICalled": self._on_console,
+            "Runtime.exceptionThrown": self._on_exception,
+            "Log.entryAdded": self._on_log,
+            "Network.requestWillBeSent": self._on_request,
+            "Network.responseReceived": self._on_response,
+            "Network.loadingFinished": self._on_finished,
+            "Network.loadingFailed": self._on_failed,
+            "Network.webSocketFrameError": self._on_websocket_error,
+        }
+
+    def start(self):
+        for event, callback in self.listeners.items():
+            self.session.on(event, callback)
+        for domain in ("Runtime", "Log"):
+            self.session.send(f"{domain}.enable")
+        # No post data or body buffering: we never read bodies back
+        self.session.send("Network.enable", {"maxPostDataSize": 0, "maxTotalBufferSize": 0})
+        return self
+
+    def stop(self):
+        for event, callback in self.listeners.items():
+            self.session.off(event, callback)
+        try:
+            self.session.send("Network.disable")
+        except CDPError:
+            pass
+
+    def clear(self):
+        """Start a new test's buffer"""
+        with self.lock:
+            self.entries.clear()
+            self.requests.clear()
+
+    def _add(self, entry):
+        entry["time"] = time.time()
+        with self.lock:
+            self.entries.append(entry)
+        return entry
+
+    def _on_console(self, params):
+        text = " ".join(_remote_value(arg) for arg in params.get("args", []))
+        self._add({"kind": "console", "level": params.get("type", "log"), "text": text[:MAX_TEXT],
+                   "source": _top_frame(params.get("stackTrace"))})
+
+    def _on_exception(self, params):
+        details = params.get("exceptionDetails", {})
+        text = (details.get("exception") or {}).get("description") or details.get("text", "")
+        self._add({"kind": "exception", "level": "error", "text": text[:MAX_TEXT],
+                   "source": _top_frame(details.get("stackTrace")) or details.get("url")})
+
+    def _on_log(self, params):
+        entry = params.get("entry", {})
+        self._add({"kind": "log", "level": entry.get("level", "info"), "text": entry.get("text", "")[:MAX_TEXT],
+                   "source": entry.get("url") or entry.get("source")})
+
+    def _on_request(self, params):
+        request = params.get("request", {})
+        url = request.get("url", "")
+        if url.startswith("data:"):
+            return
+        entry = self._add({"kind": "network", "level": "info", "method": request.get("method"), "url": url,
+                           "type": params.get("type"), "supabase": any(p in url for p in SUPABASE_PATHS),
+                           "started": params.get("timestamp")})
+        with self.lock:
+            # A redirect reuses the requestId: close the previous hop, then track the new one
+            previous = self.requests.get(params["requestId"])
+            if previous is not None and "redirectResponse" in params:
+                previous["status"] = params["redirectResponse"].get("status")
+            self.requests[params["requestId"]] = entry
+            self.requests.move_to_end(params["requestId"])
+            while len(self.requests) > self.capacity:
+                self.requests.popitem(last=False)
+
+    def _on_response(self, params):
+        entry = self.requests.get(params.get("requestId"))
+        if entry is not None:
+            response = params.get("response", {})
+            entry["status"] = response.get("status")
+            entry["from_cache"] = response.get("fromDiskCache", False) or response.get("fromServiceWorker", False)
+            if entry["status"] and entry["status"] >= 400:
+                entry["level"] = "error"
+
+    def _on_finished(self, params):
+        entry = self.requests.pop(params.get("requestId"), None)
+        if entry is not None:
+            entry["bytes"] = params.get("encodedDataLength")
+            if entry.get("started") is not None:
+                entry["duration_ms"] = round((params.get("timestamp", 0) - entry["started"]) * 1000, 1)
+
+    def _on_failed(self, params):
+        entry = self.requests.pop(params.get("requestId"), None)
+        if entry is not None:
+            entry["level"] = "warning" if params.get("canceled") else "error"
+            entry["error"] = params.get("errorText") or params.get("blockedReason")
+            if entry.get("started") is not None:
+                entry["duration_ms"] = round((params.get("timestamp", 0) - entry["started"]) * 1000, 1)
+
+    def _on_websocket_error(self, params):
+        self._add({"kind": "network", "level": "error", "method": "WS", "url": None,
+                   "error": params.get("errorMessage")})
+
+    def snapshot(self):
+        with self.lock:
+            return [dict(entry) for entry in self.entries]
+
+    def summary(self):
+        """Counts by level, and the failed Supabase requests"""
+        entries = self.snapshot()
+        levels = {}
+        for entry in entries:
+            levels[entry["level"]] = levels.get(entry["level"], 0) + 1
+        failed = [e for e in entries if e["kind"] == "network" and e.get("supabase") and e["level"] == "error"]
+        return {"entries": len(entries), "levels": levels, "supabase_failures": len(failed)}
+
+    def dump(self, path):
+        """Write the buffer as JSON lines; returns the path, or None if it is empty"""
+        entries = self.snapshot()
+        if not entries:
+            return None
+        path = Path(path).with_suffix(".jsonl")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            for entry in entries:
+                entry.pop("started", None)
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        return path
+
+def log_path(test_id, root=LOG_DIR):
+    return Path(root) / _safe(test_id)
+
+_COLLECTORS = {}
+
+def collector_for(driver, capacity=CAPACITY, fallback_port=None, url_prefix=None):
+    """The running collector for a WebDriver session, started on first use; None if CDP is unreachable"""
+    collector = _COLLECTORS.get(driver.session_id)
+    if collector is not None and not collector.session.closed.is_set():
+        return collector
+    try:
+        collector = BrowserLogCollector(session_for(driver, fallback_port, url_prefix), capacity).start()
+    except (CDPError, OSError) as e:
+        print(f"⚠️ Browser logs unavailable: {e}")
+        return None
+    _COLLECTORS[driver.session_id] = collector
+    return collector
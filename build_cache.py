@@ -0,0 +1,145 @@
+"""
+Content-hash cache for Flutter web builds
+"""
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import time
+from functools import lru_cache
+from pathlib import Path
+
+BUILD_INPUTS = ["lib", "assets", "web", "pubspec.yaml", "pubspec.lock"]
+BUILD_DIR = Path("build/web")
+CACHE_DIR = Path(os.environ.get("BUILD_CACHE_DIR", ".build_cache"))
+MAX_CACHE_BYTES = int(os.environ.get("BUILD_CACHE_MAX_BYTES", 2 * 1024 ** 3))
+MARKER_FILE = ".build_hash"
+
+def _input_files(root):
+    for name in BUILD_INPUTS:
+        path = root / name
+        if path.is_file():
+            yield path
+        elif path.is_dir():
+            for file in sorted(p for p in path.rglob("*") if p.is_file()):
+                yield file
+
+@lru_cache(maxsize=1)
+def flutter_sdk_version():
+    """Framework, engine and Dart revisions of the flutter on PATH ("" if it can't be run)"""
+    try:
+        output = subprocess.run([shutil.which("flutter") or "flutter", "--version", "--machine"],
+                                capture_output=True, text=True, timeout=120).stdout
+        info = json.loads(output[output.index("{"):])
+    except (OSError, subprocess.SubprocessError, ValueError):
+        return ""
+    return " ".join(str(info.get(k, "")) for k in ("frameworkRevision", "engineRevision", "dartSdkVersion"))
+
+def hash_build_inputs(root=".", extra=""):
+    """SHA-256 over the Flutter SDK version and the paths and contents of every build input"""
+    root = Path(root)
+    digest = hashlib.sha256(extra.encode())
+    # A Flutter or Dart upgrade changes the output without touching the sources
+    digest.update(flutter_sdk_version().encode() + b"\0")
+    for file in _input_files(root):
+        digest.update(file.relative_to(root).as_posix().encode() + b"\0")
+        with open(file, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+def _tree_size(path):
+    return sum(p.stat().st_size for p in Path(path).rglob("*") if p.is_file())
+
+class BuildCache:
+    """build/web artifacts keyed by input hash, evicted least-recently-used past a size cap
+
+    The cap also covers compressed/, app_server's precompressed variants,
+    whose mtimes record their last use.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.index_file = self.cache_dir / "index.json"
+        self.compressed_dir = self.cache_dir / "compressed"
+
+    def _load_index(self):
+        try:
+            return json.loads(self.index_file.read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def _save_index(self, index):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.index_file.with_suffix(".tmp")
+        tmp.write_text(json.dumps(index, indent=2))
+        os.replace(tmp, self.index_file)
+
+    def is_current(self, key, target=BUILD_DIR):
+        """True if target already holds the build for key"""
+        marker = Path(target) / MARKER_FILE
+        return marker.exists() and marker.read_text().strip() == key
+
+    def restore(self, key, target=BUILD_DIR):
+        """Copy a cached build into target; False on a cache miss"""
+        entry = self.cache_dir / key
+        index = self._load_index()
+        if key not in index or not entry.is_dir():
+            return False
+
+        target = Path(target)
+        if target.exists():
+            shutil.rmtree(target)
+        shutil.copytree(entry, target)
+
+        index[key]["last_used"] = time.time()
+        self._save_index(index)
+        return True
+
+    def store(self, key, source=BUILD_DIR):
+        """Save source as the build for key and evict old entries past the size cap"""
+        source = Path(source)
+        (source / MARKER_FILE).write_text(key)
+
+        entry = self.cache_dir / key
+        staging = self.cache_dir / f"{key}.partial"
+        shutil.rmtree(staging, ignore_errors=True)
+        shutil.copytree(source, staging)
+        shutil.rmtree(entry, ignore_errors=True)
+        os.replace(staging, entry)
+
+        index = self._load_index()
+        index[key] = {"size": _tree_size(entry), "last_used": time.time()}
+        self._save_index(index)
+        self.evict(keep=key)
+
+    def _variants(self):
+        """(last used, size, path) of every precompressed variant, in-progress writes excluded"""
+        if not self.compressed_dir.is_dir():
+            return []
+        variants = []
+        for path in self.compressed_dir.iterdir():
+            if path.is_file() and path.suffix != ".tmp":
+                stat = path.stat()
+                variants.append((stat.st_mtime, stat.st_size, path))
+        return variants
+
+    def evict(self, keep=None):
+        """Drop least-recently-used builds and variants until the cache fits max_bytes"""
+        index = self._load_index()
+        variants = self._variants()
+        total = sum(entry["size"] for entry in index.values()) + sum(size for _, size, _ in variants)
+        builds = [(entry["last_used"], entry["size"], key) for key, entry in index.items() if key != keep]
+        for _, size, item in sorted(builds + variants, key=lambda candidate: candidate[0]):
+            if total <= self.max_bytes:
+                break
+            if isinstance(item, Path):
+                item.unlink(missing_ok=True)
+            else:
+                shutil.rmtree(self.cache_dir / item, ignore_errors=True)
+                del index[item]
+            total -= size
+        self._save_index(index)
@@ -0,0 +1,188 @@
+"""
+Minimal Chrome DevTools Protocol client over the remote-debugging websocket
+
+Selenium's execute_cdp_cmd can send commands but never sees events. This
+client attaches to the page target of a running WebDriver session (through
+the debuggerAddress Chrome reports, or TestConfig's debugging port) and
+delivers both: command results to the caller, events to listeners on a
+reader thread. Listeners must return quickly; hand heavy work to another thread.
+"""
+import itertools
+import json
+import socket
+import threading
+import urllib.request
+from collections import defaultdict
+from urllib.parse import urlparse
+
+from ws_frames import OP_CLOSE, OP_PONG, MessageAssembler, WebSocketClosed, accept_key, encode_frame, \
+    new_client_key, read_frame
+
+COMMAND_TIMEOUT = 10
+
+class CDPError(Exception):
+    """A command returned an error, timed out, or the connection is gone"""
+
+def debugger_address(driver, fallback_port=None):
+    """host:port of the browser's DevTools endpoint for a Chrome WebDriver session"""
+    address = driver.capabilities.get("goog:chromeOptions", {}).get("debuggerAddress")
+    if address:
+        return address
+    if fallback_port:
+        return f"127.0.0.1:{fallback_port}"
+    raise CDPError("Chrome did not report a debuggerAddress")
+
+def page_websocket_url(address, url_prefix=None):
+    """webSocketDebuggerUrl of the first page target (optionally whose URL starts with url_prefix)"""
+    with urllib.request.urlopen(f"http://{address}/json/list", timeout=COMMAND_TIMEOUT) as response:
+        targets = json.loads(response.read())
+    pages = [t for t in targets if t.get("type") == "page" and "webSocketDebuggerUrl" in t]
+    if url_prefix:
+        pages = [t for t in pages if t.get("url", "").startswith(url_prefix)] or pages
+    if not pages:
+        raise CDPError(f"No page target at {address}")
+    return pages[0]["webSocketDebuggerUrl"]
+
+class CDPSession:
+    """One websocket to a DevTools target"""
+
+    def __init__(self, ws_url, timeout=COMMAND_TIMEOUT):
+        self.ws_url = ws_url
+        self.timeout = timeout
+        self.listeners = defaultdict(list)
+        self.closed = threading.Event()
+        self._ids = itertools.count(1)
+        self._pending = {}
+        self._send_lock = threading.Lock()
+        self._sock = None
+        self._reader = None
+
+    @classmethod
+    def attach(cls, driver, fallback_port=None, url_prefix=None):
+        """Connect to the page a WebDriver session is driving"""
+        address = debugger_address(driver, fallback_port)
+        return cls(page_websocket_url(address, url_prefix)).connect()
+
+    def connect(self):
+        url = urlparse(self.ws_url)
+        self._sock = socket.create_connection((url.hostname, url.port or 80), timeout=self.timeout)
+        key = new_client_key()
+        self._sock.sendall((
+            f"GET {url.path} HTTP/1.1\r\n"
+            f"Host: {url.netloc}\r\n"
+            "Upgrade: websocket\r\n"
+            "Connection: Upgrade\r\n"
+            f"Sec-WebSocket-Key: {key}\r\n"
+            "Sec-WebSocket-Version: 13\r\n\r\n"
+        ).encode("latin-1"))
+        stream = self._sock.makefile("rb")
+        status = stream.readline().decode("latin-1")
+        headers = {}
+        for line in iter(stream.readline, b"\r\n"):
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        if " 101 " not in status or headers.get("sec-websocket-accept") != accept_key(key):
+            self._sock.close()
+            raise CDPError(f"DevTools websocket handshake failed: {status.strip()}")
+        self._sock.settimeout(None)
+        self._reader = threading.Thread(target=self._read_loop, args=(stream,), name="cdp-reader", daemon=True)
+        self._reader.start()
+        return self
+
+    def on(self, event, callback):
+        self.listeners[event].append(callback)
+
+    def off(self, event, callback):
+        if callback in self.listeners.get(event, []):
+            self.listeners[event].remove(callback)
+
+    def send(self, method, params=None, timeout=None):
+        """Run a command and wait for its result"""
+        waiter = self._post(method, params, wait=True)
+        if not waiter["done"].wait(timeout or self.timeout):
+            self._pending.pop(waiter["id"], None)
+            raise CDPError(f"{method} timed out")
+        if "error" in waiter["response"]:
+            raise CDPError(f"{method}: {waiter['response']['error'].get('message')}")
+        return waiter["response"].get("result", {})
+
+    def send_nowait(self, method, params=None):
+        """Fire a command without waiting for (or keeping) its result"""
+        self._post(method, params, wait=False)
+
+    def _post(self, method, params, wait):
+        if self.closed.is_set():
+            raise CDPError("DevTools connection is closed")
+        message_id = next(self._ids)
+        waiter = {"id": message_id, "done": threading.Event(), "response": None} if wait else None
+        if waiter:
+            self._pending[message_id] = waiter
+        payload = json.dumps({"id": message_id, "method": method, "params": params or {}})
+        try:
+            with self._send_lock:
+                self._sock.sendall(encode_frame(payload, mask=True))
+        except OSError as e:
+            self._pending.pop(message_id, None)
+            raise CDPError(f"{method}: {e}") from e
+        return waiter
+
+    def _read_loop(self, stream):
+        def read_exactly(count):
+            data = stream.read(count)
+            if data is None or len(data) < count:
+                raise WebSocketClosed()
+            return data
+
+        assembler = MessageAssembler()
+        try:
+            while True:
+                kind, data = assembler.feed(*read_frame(read_exactly))
+                if kind == "close":
+                    break
+                if kind == "ping":
+                    with self._send_lock:
+                        self._sock.sendall(encode_frame(data, OP_PONG, mask=True))
+                elif kind == "message":
+                    self._dispatch(json.loads(data))
+        except (OSError, WebSocketClosed, ValueError):
+            pass
+        finally:
+            self.closed.set()
+            for waiter in list(self._pending.values()):
+                waiter["response"] = {"error": {"message": "connection closed"}}
+                waiter["done"].set()
+            self._pending.clear()
+
+    def _dispatch(self, message):
+        if "id" in message:
+            waiter = self._pending.pop(message["id"], None)
+            if waiter:
+                waiter["response"] = message
+                waiter["done"].set()
+            return
+        for callback in list(self.listeners.get(message.get("method"), ())):
+            try:
+                callback(message.get("params", {}))
+            except Exception as e:
+                print(f"⚠️ CDP listener for {message.get('method')} failed: {e}")
+
+    def close(self):
+        if self._sock is None or self.closed.is_set():
+            return
+        try:
+            with self._send_lock:
+                self._sock.sendall(encode_frame(b"", OP_CLOSE, mask=True))
+            self._sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._sock.close()
+        self.closed.wait(2)
+
+_SESSIONS = {}
+
+def session_for(driver, fallback_port=None, url_prefix=None):
+    """The open CDPSession for a WebDriver session, shared by every collector attached to it"""
+    session = _SESSIONS.get(driver.session_id)
+    if session is None or session.closed.is_set():
+        session = _SESSIONS[driver.session_id] = CDPSession.attach(driver, fallback_port, url_prefix)
+    return session
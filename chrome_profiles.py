@@ -0,0 +1,139 @@
+"""
+Pre-warmed "golden" Chrome profiles per app build, with cheap per-worker clones
+"""
+import json
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from test_config import TestConfig
+from flutter_idle import wait_for_flutter_app
+
+PROFILE_CACHE_DIR = Path(os.environ.get("PROFILE_CACHE_DIR", ".profile_cache"))
+KEEP_GOLDEN_PROFILES = 3
+# Files at least this big (cached main.dart.js, canvaskit.wasm, V8 code cache)
+# are fingerprinted so a golden profile that Chrome touched gets rebuilt
+MANIFEST_MIN_SIZE = 256 * 1024
+# Chrome refuses to start on a profile that still has these
+LOCK_FILES = {"SingletonLock", "SingletonSocket", "SingletonCookie", "lockfile"}
+MANIFEST_FILE = "golden_manifest.json"
+FICLONE = 0x40049409  # Linux ioctl for reflink copies (btrfs, XFS)
+
+def _reflink(source, target):
+    """Copy-on-write clone of one file; False where the filesystem can't do it"""
+    if not sys.platform.startswith("linux"):
+        return False
+    import fcntl
+    try:
+        with open(source, "rb") as src, open(target, "wb") as dst:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        shutil.copystat(source, target)
+        return True
+    except OSError:
+        if os.path.exists(target):
+            os.remove(target)
+        return False
+
+def _clone_file(source, target):
+    """Reflink if possible, else copy
+
+    Never a hardlink: Chrome rewrites its cache and database files in place,
+    so a linked clone would write straight into the golden profile.
+    """
+    if not _reflink(source, target):
+        shutil.copy2(source, target)
+
+class ProfileManager:
+    """Builds one warmed profile per build hash and hands out disposable clones"""
+
+    def __init__(self, cache_dir=PROFILE_CACHE_DIR):
+        self.cache_dir = Path(cache_dir)
+
+    def golden_path(self, build_hash):
+        return self.cache_dir / build_hash / "golden"
+
+    def ensure_golden(self, build_hash, url=None):
+        """Return the golden profile for build_hash, priming it first if needed"""
+        golden = self.golden_path(build_hash)
+        if self._is_intact(golden):
+            return golden
+
+        shutil.rmtree(golden.parent, ignore_errors=True)
+        staging = self.cache_dir / build_hash / "staging"
+        staging.mkdir(parents=True)
+        print(f"🔥 Priming Chrome profile for build {build_hash[:12]}...")
+        self._prime(staging, url or TestConfig.BASE_URL)
+
+        for name in LOCK_FILES:
+            for lock in staging.rglob(name):
+                lock.unlink()
+        self._write_manifest(staging)
+        os.replace(staging, golden)
+        self._prune(keep=build_hash)
+        return golden
+
+    def _prime(self, profile_dir, url):
+        """Load the app twice so the service worker, HTTP cache and compiled WASM are populated"""
+        options = TestConfig.get_chrome_options(profile_dir=str(profile_dir))
+        driver = webdriver.Chrome(service=Service(TestConfig.get_chromedriver_path()), options=options)
+        try:
+            for _ in range(2):
+                driver.get(url)
+                if wait_for_flutter_app(driver, timeout=120) is None:
+                    raise RuntimeError(f"Flutter app did not load from {url}")
+        finally:
+            driver.quit()
+
+    def _large_files(self, profile_dir):
+        for path in Path(profile_dir).rglob("*"):
+            if path.is_file() and path.stat().st_size >= MANIFEST_MIN_SIZE:
+                yield path
+
+    def _write_manifest(self, profile_dir):
+        manifest = {
+            str(path.relative_to(profile_dir)): [path.stat().st_size, path.stat().st_mtime_ns]
+            for path in self._large_files(profile_dir)
+        }
+        (Path(profile_dir) / MANIFEST_FILE).write_text(json.dumps(manifest))
+
+    def _is_intact(self, golden):
+        """Detect a golden profile that was modified or truncated since it was primed"""
+        try:
+            manifest = json.loads((golden / MANIFEST_FILE).read_text())
+        except (OSError, ValueError):
+            return False
+        for relative, (size, mtime) in manifest.items():
+            path = golden / relative
+            if not path.exists() or [path.stat().st_size, path.stat().st_mtime_ns] != [size, mtime]:
+                print(f"⚠️ Golden profile changed ({relative}), rebuilding")
+                return False
+        return True
+
+    def _prune(self, keep):
+        """Keep only the most recently built golden profiles"""
+        builds = sorted(
+            (p for p in self.cache_dir.iterdir() if p.is_dir() and p.name != keep),
+            key=lambda p: p.stat().st_mtime,
+            reverse=True,
+        )
+        for stale in builds[KEEP_GOLDEN_PROFILES - 1:]:
+            shutil.rmtree(stale, ignore_errors=True)
+
+    def clone(self, build_hash):
+        """Disposable copy of the golden profile for one test or worker"""
+        golden = self.golden_path(build_hash)
+        target = Path(tempfile.mkdtemp(prefix="chrome-profile-"))
+        for root, dirs, files in os.walk(golden):
+            relative = Path(root).relative_to(golden)
+            (target / relative).mkdir(parents=True, exist_ok=True)
+            for name in files:
+                if name in LOCK_FILES or name == MANIFEST_FILE:
+                    continue
+                _clone_file(os.path.join(root, name), target / relative / name)
+        return target
+
+    def discard(self, profile_dir):
+        shutil.rmtree(profile_dir, ignore_errors=True)
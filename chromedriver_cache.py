@@ -0,0 +1,132 @@
+"""
+Offline-first ChromeDriver resolution with a local cache keyed by Chrome version
+"""
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+CACHE_DIR = Path(os.environ.get(
+    "CHROMEDRIVER_CACHE_DIR",
+    Path.home() / ".cache" / "hacienda-elizabeth" / "chromedriver"
+))
+INDEX_FILE = CACHE_DIR / "index.json"
+
+CHROME_BINARIES = [
+    r"C:\Program Files\Google\Chrome\Application\chrome.exe",
+    r"C:\Program Files (x86)\Google\Chrome\Application\chrome.exe",
+    "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
+    "google-chrome",
+    "google-chrome-stable",
+    "chromium",
+    "chromium-browser",
+]
+
+VERSION_PATTERN = re.compile(r"(\d+)\.\d+\.\d+(\.\d+)?")
+
+def _read_version(command):
+    """Run a command and pull the first version number out of its output"""
+    try:
+        output = subprocess.run(command, capture_output=True, text=True, timeout=10).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+    match = VERSION_PATTERN.search(output)
+    return match.group(0) if match else None
+
+def detect_chrome_version():
+    """Installed Chrome version, e.g. '141.0.7390.54', or None"""
+    if sys.platform == "win32":
+        # chrome.exe --version prints nothing on Windows; the registry has it
+        version = _read_version([
+            "reg", "query", r"HKEY_CURRENT_USER\Software\Google\Chrome\BLBeacon", "/v", "version"
+        ])
+        if version:
+            return version
+
+    for binary in CHROME_BINARIES:
+        if os.path.isabs(binary) and not os.path.exists(binary):
+            continue
+        if not os.path.isabs(binary) and not shutil.which(binary):
+            continue
+        version = _read_version([binary, "--version"])
+        if version:
+            return version
+    return None
+
+def _major(version):
+    return version.split(".")[0] if version else None
+
+def _load_index():
+    try:
+        return json.loads(INDEX_FILE.read_text())
+    except (OSError, ValueError):
+        return {}
+
+def _store(major, source):
+    """Copy a driver binary into the cache and record it under the Chrome major version"""
+    target_dir = CACHE_DIR / major
+    target_dir.mkdir(parents=True, exist_ok=True)
+    target = target_dir / Path(source).name
+    if Path(source).resolve() != target.resolve():
+        shutil.copy2(source, target)
+
+    index = _load_index()
+    index[major] = str(target)
+    INDEX_FILE.write_text(json.dumps(index, indent=2))
+    return str(target)
+
+def _cached(index, major):
+    path = index.get(major)
+    return path if path and os.path.exists(path) else None
+
+def _newest_cached(index):
+    """Cached driver for the highest Chrome major version still on disk"""
+    majors = [m for m in index if m.isdigit() and _cached(index, m)]
+    return _cached(index, max(majors, key=int)) if majors else None
+
+def _checked(path, major, reason):
+    """Use a driver picked without a version match, warning when it can't be the right one"""
+    driver_major = _major(_read_version([path, "--version"]))
+    if major is None:
+        print(f"⚠️ Chrome version unknown ({reason}), using ChromeDriver {driver_major or '?'} at {path}")
+    elif driver_major != major:
+        print(f"⚠️ ChromeDriver {driver_major or '?'} at {path} does not match Chrome {major} ({reason})")
+    return path
+
+def resolve_chromedriver():
+    """Path to a ChromeDriver matching the installed Chrome.
+
+    Order: pinned CHROMEDRIVER_PATH, the local cache, a matching chromedriver
+    on PATH, and only then a webdriver-manager download. When Chrome's
+    version can't be detected, the newest cached driver is used instead.
+    """
+    pinned = os.environ.get("CHROMEDRIVER_PATH")
+    if pinned and os.path.exists(pinned):
+        return pinned
+
+    major = _major(detect_chrome_version())
+    index = _load_index()
+
+    if major and _cached(index, major):
+        return _cached(index, major)
+    if major is None and _newest_cached(index):
+        return _checked(_newest_cached(index), None, "no Chrome binary answered --version")
+
+    local = shutil.which("chromedriver")
+    if local and major and _major(_read_version([local, "--version"])) == major:
+        return _store(major, local)
+
+    try:
+        from webdriver_manager.chrome import ChromeDriverManager
+        downloaded = ChromeDriverManager().install()
+    except Exception as e:
+        # Air-gapped: fall back to whatever driver we have
+        fallback = local or _newest_cached(index)
+        if fallback:
+            return _checked(fallback, major, f"download failed: {e}")
+        raise
+
+    return _store(major or _major(_read_version([downloaded, "--version"])) or "unknown", downloaded)
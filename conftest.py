@@ -0,0 +1,124 @@
+"""
+Shared pytest fixtures for Selenium testing
+"""
+import pytest
+from driver_pool import DriverPool
+from run_history import RunHistory
+from screenshot_pipeline import PIPELINE
+from shard_scheduler import DURATIONS_FILE, assign_shards, estimate_durations, load_durations, parse_shard, \
+    save_durations
+from step_timing import TIMER
+from test_config import TestConfig
+
+# Call durations of passed browser tests, keyed by node id; unit tests are
+# left out so they don't skew --slowest-first or the shared durations file
+TEST_DURATIONS = {}
+
+# Tests with a failed setup, call or teardown; their screenshots are kept
+FAILED_TESTS = set()
+
+def pytest_configure(config):
+    PIPELINE.retention = TestConfig.SCREENSHOT_RETENTION
+
+def pytest_addoption(parser):
+    parser.addoption("--shard", default=None,
+                     help="run shard i of n (e.g. 2/4), balanced by historical test durations")
+    parser.addoption("--slowest-first", action="store_true",
+                     help="start the historically slowest tests first")
+    parser.addoption("--durations-file", default=str(DURATIONS_FILE),
+                     help="shared test durations every --shard runner splits by (default: %(default)s)")
+    parser.addoption("--update-durations", action="store_true",
+                     help="rewrite --durations-file from the local run history after the session")
+
+@pytest.hookimpl(trylast=True)
+def pytest_collection_modifyitems(config, items):
+    """Keep this shard's tests, slowest first; runs after -m/-k deselection.
+
+    Shards are split by the shared durations file only, so every runner
+    computes the same partition; without it all tests weigh the same and
+    the split is by test id. --slowest-first alone may use local history.
+    """
+    shard = config.getoption("--shard")
+    if not shard and not config.getoption("--slowest-first"):
+        return
+    
+    try:
+        index, count = parse_shard(shard) if shard else (0, 1)
+    except ValueError as e:
+        raise pytest.UsageError(str(e))
+    
+    if shard:
+        medians = load_durations(config.getoption("--durations-file"))
+        if not medians:
+            print(f"\n⚠️ No durations in {config.getoption('--durations-file')}: shards are split by test "
+                  f"count, not time. Generate it with --update-durations and commit it")
+    else:
+        history = RunHistory()
+        try:
+            medians = history.median_by_name("pytest", "duration")
+        finally:
+            history.close()
+    
+    durations = estimate_durations([item.nodeid for item in items], medians)
+    load, selected_ids = assign_shards(durations, count)[index]
+    order = {test_id: position for position, test_id in enumerate(selected_ids)}
+    
+    deselected = [item for item in items if item.nodeid not in order]
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+    items[:] = sorted((item for item in items if item.nodeid in order), key=lambda item: order[item.nodeid])
+    
+    if shard:
+        print(f"\n🧩 Shard {shard}: {len(items)} test(s), ~{load:.0f}s estimated")
+
+@pytest.fixture(scope="session")
+def driver_pool():
+    """One WebDriver pool for the whole test session"""
+    pool = DriverPool()
+    yield pool
+    pool.close()
+
+@pytest.fixture(scope="session")
+def step_timings():
+    """Export per-action timing histograms and a Chrome trace after the session (browser tests only)"""
+    yield TIMER
+    if not TIMER.by_action:
+        return
+    timings_file, trace_file = TIMER.export(TestConfig.TIMINGS_DIR)
+    print(f"\n⏱️ Step timings: {timings_file} (trace: {trace_file})")
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    """Expose each phase's report to fixtures as item.rep_setup / rep_call / rep_teardown"""
+    outcome = yield
+    report = outcome.get_result()
+    setattr(item, f"rep_{report.when}", report)
+    if report.when == "call" and report.passed and "driver_pool" in item.fixturenames:
+        TEST_DURATIONS[report.nodeid] = report.duration
+
+def pytest_runtest_logreport(report):
+    """Settle each test's screenshots once it is done"""
+    if report.failed:
+        FAILED_TESTS.add(report.nodeid)
+    if report.when == "teardown":
+        PIPELINE.finish(report.nodeid, report.nodeid in FAILED_TESTS)
+
+def pytest_sessionfinish(session):
+    """Write the failed tests' screenshots and store this session's browser test durations in the run history"""
+    stats = PIPELINE.close()
+    if stats["captured"]:
+        print(f"\n📸 Screenshots: {stats['stored']} stored, {stats['duplicates']} deduplicated, "
+              f"{stats['discarded']} from passing tests discarded, {stats['dropped']} dropped")
+    if not TEST_DURATIONS:
+        return
+    history = RunHistory()
+    try:
+        run_id = history.start_run("pytest")
+        for nodeid, duration in TEST_DURATIONS.items():
+            history.add_samples(run_id, nodeid, "duration", [duration])
+        if session.config.getoption("--update-durations"):
+            path = save_durations(history.median_by_name("pytest", "duration"),
+                                  session.config.getoption("--durations-file"))
+            print(f"\n🧩 Test durations written to {path}; commit it so every shard runner uses it")
+    finally:
+        history.close()
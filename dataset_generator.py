@@ -0,0 +1,460 @@
+#!/usr/bin/env python3
+"""
+Seedable synthetic datasets for every schema table, generated in memory-bounded NumPy chunks
+
+Output formats:
+  copy   - one `COPY ... FROM STDIN` file per table (psql -f <file>)
+  jsonl  - one JSON object per row per table (a directory of these seeds supabase_stub.py)
+  prefs  - a shared_preferences blob (localStorage entries) the web app reads on start
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+import numpy as np
+from supabase_stub import load_schema
+
+SCHEMA_FILE = Path("DATABASE_SCHEMA.sql")
+OUTPUT_DIR = Path("reports/datasets")
+CHUNK_ROWS = 100_000
+START_DATE = "2022-01-01"
+DAYS = 3 * 365
+# localStorage holds a few MB per origin; beyond this the blob is unlikely to load
+PREFS_WARN_ROWS = 20_000
+
+# Rows per table for --rows N (the size of the biggest, transactional tables)
+SCALE = {
+    "sugar_records": 1.0,
+    "supplier_transactions": 1.0,
+    "realtime_events": 2.0,
+    "alerts": 0.5,
+    "inventory_items": 0.01,
+    "farming_insights": 0.001,
+}
+
+VARIETIES = np.array(["SP70-1143", "VMC 84-524", "Phil 2018", "Phil 99-1793", "VMC 86-550", "Phil 8013", "CADP Sc1"])
+VARIETY_WEIGHTS = np.array([0.25, 0.2, 0.15, 0.12, 0.1, 0.1, 0.08])
+VARIETY_MAX_HEIGHT_CM = np.array([380, 350, 400, 360, 340, 370, 330])
+FERTILIZERS = np.array(["NPK 14-14-14", "NPK 16-20-0", "Urea 46-0-0", "Ammonium Sulfate 21-0-0", "Organic Compost"])
+
+# (name, category, unit, typical stock, unit price PHP)
+CATALOG = [
+    ("NPK 14-14-14 Fertilizer", "Fertilizer", "bags", 30, 1450.0),
+    ("Urea 46-0-0", "Fertilizer", "bags", 25, 1600.0),
+    ("Ammonium Sulfate", "Fertilizer", "bags", 20, 900.0),
+    ("Seeds SP70-1143", "Seeds", "kg", 150, 18.0),
+    ("Seeds Phil 2018", "Seeds", "kg", 120, 22.0),
+    ("Pesticide Roundup", "Pesticide", "liters", 12, 650.0),
+    ("Herbicide 2,4-D", "Pesticide", "liters", 10, 520.0),
+    ("Irrigation Pipes", "Equipment", "pieces", 15, 420.0),
+    ("Cane Knife", "Equipment", "pieces", 25, 350.0),
+    ("Diesel", "Fuel", "liters", 200, 62.0),
+]
+SUPPLIERS = np.array(["AgriSupply Co.", "SeedMaster Inc.", "FarmChem Ltd.", "Equipment Pro", "Negros Agri Center",
+                      "Visayas Fertilizer Corp.", "Bacolod Farm Depot", "Sugar Belt Trading", "Iloilo Agro Supply",
+                      "Panay Fuel Services", "Green Fields Coop", "Tabuan Hardware"])
+SEVERITIES = np.array(["info", "warning", "success", "error"])
+SEVERITY_WEIGHTS = np.array([0.5, 0.3, 0.15, 0.05])
+ALERT_TEXT = {
+    "info": ("Weather Update", "Rain expected in the next 24 hours"),
+    "warning": ("Low Stock Alert", "Stock is running low"),
+    "success": ("Harvest Ready", "Batch is ready for harvest"),
+    "error": ("Sync Failed", "Could not sync changes with the server"),
+}
+ENTITIES = np.array(["sugar", "inventory", "supplier", "weather", "alert"])
+ENTITY_WEIGHTS = np.array([0.3, 0.25, 0.25, 0.1, 0.1])
+ACTIONS = np.array(["create", "update", "delete"])
+ACTION_WEIGHTS = np.array([0.55, 0.35, 0.1])
+# (city, mean temperature C, rainfall scale mm)
+CITIES = [("Bacolod", 27.5, 9.0), ("Iloilo", 27.8, 8.0), ("Manila", 28.0, 7.0),
+          ("Cebu", 28.2, 5.5), ("Davao", 27.9, 6.0), ("Dumaguete", 27.6, 6.5)]
+SOIL_TYPES = np.array(["Loam", "Clay Loam", "Sandy Loam", "Silty Clay"])
+CLIMATE_ZONES = np.array(["Type I", "Type II", "Type III", "Type IV"])
+MONTHS = np.array(["January", "February", "March", "April", "May", "June", "July",
+                   "August", "September", "October", "November", "December"])
+DEFAULT_SETTINGS = [
+    ("farm_name", "Hacienda Elizabeth", "Name of the farm"),
+    ("farm_location", "Philippines", "Location of the farm"),
+    ("currency", "PHP", "Default currency"),
+    ("language", "en", "Default language"),
+    ("low_stock_threshold", "10", "Low stock alert threshold"),
+    ("auto_sync_enabled", "true", "Enable automatic data sync"),
+    ("notifications_enabled", "true", "Enable push notifications"),
+    ("dark_mode_enabled", "false", "Enable dark mode"),
+    ("export_format", "csv", "Default export format"),
+    ("backup_frequency", "daily", "How often to backup data"),
+]
+
+# LocalRepository's shared_preferences keys and each model's toMap() fields
+PREFS_KEYS = {
+    "sugar_records": ("sugar_records_v1", ["id", "date", "variety", "soil_test", "fertilizer", "height_cm", "notes"]),
+    "inventory_items": ("inventory_items_v1", ["id", "name", "category", "quantity", "unit", "last_updated"]),
+    "supplier_transactions": ("supplier_tx_v1", ["id", "supplier_name", "item_name", "quantity", "unit", "amount",
+                                                 "date", "notes", "archived", "archived_at"]),
+    "realtime_events": ("realtime_events_v1", ["id", "entity", "action", "message", "timestamp"]),
+    "alerts": ("alerts_v1", ["id", "title", "message", "severity", "timestamp", "read"]),
+    "farming_insights": ("farming_insights_v1", [
+        "id", "title", "variety", "water_requirement", "best_planting_month", "harvest_estimation",
+        "fertilizer_type", "fertilizer_amount", "estimated_income", "total_cost", "net_profit",
+        "soil_type", "climate_zone", "recommendations", "created_at", "updated_at"]),
+}
+
+class Context:
+    """Date range shared by every table"""
+
+    def __init__(self, start=START_DATE, days=DAYS):
+        self.start = np.datetime64(start, "D")
+        self.days = days
+        day_of_year = (np.arange(days) + (self.start - self.start.astype("datetime64[Y]")).astype(int)) % 365
+        # Purchases and field work peak around the Oct-Jan planting season
+        seasonal = 1 + 0.6 * np.cos(2 * np.pi * (day_of_year - 330) / 365)
+        self.seasonal_p = seasonal / seasonal.sum()
+
+    @property
+    def end(self):
+        return self.start + self.days
+
+    def dates(self, rng, n, seasonal=False):
+        offsets = rng.choice(self.days, n, p=self.seasonal_p) if seasonal else rng.integers(0, self.days, n)
+        return self.start + offsets
+
+def _timestamps(rng, dates):
+    return dates.astype("datetime64[s]") + rng.integers(6 * 3600, 18 * 3600, len(dates))
+
+def _iso(timestamps):
+    return np.char.add(np.datetime_as_string(timestamps, unit="s"), "+00:00")
+
+def _ids(prefix, index):
+    return np.char.add(f"{prefix}-", index.astype(str))
+
+def _pick(rng, values, weights, n):
+    return values[rng.choice(len(values), n, p=weights / weights.sum())]
+
+def gen_sugar_records(rng, index, ctx):
+    n = len(index)
+    variety = rng.choice(len(VARIETIES), n, p=VARIETY_WEIGHTS)
+    planted = ctx.dates(rng, n, seasonal=True)
+    age = rng.integers(0, 360, n)
+    measured = np.minimum(planted + age, ctx.end - 1)
+    age = (measured - planted).astype(int)
+    # Logistic growth curve to the variety's mature height, with plant-to-plant spread
+    height = VARIETY_MAX_HEIGHT_CM[variety] / (1 + np.exp(-0.025 * (age - 150))) * rng.normal(1, 0.06, n)
+    ph = rng.normal(6.4, 0.45, n).clip(4.5, 8.5)
+    rating = np.select([np.abs(ph - 6.5) <= 0.3, np.abs(ph - 6.5) <= 0.7], ["Excellent", "Good"], "Fair")
+    created = _timestamps(rng, measured)
+    return {
+        "id": _ids("sr", index),
+        "date": measured.astype(str),
+        "variety": VARIETIES[variety],
+        "soil_test": np.char.add(np.char.mod("pH %.1f, ", ph), rating),
+        "fertilizer": FERTILIZERS[rng.integers(0, len(FERTILIZERS), n)],
+        "height_cm": np.maximum(height, 0).round().astype(int),
+        "notes": np.char.add(np.char.mod("Field F-%d, ", rng.integers(1, 40, n)), np.char.mod("day %d", age)),
+        "created_at": _iso(created),
+        "updated_at": _iso(created),
+    }
+
+def gen_inventory_items(rng, index, ctx):
+    n = len(index)
+    item = rng.integers(0, len(CATALOG), n)
+    names, categories, units, stock, _ = (np.array(column) for column in zip(*CATALOG))
+    updated = ctx.dates(rng, n)
+    created = _timestamps(rng, updated)
+    return {
+        "id": _ids("inv", index),
+        "name": np.char.add(names[item], np.char.mod(" #%d", index)),
+        "category": categories[item],
+        "quantity": rng.poisson(stock[item].astype(float)),
+        "unit": units[item],
+        "last_updated": updated.astype(str),
+        "created_at": _iso(created),
+        "updated_at": _iso(created),
+    }
+
+def gen_supplier_transactions(rng, index, ctx):
+    n = len(index)
+    # A few suppliers get most of the business (Zipf-like popularity)
+    popularity = 1 / np.arange(1, len(SUPPLIERS) + 1) ** 1.1
+    supplier = rng.choice(len(SUPPLIERS), n, p=popularity / popularity.sum())
+    item = rng.integers(0, len(CATALOG), n)
+    names, _, units, stock, price = (np.array(column) for column in zip(*CATALOG))
+    quantity = np.maximum(rng.lognormal(np.log(stock[item].astype(float)), 0.6), 1).round().astype(int)
+    amount = (quantity * price[item].astype(float) * rng.lognormal(0, 0.15, n)).round(2)
+    dates = ctx.dates(rng, n, seasonal=True)
+    created = _timestamps(rng, dates)
+    return {
+        "id": _ids("sup", index),
+        "supplier_name": SUPPLIERS[supplier],
+        "item_name": names[item],
+        "quantity": quantity,
+        "unit": units[item],
+        "amount": amount,
+        "date": dates.astype(str),
+        "notes": np.char.mod("PO-%06d", rng.integers(0, 1_000_000, n)),
+        "created_at": _iso(created),
+        "updated_at": _iso(created),
+    }
+
+def gen_alerts(rng, index, ctx):
+    n = len(index)
+    severity = rng.choice(len(SEVERITIES), n, p=SEVERITY_WEIGHTS)
+    titles = np.array([ALERT_TEXT[s][0] for s in SEVERITIES])
+    messages = np.array([ALERT_TEXT[s][1] for s in SEVERITIES])
+    stamp = _timestamps(rng, ctx.dates(rng, n))
+    # Older alerts are more likely to have been read
+    age_days = (ctx.end.astype("datetime64[s]") - stamp).astype(float) / 86400
+    read = rng.random(n) < 1 - np.exp(-age_days / 7)
+    return {
+        "id": _ids("alert", index),
+        "title": titles[severity],
+        "message": messages[severity],
+        "severity": SEVERITIES[severity],
+        "read": read,
+        "timestamp": _iso(stamp),
+        "created_at": _iso(stamp),
+    }
+
+def gen_realtime_events(rng, index, ctx):
+    n = len(index)
+    entity = _pick(rng, ENTITIES, ENTITY_WEIGHTS, n)
+    action = _pick(rng, ACTIONS, ACTION_WEIGHTS, n)
+    stamp = _timestamps(rng, ctx.dates(rng, n))
+    return {
+        "id": _ids("event", index),
+        "entity": entity,
+        "action": action,
+        "message": np.char.add(np.char.add(np.char.capitalize(entity), " record "), np.char.add(action, "d")),
+        "timestamp": _iso(stamp),
+        "created_at": _iso(stamp),
+    }
+
+def gen_weather_data(rng, index, ctx):
+    """One row per city per day, in date order"""
+    n = len(index)
+    city = index % len(CITIES)
+    dates = ctx.start + (index // len(CITIES)) % ctx.days
+    names, mean_temp, rain_scale = (np.array(column) for column in zip(*CITIES))
+    day_of_year = (dates - dates.astype("datetime64[Y]")).astype(int)
+    # Wet season June-November
+    wet = 0.5 + 0.5 * np.cos(2 * np.pi * (day_of_year - 230) / 365)
+    precipitation = rng.gamma(0.6 + 1.4 * wet, rain_scale[city].astype(float) * (0.3 + wet))
+    conditions = np.select([precipitation > 20, precipitation > 5, precipitation > 0.5],
+                           ["Heavy Rain", "Rain", "Cloudy"], "Sunny")
+    return {
+        "id": _ids("wx", index),
+        "city": names[city],
+        "date": dates.astype(str),
+        "temperature": (mean_temp[city].astype(float) + 1.5 * np.cos(2 * np.pi * (day_of_year - 120) / 365)
+                        + rng.normal(0, 0.8, n)).round(2),
+        "humidity": np.clip(68 + 22 * wet + rng.normal(0, 5, n), 40, 100).round().astype(int),
+        "precipitation": precipitation.round(2),
+        "wind_speed": rng.gamma(2.0, 3.5, n).round(2),
+        "conditions": conditions,
+        "created_at": _iso(_timestamps(rng, dates)),
+    }
+
+def gen_farm_settings(rng, index, ctx):
+    defaults = len(DEFAULT_SETTINGS)
+    keys, values, descriptions = [], [], []
+    for i in index.tolist():
+        if i < defaults:
+            key, value, description = DEFAULT_SETTINGS[i]
+        else:
+            key, value, description = f"custom_setting_{i}", str(i), "Generated setting"
+        keys.append(key)
+        values.append(value)
+        descriptions.append(description)
+    created = _iso(_timestamps(rng, np.full(len(index), ctx.start)))
+    return {
+        "id": _ids("setting", index),
+        "setting_key": np.array(keys),
+        "setting_value": np.array(values),
+        "description": np.array(descriptions),
+        "created_at": created,
+        "updated_at": created,
+    }
+
+def gen_farming_insights(rng, index, ctx):
+    n = len(index)
+    variety = rng.choice(len(VARIETIES), n, p=VARIETY_WEIGHTS)
+    hectares = rng.uniform(1, 25, n)
+    tons = hectares * rng.normal(65, 10, n).clip(30, 100)
+    income = (tons * rng.normal(2200, 150, n)).round(2)
+    cost = (hectares * rng.normal(85000, 12000, n)).round(2)
+    created = _iso(_timestamps(rng, ctx.dates(rng, n)))
+    return {
+        "id": _ids("insight", index),
+        "title": np.char.add("Insight for ", VARIETIES[variety]),
+        "variety": VARIETIES[variety],
+        "water_requirement": np.array(["Low", "Moderate", "High"])[rng.integers(0, 3, n)],
+        "best_planting_month": MONTHS[rng.choice([9, 10, 11, 0, 4, 5], n)],
+        "harvest_estimation": np.char.mod("%d months", rng.integers(10, 15, n)),
+        "fertilizer_type": FERTILIZERS[rng.integers(0, len(FERTILIZERS), n)],
+        "fertilizer_amount": np.char.mod("%d bags/ha", rng.integers(6, 14, n)),
+        "estimated_income": income,
+        "total_cost": cost,
+        "net_profit": (income - cost).round(2),
+        "soil_type": SOIL_TYPES[rng.integers(0, len(SOIL_TYPES), n)],
+        "climate_zone": CLIMATE_ZONES[rng.integers(0, len(CLIMATE_ZONES), n)],
+        "recommendations": np.char.mod("Apply fertilizer in %d splits", rng.integers(2, 4, n)),
+        "created_at": created,
+        "updated_at": created,
+    }
+
+GENERATORS = {
+    "sugar_records": gen_sugar_records,
+    "inventory_items": gen_inventory_items,
+    "supplier_transactions": gen_supplier_transactions,
+    "alerts": gen_alerts,
+    "realtime_events": gen_realtime_events,
+    "weather_data": gen_weather_data,
+    "farm_settings": gen_farm_settings,
+    "farming_insights": gen_farming_insights,
+}
+
+def default_counts(rows, tables, days=DAYS):
+    counts = {name: max(1, int(rows * SCALE[name])) for name in tables if name in SCALE}
+    if "weather_data" in tables:
+        counts["weather_data"] = len(CITIES) * days
+    if "farm_settings" in tables:
+        counts["farm_settings"] = len(DEFAULT_SETTINGS)
+    return counts
+
+def generate(table, count, seed=0, chunk_rows=CHUNK_ROWS, ctx=None):
+    """Yield column dicts of at most chunk_rows rows.
+
+    Each chunk has its own RNG stream derived from (seed, table, chunk), so a
+    given seed and chunk size always reproduce the same rows.
+    """
+    ctx = ctx or Context()
+    table_key = sorted(GENERATORS).index(table)
+    for chunk, start in enumerate(range(0, count, chunk_rows)):
+        rng = np.random.default_rng([seed, table_key, chunk])
+        index = np.arange(start, min(start + chunk_rows, count))
+        yield GENERATORS[table](rng, index, ctx)
+
+def _copy_text(values):
+    """Column array -> strings in COPY text format"""
+    if values.dtype == bool:
+        return np.where(values, "t", "f")
+    if values.dtype.kind == "f":
+        return np.char.mod("%.2f", values)
+    if values.dtype.kind in "iu":
+        return values.astype(str)
+    text = values.astype(str)
+    for raw, escaped in (("\\", "\\\\"), ("\t", "\\t"), ("\n", "\\n"), ("\r", "\\r")):
+        text = np.char.replace(text, raw, escaped)
+    return text
+
+def copy_block(chunk, columns):
+    """One chunk as COPY text rows, ready for a file or cursor.copy_expert"""
+    text = [_copy_text(chunk[c]) for c in columns]
+    return "\n".join(map("\t".join, zip(*text))) + "\n"
+
+def write_copy(path, table, columns, chunks):
+    with open(path, "w", encoding="utf-8") as out:
+        out.write(f"COPY {table} ({', '.join(columns)}) FROM STDIN;\n")
+        for chunk in chunks:
+            out.write(copy_block(chunk, columns))
+        out.write("\\.\n")
+
+def _rows(chunk, columns):
+    values = [chunk[c].tolist() if c in chunk else [None] * len(chunk["id"]) for c in columns]
+    for row in zip(*values):
+        yield dict(zip(columns, row))
+
+def write_jsonl(path, columns, chunks):
+    with open(path, "w", encoding="utf-8") as out:
+        for chunk in chunks:
+            out.writelines(json.dumps(row) + "\n" for row in _rows(chunk, columns))
+
+def write_prefs(out, table, chunks):
+    """Stream one localStorage entry: flutter.<key> -> JSON list of model JSON strings"""
+    key, fields = PREFS_KEYS[table]
+    out.write(f"  {json.dumps('flutter.' + key)}: \"[")
+    first = True
+    for chunk in chunks:
+        if "archived" in fields:
+            chunk = {**chunk, "archived": np.zeros(len(chunk["id"]), dtype=bool)}
+        for row in _rows(chunk, fields):
+            item = ("" if first else ",") + json.dumps(json.dumps(row))
+            # Escaping is per character, so escaped pieces concatenate into the escaped whole
+            out.write(json.dumps(item)[1:-1])
+            first = False
+    out.write("]\"")
+
+def write_dataset(out_dir, fmt, counts, seed=0, chunk_rows=CHUNK_ROWS, schema=SCHEMA_FILE, ctx=None):
+    """Generate every table in counts; returns the files written"""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    ctx = ctx or Context()
+    tables = load_schema(schema)
+    written = []
+
+    if fmt == "prefs":
+        path = out_dir / "shared_preferences.json"
+        with open(path, "w", encoding="utf-8") as out:
+            out.write("{\n")
+            entries = [t for t in counts if t in PREFS_KEYS]
+            for i, table in enumerate(entries):
+                if counts[table] > PREFS_WARN_ROWS:
+                    print(f"⚠️ {table}: {counts[table]} rows will likely exceed the browser's localStorage quota")
+                write_prefs(out, table, generate(table, counts[table], seed, chunk_rows, ctx))
+                out.write(",\n" if i < len(entries) - 1 else "\n")
+            out.write("}\n")
+        return [path]
+
+    for table, count in counts.items():
+        columns = list(tables[table].columns) if table in tables else None
+        if columns is None:
+            print(f"⚠️ {table} is not in {schema}, skipped")
+            continue
+        chunks = generate(table, count, seed, chunk_rows, ctx)
+        path = out_dir / f"{table}.{'copy.sql' if fmt == 'copy' else 'jsonl'}"
+        if fmt == "copy":
+            write_copy(path, table, columns, chunks)
+        else:
+            write_jsonl(path, columns, chunks)
+        print(f"✅ {table}: {count} rows -> {path}")
+        written.append(path)
+    return written
+
+def apply_prefs_blob(driver, path):
+    """Load a prefs blob into the page's localStorage; reload the app afterwards"""
+    entries = json.loads(Path(path).read_text(encoding="utf-8"))
+    driver.execute_script(
+        "var entries = arguments[0];"
+        "Object.keys(entries).forEach(function (k) { localStorage.setItem(k, entries[k]); });",
+        entries,
+    )
+
+def parse_counts(values):
+    counts = {}
+    for value in values or []:
+        table, _, count = value.partition("=")
+        counts[table] = int(count)
+    return counts
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Synthetic Hacienda Elizabeth datasets")
+    parser.add_argument("--format", choices=["copy", "jsonl", "prefs"], default="copy")
+    parser.add_argument("--rows", type=int, default=10_000,
+                        help="rows for the largest tables; others scale from it")
+    parser.add_argument("--table", action="append", metavar="NAME=COUNT", help="override one table's row count")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--start", default=START_DATE)
+    parser.add_argument("--days", type=int, default=DAYS)
+    parser.add_argument("--schema", default=str(SCHEMA_FILE))
+    parser.add_argument("--out", default=str(OUTPUT_DIR))
+    args = parser.parse_args(argv)
+
+    schema_tables = load_schema(args.schema)
+    counts = default_counts(args.rows, [t for t in schema_tables if t in GENERATORS], args.days)
+    counts.update(parse_counts(args.table))
+    write_dataset(args.out, args.format, counts, args.seed, args.chunk_rows, args.schema,
+                  Context(args.start, args.days))
+    return True
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,102 @@
+"""
+Session-wide WebDriver pool for Selenium testing
+"""
+import threading
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chrome.service import Service
+from test_config import TestConfig
+from build_cache import hash_build_inputs
+from chrome_profiles import ProfileManager
+
+# Clears shared_preferences (stored in localStorage on web) and reports the
+# window size. The app only reads preferences at startup, so a reload follows.
+RESET_SCRIPT = """
+window.localStorage.clear();
+window.sessionStorage.clear();
+return {width: window.outerWidth, height: window.outerHeight};
+"""
+
+class DriverPool:
+    """Keeps Chrome drivers alive across tests and resets them between uses"""
+
+    def __init__(self):
+        self._idle = []
+        self._drivers = []
+        self._profiles = {}
+        self._lock = threading.Lock()
+        self.profile_manager = ProfileManager() if TestConfig.USE_WARM_PROFILE else None
+        self.build_hash = None
+
+    def acquire(self):
+        """Get a driver that has just (re)loaded the app with empty storage"""
+        with self._lock:
+            driver = self._idle.pop() if self._idle else None
+
+        if driver is not None:
+            try:
+                self.reset(driver)
+                return driver
+            except WebDriverException as e:
+                print(f"⚠️ Pooled driver unusable, replacing it: {e}")
+                self.discard(driver)
+
+        return self._create_driver()
+
+    def release(self, driver):
+        """Return a driver to the pool for the next test"""
+        with self._lock:
+            if driver in self._drivers:
+                self._idle.append(driver)
+
+    def reset(self, driver):
+        """State reset between tests: clear storage, then reload the app in the same Chrome"""
+        state = driver.execute_script(RESET_SCRIPT)
+        width, height = TestConfig.WINDOW_SIZE
+        if (state['width'], state['height']) != (width, height):
+            driver.set_window_size(width, height)
+        driver.get(TestConfig.BASE_URL)
+
+    def discard(self, driver):
+        """Quit a driver and drop it from the pool"""
+        with self._lock:
+            if driver in self._drivers:
+                self._drivers.remove(driver)
+            if driver in self._idle:
+                self._idle.remove(driver)
+            profile_dir = self._profiles.pop(id(driver), None)
+        try:
+            driver.quit()
+        except WebDriverException:
+            pass
+        if profile_dir:
+            self.profile_manager.discard(profile_dir)
+
+    def close(self):
+        """Quit every driver at the end of the session"""
+        with self._lock:
+            drivers = list(self._drivers)
+        for driver in drivers:
+            self.discard(driver)
+
+    def _warm_profile(self):
+        """Clone of the golden profile for the current build, or None"""
+        if not self.profile_manager:
+            return None
+        if self.build_hash is None:
+            self.build_hash = hash_build_inputs()
+            self.profile_manager.ensure_golden(self.build_hash)
+        return self.profile_manager.clone(self.build_hash)
+
+    def _create_driver(self):
+        profile_dir = self._warm_profile()
+        service = Service(TestConfig.get_chromedriver_path())
+        driver = webdriver.Chrome(service=service, options=TestConfig.get_chrome_options(profile_dir))
+        driver.implicitly_wait(TestConfig.IMPLICIT_WAIT)
+        driver.get(TestConfig.BASE_URL)
+
+        with self._lock:
+            self._drivers.append(driver)
+            if profile_dir:
+                self._profiles[id(driver)] = profile_dir
+        return driver
@@ -0,0 +1,128 @@
+"""
+Event-driven "Flutter idle" wait for Selenium testing
+"""
+import time
+from test_config import TestConfig
+
+# Installs a probe on first use that counts pending animation frames and
+# in-flight fetch/XHR requests, then reports the current state together with
+# a signature of the semantics tree.
+IDLE_PROBE_SCRIPT = """
+if (!window.__flutterIdleProbe) {
+    var probe = {frames: 0, lastFrame: 0, pending: new Set(), inflight: 0};
+    var raf = window.requestAnimationFrame.bind(window);
+    var caf = window.cancelAnimationFrame.bind(window);
+    window.requestAnimationFrame = function (callback) {
+        var id = raf(function (timestamp) {
+            probe.pending.delete(id);
+            probe.frames++;
+            probe.lastFrame = performance.now();
+            callback(timestamp);
+        });
+        probe.pending.add(id);
+        return id;
+    };
+    window.cancelAnimationFrame = function (id) {
+        probe.pending.delete(id);
+        caf(id);
+    };
+
+    var fetch = window.fetch.bind(window);
+    window.fetch = function () {
+        probe.inflight++;
+        return fetch.apply(null, arguments).finally(function () { probe.inflight--; });
+    };
+    var send = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        probe.inflight++;
+        this.addEventListener('loadend', function () { probe.inflight--; }, {once: true});
+        return send.apply(this, arguments);
+    };
+
+    window.__flutterIdleProbe = probe;
+}
+
+var probe = window.__flutterIdleProbe;
+var nodes = document.querySelectorAll('flt-semantics');
+var hash = nodes.length;
+for (var i = 0; i < nodes.length; i++) {
+    var label = nodes[i].getAttribute('aria-label') || nodes[i].textContent || '';
+    for (var j = 0; j < label.length; j++) {
+        hash = (hash * 31 + label.charCodeAt(j)) | 0;
+    }
+}
+return {
+    frames: probe.frames,
+    lastFrame: probe.lastFrame,
+    pendingFrames: probe.pending.size,
+    inflight: probe.inflight,
+    semantics: hash
+};
+"""
+
+def wait_for_flutter_idle(driver, quiet_window=None, timeout=None):
+    """Wait until no frames, requests or semantics changes for quiet_window seconds.
+
+    A widget that animates forever (spinner, weather icon) never stops
+    producing frames, so frames alone stop counting once the semantics tree
+    and the network have been still for IDLE_ANIMATION_WINDOW.
+    Returns the number of seconds actually waited.
+    """
+    quiet_window = TestConfig.IDLE_QUIET_WINDOW if quiet_window is None else quiet_window
+    timeout = TestConfig.IDLE_TIMEOUT if timeout is None else timeout
+    animation_window = max(TestConfig.IDLE_ANIMATION_WINDOW, quiet_window)
+
+    start = time.monotonic()
+    last_state = None
+    quiet_since = None
+    stable_since = None
+
+    while True:
+        state = driver.execute_script(IDLE_PROBE_SCRIPT)
+        now = time.monotonic()
+
+        settled = (
+            state['pendingFrames'] == 0
+            and state['inflight'] == 0
+            and last_state is not None
+            and (state['frames'], state['semantics']) == (last_state['frames'], last_state['semantics'])
+        )
+        if not settled:
+            quiet_since = None
+        elif quiet_since is None:
+            quiet_since = now
+        stable = (
+            state['inflight'] == 0
+            and last_state is not None
+            and state['semantics'] == last_state['semantics']
+        )
+        if not stable:
+            stable_since = None
+        elif stable_since is None:
+            stable_since = now
+        last_state = state
+
+        if quiet_since is not None and now - quiet_since >= quiet_window:
+            return now - start
+        if stable_since is not None and now - stable_since >= animation_window:
+            return now - start
+        if now - start >= timeout:
+            print(f"⚠️ Flutter app did not settle within {timeout}s")
+            return now - start
+
+        time.sleep(TestConfig.IDLE_POLL_INTERVAL)
+
+def wait_for_flutter_app(driver, timeout=30):
+    """Wait for flt-glass-pane and then for the app to settle.
+
+    Returns the seconds waited, or None if the app never mounted.
+    """
+    start = time.monotonic()
+    while not driver.execute_script("return document.querySelector('flt-glass-pane') !== null;"):
+        if time.monotonic() - start >= timeout:
+            return None
+        time.sleep(TestConfig.IDLE_POLL_INTERVAL)
+
+    remaining = max(timeout - (time.monotonic() - start), 0)
+    wait_for_flutter_idle(driver, timeout=remaining)
+    return time.monotonic() - start
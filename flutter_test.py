@@ -2,7 +2,6 @@
 """
 Flutter-specific test script for Hacienda Elizabeth
 """
-import time
 import os
 from selenium import webdriver
 from selenium.webdriver.common.by import By
@@ -12,6 +11,9 @@ from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
+from test_config import TestConfig
+from flutter_idle import wait_for_flutter_app, wait_for_flutter_idle
+from semantics_snapshot import SemanticsSnapshot
 
 def flutter_test():
     """Run Flutter-specific tests"""
@@ -27,7 +29,8 @@ def flutter_test():
     options.add_argument("--disable-logging")
     options.add_argument("--disable-web-security")
     options.add_argument("--allow-running-insecure-content")
-    options.add_argument("--remote-debugging-port=9222")
+    TestConfig.apply_worker_isolation(options)
+    TestConfig.apply_asset_proxy(options)
     options.add_argument("--window-size=1920,1080")
     options.add_argument("--disable-features=VizDisplayCompositor")
     
@@ -39,7 +42,7 @@ def flutter_test():
     driver = None
     try:
         print("Creating Chrome driver...")
-        driver = webdriver.Chrome(options=options)
+        driver = webdriver.Chrome(service=Service(TestConfig.get_chromedriver_path()), options=options)
         print("SUCCESS: Chrome driver created")
         
         # Navigate to the app
@@ -48,7 +51,13 @@ def flutter_test():
         
         # Wait for Flutter app to load
         print("Waiting for Flutter app to load...")
-        time.sleep(25)  # Give plenty of time for Flutter to initialize
+        waited = wait_for_flutter_app(driver)
+        if waited is not None:
+            print(f"Flutter app settled after {waited:.2f}s")
+        else:
+            print("WARNING: Flutter app did not mount in time")
+        
+        snapshot = SemanticsSnapshot(driver)
         
         # Test 1: Check Flutter app structure
         print("\n--- Test 1: Flutter App Structure ---")
@@ -61,9 +70,11 @@ def flutter_test():
                 print("WARNING: No Flutter glass panes found")
             
             # Check for Flutter semantics
-            semantics_elements = driver.find_elements(By.TAG_NAME, "flt-semantics")
-            if semantics_elements:
-                print(f"SUCCESS: Found {len(semantics_elements)} Flutter semantics elements")
+            SemanticsSnapshot.enable_semantics(driver)
+            wait_for_flutter_idle(driver)
+            snapshot.capture()
+            if snapshot.nodes:
+                print(f"SUCCESS: Found {len(snapshot.nodes)} Flutter semantics elements")
             else:
                 print("WARNING: No Flutter semantics elements found")
                 
@@ -74,15 +85,12 @@ def flutter_test():
         print("\n--- Test 2: Clickable Elements ---")
         try:
             # Look for any clickable elements
-            clickable_elements = driver.find_elements(By.XPATH, "//*[@role='button' or @role='link' or @role='tab' or contains(@class, 'clickable')]")
+            clickable_elements = [node for role in ("button", "link", "tab") for node in snapshot.find(role=role)]
             if clickable_elements:
                 print(f"SUCCESS: Found {len(clickable_elements)} clickable elements")
-                for i, elem in enumerate(clickable_elements[:5]):  # Show first 5
-                    try:
-                        text = elem.get_attribute("aria-label") or elem.text or "No text"
-                        print(f"  Element {i+1}: {text[:50]}")
-                    except:
-                        print(f"  Element {i+1}: [No accessible text]")
+                for i, node in enumerate(clickable_elements[:5]):  # Show first 5
+                    text = node.label or "No text"
+                    print(f"  Element {i+1}: {text[:50]}")
             else:
                 print("WARNING: No clickable elements found")
                 
@@ -127,7 +135,7 @@ def flutter_test():
             center_x = window_size['width'] // 2
             center_y = window_size['height'] // 2
             actions.move_by_offset(center_x, center_y).click().perform()
-            time.sleep(2)
+            wait_for_flutter_idle(driver)
             print("SUCCESS: Clicked in center of screen")
             
             # Try clicking in different quadrants
@@ -141,7 +149,7 @@ def flutter_test():
             for i, (x, y) in enumerate(quadrants):
                 try:
                     actions.move_by_offset(x - center_x, y - center_y).click().perform()
-                    time.sleep(1)
+                    wait_for_flutter_idle(driver)
                     print(f"SUCCESS: Clicked in quadrant {i+1}")
                 except:
                     print(f"WARNING: Could not click in quadrant {i+1}")
@@ -0,0 +1,423 @@
+#!/usr/bin/env python3
+"""
+Query workload benchmark and index advisor for the Supabase schema
+
+Loads dataset_generator.py data at scale into a local PostgreSQL database,
+replays benchmarks/workload.sql with EXPLAIN (ANALYZE, BUFFERS), derives
+composite and partial index candidates from the scans, filters and sorts in
+the plans, and keeps the ones that measurably cut the workload's latency.
+
+Candidates are picked greedily: each round measures every remaining candidate
+on its own table's queries, keeps the best if it saves at least --min-gain of
+the weighted time, and re-measures the rest against it.
+"""
+import argparse
+import io
+import json
+import os
+import re
+import statistics
+import sys
+from datetime import datetime
+from pathlib import Path
+import psycopg2
+from dataset_generator import GENERATORS, SCHEMA_FILE, Context, copy_block, default_counts, generate
+from supabase_stub import load_schema
+
+WORKLOAD_FILE = Path("benchmarks/workload.sql")
+RESULTS_DIR = Path("reports/index_advisor")
+DEFAULT_DSN = "dbname=hacienda_bench"
+DEFAULT_ROWS = 1_000_000
+RUNS = 5
+MIN_GAIN = 0.10
+
+SCAN_NODES = {"Seq Scan", "Index Scan", "Index Only Scan", "Bitmap Heap Scan"}
+# Nodes a Sort may sit above and still be satisfiable by an index on the scanned table
+PASS_THROUGH = {"Gather", "Gather Merge", "Limit", "Incremental Sort"}
+COMPARISON = re.compile(r'^\(*"?([a-z_][a-z0-9_]*)"?\s*(=|<>|>=|<=|>|<|~~\*?|!~~\*?)\s')
+BOOLEAN = re.compile(r'^\(*(NOT\s+)?"?([a-z_][a-z0-9_]*)"?\)*$')
+# Roles the Supabase schema grants to; a plain local PostgreSQL doesn't have them
+SUPABASE_ROLES = ("anon", "authenticated")
+INDEX_DEF = re.compile(r"USING \w+ \((.+?)\)(?: WHERE \((.+)\))?$")
+
+def load_workload(path=WORKLOAD_FILE):
+    """Queries from a workload file: -- name:/-- weight:/-- source: headers followed by SQL"""
+    queries, current = [], None
+    for line in Path(path).read_text(encoding="utf-8").splitlines():
+        header = re.match(r"--\s*(name|weight|source):\s*(.+)", line.strip())
+        if header:
+            key, value = header.groups()
+            if key == "name":
+                current = {"name": value.strip(), "weight": 1.0, "source": "", "sql": []}
+                queries.append(current)
+            elif current is not None:
+                current[key] = float(value) if key == "weight" else value.strip()
+        elif current is not None and line.strip() and not line.strip().startswith("--"):
+            current["sql"].append(line)
+    for query in queries:
+        query["sql"] = "\n".join(query["sql"]).strip().rstrip(";")
+    return queries
+
+def reset_database(conn, schema=SCHEMA_FILE):
+    """Drop the schema's tables and recreate them (indexes, views, triggers) from the SQL file.
+
+    The anon/authenticated roles its GRANTs name are created first if missing.
+    """
+    tables = load_schema(schema)
+    with conn.cursor() as cur:
+        cur.execute("SELECT rolname FROM pg_roles WHERE rolname = ANY(%s)", (list(SUPABASE_ROLES),))
+        present = {name for (name,) in cur.fetchall()}
+        for role in SUPABASE_ROLES:
+            if role not in present:
+                cur.execute(f"CREATE ROLE {role} NOLOGIN")
+        cur.execute("DROP TABLE IF EXISTS %s CASCADE" % ", ".join(tables))
+        cur.execute(Path(schema).read_text(encoding="utf-8"))
+    conn.commit()
+
+def load_data(conn, rows, seed=0, schema=SCHEMA_FILE):
+    """Replace the sample rows with generated ones, streamed chunk by chunk through COPY"""
+    tables = load_schema(schema)
+    counts = default_counts(rows, [t for t in tables if t in GENERATORS])
+    ctx = Context()
+    with conn.cursor() as cur:
+        cur.execute("TRUNCATE %s" % ", ".join(counts))
+        for table, count in counts.items():
+            columns = list(tables[table].columns)
+            statement = f"COPY {table} ({', '.join(columns)}) FROM STDIN"
+            for chunk in generate(table, count, seed, ctx=ctx):
+                cur.copy_expert(statement, io.StringIO(copy_block(chunk, columns)))
+            print(f"✅ {table}: {count} rows")
+    conn.commit()
+    conn.autocommit = True
+    with conn.cursor() as cur:
+        cur.execute("VACUUM ANALYZE")
+    conn.autocommit = False
+    return counts
+
+def walk(node, parents=()):
+    """Every plan node with the chain of nodes above it"""
+    yield node, parents
+    for child in node.get("Plans", []):
+        yield from walk(child, parents + (node,))
+
+def explain(conn, sql):
+    with conn.cursor() as cur:
+        cur.execute("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + sql)
+        plan = cur.fetchone()[0][0]
+    conn.rollback()  # the workload's DELETEs must not change the data between runs
+    return plan
+
+def measure(conn, query, runs=RUNS):
+    """Median execution time over runs (after one warm-up) and the plan of the median run"""
+    explain(conn, query["sql"])
+    plans = sorted((explain(conn, query["sql"]) for _ in range(runs)), key=lambda p: p["Execution Time"])
+    median = plans[len(plans) // 2]["Plan"]
+    return {
+        "median_ms": round(statistics.median(p["Execution Time"] for p in plans), 3),
+        "min_ms": round(plans[0]["Execution Time"], 3),
+        "shared_hit": median.get("Shared Hit Blocks", 0),
+        "shared_read": median.get("Shared Read Blocks", 0),
+        "scans": [f"{n['Node Type']} {'using ' + n['Index Name'] + ' ' if 'Index Name' in n else ''}on {n['Relation Name']}"
+                  for n, _ in walk(median) if n["Node Type"] in SCAN_NODES],
+        "indexes_used": sorted({n["Index Name"] for n, _ in walk(median) if "Index Name" in n}),
+        "tables": sorted({n["Relation Name"] for n, _ in walk(median) if "Relation Name" in n}),
+        "plan": median,
+    }
+
+def _split_and(condition):
+    """Top-level AND terms of a plan condition, respecting parentheses and quoted literals"""
+    condition = condition.strip()
+    while condition.startswith("(") and condition.endswith(")") and _balanced(condition[1:-1]):
+        condition = condition[1:-1].strip()
+    terms, depth, quoted, start = [], 0, False, 0
+    for i, char in enumerate(condition):
+        if char == "'":
+            quoted = not quoted
+        elif not quoted and char == "(":
+            depth += 1
+        elif not quoted and char == ")":
+            depth -= 1
+        elif not quoted and depth == 0 and condition.startswith(" AND ", i):
+            terms.append(condition[start:i])
+            start = i + 5
+    terms.append(condition[start:])
+    return [t.strip() for t in terms if t.strip()]
+
+def _balanced(text):
+    depth = 0
+    for char in text:
+        depth += {"(": 1, ")": -1}.get(char, 0)
+        if depth < 0:
+            return False
+    return depth == 0
+
+def predicates(condition, columns):
+    """(equality columns, range columns, boolean flag predicates) referenced by a condition"""
+    equality, ranges, flags = [], [], []
+    for term in _split_and(condition or ""):
+        flag = BOOLEAN.match(term)
+        if flag and flag.group(2) in columns:
+            flags.append(f"{flag.group(1) or ''}{flag.group(2)}")
+            continue
+        comparison = COMPARISON.match(term)
+        if comparison and comparison.group(1) in columns:
+            column, op = comparison.groups()
+            target = equality if op == "=" else ranges if op in ("<", "<=", ">", ">=") else None
+            if target is not None and column not in target:
+                target.append(column)
+    return equality, ranges, flags
+
+def sort_keys(parents, table, columns):
+    """Columns (with direction) of a Sort directly above the scan, if an index could supply that order"""
+    for parent in reversed(parents):
+        if parent["Node Type"] in PASS_THROUGH:
+            continue
+        if parent["Node Type"] != "Sort":
+            return []
+        keys = []
+        for key in parent["Sort Key"]:
+            match = re.match(rf'^(?:{table}\.)?"?([a-z_][a-z0-9_]*)"?( DESC)?$', key.strip())
+            if not match or match.group(1) not in columns:
+                return []
+            keys.append(match.group(1) + (match.group(2) or ""))
+        return keys
+    return []
+
+def _bare(column):
+    return column.split()[0].strip('"')
+
+def candidates_for(query, result, table_columns):
+    """Index candidates suggested by one query's plan"""
+    found = []
+    for node, parents in walk(result["plan"]):
+        if node["Node Type"] not in SCAN_NODES:
+            continue
+        table = node["Relation Name"]
+        columns = table_columns[table]
+        conditions = " AND ".join(f"({node[k]})" for k in ("Index Cond", "Recheck Cond", "Filter") if k in node)
+        equality, ranges, flags = predicates(conditions, columns)
+        ordering = sort_keys(parents, table, columns)
+
+        key = list(equality)
+        ordered = [k for k in ordering if _bare(k) not in key]
+        if ordered and (not ranges or ranges[0] == _bare(ordered[0])):
+            key += ordered
+        elif ranges:
+            key.append(ranges[0])
+        flag_columns = {f.split()[-1] for f in flags}
+        key = [k for k in key if _bare(k) not in flag_columns]
+        if not key and flags:
+            key = ["id"]  # a small partial index the planner can count/scan instead of the heap
+        if not key:
+            continue
+        where = " AND ".join(sorted(set(flags))) or None
+        found.append({"table": table, "columns": key, "where": where, "queries": [query["name"]]})
+    return found
+
+def index_name(candidate):
+    parts = [candidate["table"]] + [_bare(c) for c in candidate["columns"]]
+    if candidate["where"]:
+        parts.append(re.sub(r"\W+", "_", candidate["where"].lower()))
+    return ("idx_" + "_".join(parts))[:63]
+
+def index_ddl(candidate):
+    ddl = f"CREATE INDEX {index_name(candidate)} ON {candidate['table']} ({', '.join(candidate['columns'])})"
+    return ddl + (f" WHERE {candidate['where']}" if candidate["where"] else "")
+
+def existing_indexes(conn, tables):
+    """{index name: (table, [columns], predicate or None, unique)} for the schema's tables"""
+    with conn.cursor() as cur:
+        cur.execute(
+            "SELECT i.indexname, i.tablename, i.indexdef, x.indisunique "
+            "FROM pg_indexes i JOIN pg_class c ON c.relname = i.indexname "
+            "JOIN pg_index x ON x.indexrelid = c.oid "
+            "WHERE i.schemaname = 'public' AND i.tablename = ANY(%s)", (list(tables),))
+        rows = cur.fetchall()
+    conn.rollback()
+    indexes = {}
+    for name, table, definition, unique in rows:
+        match = INDEX_DEF.search(definition)
+        if match:
+            columns = [_bare(c) for c in match.group(1).split(",")]
+            indexes[name] = (table, columns, match.group(2), unique)
+    return indexes
+
+def merge_candidates(candidates, indexes):
+    """Deduplicate candidates and drop the ones an existing index already covers"""
+    merged = {}
+    covered = {(t, tuple(cols), (where or "").strip("()")) for t, cols, where, _ in indexes.values()}
+    for candidate in candidates:
+        shape = (candidate["table"], tuple(_bare(c) for c in candidate["columns"]), candidate["where"] or "")
+        if shape in covered:
+            continue
+        ddl = index_ddl(candidate)
+        if ddl in merged:
+            merged[ddl]["queries"] = sorted(set(merged[ddl]["queries"]) | set(candidate["queries"]))
+        else:
+            merged[ddl] = candidate
+    return list(merged.values())
+
+def _execute(conn, sql):
+    with conn.cursor() as cur:
+        cur.execute(sql)
+    conn.commit()
+
+def weighted_cost(workload, results):
+    return sum(q["weight"] * results[q["name"]]["median_ms"] for q in workload)
+
+def advise(conn, workload, baseline, candidates, runs=RUNS, min_gain=MIN_GAIN):
+    """Greedy selection; returns the kept recommendations (their indexes are left in place)"""
+    current = dict(baseline)
+    remaining = list(candidates)
+    kept = []
+    while remaining:
+        best = None
+        for candidate in remaining:
+            affected = [q for q in workload if candidate["table"] in current[q["name"]]["tables"]]
+            _execute(conn, index_ddl(candidate))
+            _execute(conn, f"ANALYZE {candidate['table']}")
+            after = {q["name"]: measure(conn, q, runs) for q in affected}
+            _execute(conn, f"DROP INDEX {index_name(candidate)}")
+
+            used = any(index_name(candidate) in r["indexes_used"] for r in after.values())
+            before_cost = weighted_cost(affected, current)
+            gain = 1 - weighted_cost(affected, after) / before_cost if before_cost else 0.0
+            print(f"  {index_ddl(candidate)}: {gain:+.1%}{'' if used else ' (not used by the planner)'}")
+            if used and gain >= min_gain and (best is None or gain > best[1]):
+                best = (candidate, gain, after)
+
+        if best is None:
+            break
+        candidate, gain, after = best
+        _execute(conn, index_ddl(candidate))
+        _execute(conn, f"ANALYZE {candidate['table']}")
+        kept.append({
+            "ddl": index_ddl(candidate),
+            "name": index_name(candidate),
+            "table": candidate["table"],
+            "suggested_by": candidate["queries"],
+            "workload_gain": round(gain, 3),
+            "queries": {name: {"before_ms": current[name]["median_ms"], "after_ms": r["median_ms"],
+                               "before_scans": current[name]["scans"], "after_scans": r["scans"]}
+                        for name, r in after.items()},
+        })
+        current.update(after)
+        remaining.remove(candidate)
+        print(f"✅ Keeping {index_ddl(candidate)} ({gain:.1%} of weighted {candidate['table']} time)")
+    return kept, current
+
+def redundant_indexes(indexes, baseline, final, kept):
+    """Existing indexes no workload plan used, and those a kept composite makes redundant"""
+    used = {name for results in (baseline, final) for r in results.values() for name in r["indexes_used"]}
+    unused = sorted(name for name, (_, _, _, unique) in indexes.items() if not unique and name not in used)
+    superseded = {}
+    for recommendation in kept:
+        columns = [_bare(c) for c in recommendation["ddl"].split("(", 1)[1].split(")")[0].split(",")]
+        if " WHERE " in recommendation["ddl"]:
+            continue
+        for name, (table, existing, where, unique) in indexes.items():
+            if (table == recommendation["table"] and not unique and not where
+                    and existing == columns[:len(existing)] and len(existing) < len(columns)):
+                superseded[name] = recommendation["name"]
+    return unused, superseded
+
+def write_report(out_dir, report):
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    json_file = out_dir / f"index_advisor_{stamp}.json"
+    json_file.write_text(json.dumps(report, indent=2, default=str))
+
+    lines = [f"-- Index recommendations ({stamp}), rows loaded: {report['rows']}", ""]
+    for r in report["recommendations"]:
+        lines.append(f"-- {r['workload_gain']:.1%} faster on weighted {r['table']} queries; suggested by "
+                     + ", ".join(r["suggested_by"]))
+        for name, q in r["queries"].items():
+            lines.append(f"--   {name}: {q['before_ms']} ms -> {q['after_ms']} ms")
+        lines.append(r["ddl"].replace("CREATE INDEX", "CREATE INDEX IF NOT EXISTS") + ";")
+        lines.append("")
+    for name, by in report["superseded"].items():
+        lines.append(f"-- {name} is a prefix of {by}")
+        lines.append(f"-- DROP INDEX IF EXISTS {name};")
+    if report["unused"]:
+        lines.append("")
+        lines.append("-- Not used by any workload query: " + ", ".join(report["unused"]))
+    sql_file = out_dir / f"recommendations_{stamp}.sql"
+    sql_file.write_text("\n".join(lines) + "\n")
+    return json_file, sql_file
+
+def print_summary(workload, baseline, final):
+    print(f"\n{'query':<42} {'weight':>6} {'before ms':>10} {'after ms':>10}")
+    for q in workload:
+        before, after = baseline[q["name"]]["median_ms"], final[q["name"]]["median_ms"]
+        print(f"{q['name']:<42} {q['weight']:>6g} {before:>10.2f} {after:>10.2f}")
+    total_before, total_after = weighted_cost(workload, baseline), weighted_cost(workload, final)
+    print(f"{'weighted total':<42} {'':>6} {total_before:>10.2f} {total_after:>10.2f}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Hacienda Elizabeth query workload benchmark and index advisor")
+    parser.add_argument("--dsn", default=os.environ.get("DATABASE_URL", DEFAULT_DSN),
+                        help="libpq connection string of a local scratch database (default: $DATABASE_URL or %(default)s)")
+    parser.add_argument("--workload", default=str(WORKLOAD_FILE))
+    parser.add_argument("--schema", default=str(SCHEMA_FILE))
+    parser.add_argument("--rows", type=int, default=DEFAULT_ROWS, help="rows for the largest tables")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--skip-load", action="store_true", help="reuse the data already in the database")
+    parser.add_argument("--runs", type=int, default=RUNS, help="measured runs per query (median is used)")
+    parser.add_argument("--min-gain", type=float, default=MIN_GAIN,
+                        help="minimum share of weighted table time an index must save to be kept")
+    parser.add_argument("--keep", action="store_true", help="leave the recommended indexes in the database")
+    parser.add_argument("--out", default=str(RESULTS_DIR))
+    args = parser.parse_args(argv)
+
+    print("Index Advisor - Hacienda Elizabeth")
+    print("=" * 50)
+    workload = load_workload(args.workload)
+    conn = psycopg2.connect(args.dsn)
+    conn.set_client_encoding("UTF8")  # the schema file is UTF-8 whatever the server default
+    kept = []
+    try:
+        if not args.skip_load:
+            print(f"Loading {args.rows} rows per large table into {conn.dsn}...")
+            reset_database(conn, args.schema)
+            load_data(conn, args.rows, args.seed, args.schema)
+
+        print(f"Measuring {len(workload)} workload queries ({args.runs} runs each)...")
+        baseline = {q["name"]: measure(conn, q, args.runs) for q in workload}
+        table_columns = {t: set(table.columns) for t, table in load_schema(args.schema).items()}
+        indexes = existing_indexes(conn, table_columns)
+        candidates = merge_candidates(
+            [c for q in workload for c in candidates_for(q, baseline[q["name"]], table_columns)], indexes)
+
+        print(f"Evaluating {len(candidates)} candidate indexes...")
+        kept, final = advise(conn, workload, baseline, candidates, args.runs, args.min_gain)
+        unused, superseded = redundant_indexes(indexes, baseline, final, kept)
+    finally:
+        if not args.keep:
+            for recommendation in kept:
+                _execute(conn, f"DROP INDEX IF EXISTS {recommendation['name']}")
+        conn.close()
+
+    print_summary(workload, baseline, final)
+    report = {
+        "rows": args.rows,
+        "seed": args.seed,
+        "runs": args.runs,
+        "min_gain": args.min_gain,
+        "recommendations": kept,
+        "unused": unused,
+        "superseded": superseded,
+        "queries": {q["name"]: {"weight": q["weight"], "source": q["source"], "sql": q["sql"],
+                                "before": {k: v for k, v in baseline[q["name"]].items() if k != "plan"},
+                                "after": {k: v for k, v in final[q["name"]].items() if k != "plan"},
+                                "plan_before": baseline[q["name"]]["plan"],
+                                "plan_after": final[q["name"]]["plan"]}
+                    for q in workload},
+    }
+    json_file, sql_file = write_report(args.out, report)
+    print(f"\n{len(kept)} index(es) recommended: {sql_file}")
+    print(f"Results saved: {json_file}")
+    return True
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
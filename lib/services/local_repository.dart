@@ -18,6 +18,8 @@ class LocalRepository {
   static const String _eventsKey = 'realtime_events_v1';
   static const String _alertsKey = 'alerts_v1';
   static const String _insightsKey = 'farming_insights_v1';
+  // Newest events kept in local storage; the full history lives in Supabase
+  static const int _maxLocalEvents = 500;
 
   // Singleton instance
   static LocalRepository? _instance;
@@ -673,9 +675,12 @@ class LocalRepository {
     final prefs = await SharedPreferences.getInstance();
     final current = await getEvents();
     current.add(event);
+    final kept = current.length > _maxLocalEvents
+        ? current.sublist(current.length - _maxLocalEvents)
+        : current;
     await prefs.setStringList(
-        _eventsKey, current.map((e) => e.toJson()).toList());
-    _eventsStreamController.add(await getEvents());
+        _eventsKey, kept.map((e) => e.toJson()).toList());
+    _eventsStreamController.add(kept);
   }
 
   Future<List<AlertItem>> getAlerts() async {
@@ -343,7 +343,8 @@ class SupabaseService {
   static Future<void> saveAlerts(List<AlertItem> alerts) async {
     try {
       final alertsMap = alerts.map((alert) => alert.toMap()).toList();
-      await client.from('alerts').upsert(alertsMap);
+      // Keyed on (id, timestamp): the retention job partitions alerts by timestamp
+      await client.from('alerts').upsert(alertsMap, onConflict: 'id,timestamp');
       print('✅ Alerts saved to Supabase');
     } catch (e) {
       print('❌ Error saving alerts: $e');
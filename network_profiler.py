@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+"""
+Per-screen network profile: every request the app makes, as HAR, with the waste in it called out
+
+Walks the navigation items test_08_navigation_flow visits, recording all
+requests over CDP and attributing each to the screen that was open when it
+started ("boot" for the initial load). For each screen it reports:
+  - request count and transfer bytes (API calls and assets separately)
+  - oversized responses, and PostgREST reads with no limit or Range (whole-table pulls)
+  - duplicates: the same method + URL again within --duplicate-window seconds
+  - N+1: one endpoint hit with a different filter value three or more times
+  - serial waterfalls: API calls that each started only after the previous
+    one finished, and what running them in parallel could save
+
+Writes reports/network/network_<timestamp>.har (open in Chrome DevTools) and
+a matching .json summary. Authorization, apikey and cookie headers are redacted.
+"""
+import argparse
+import json
+import re
+import sys
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+from urllib.parse import parse_qsl, urlsplit
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from test_config import TestConfig
+from cdp_client import CDPSession
+from flutter_idle import wait_for_flutter_app, wait_for_flutter_idle
+from semantics_snapshot import SemanticsSnapshot
+
+RESULTS_DIR = Path("reports/network")
+DUPLICATE_WINDOW = 2.0
+OVERSIZED_BYTES = 256 * 1024
+N_PLUS_ONE_MIN = 3
+# Longest idle gap (seconds) between one call finishing and the next starting for them to count as a chain
+WATERFALL_GAP = 0.05
+WATERFALL_MIN = 3
+# Seconds without a request in flight before a screen counts as loaded
+NETWORK_QUIET = 0.5
+NETWORK_TIMEOUT = 15
+API_TYPES = {"Fetch", "XHR"}
+REDACTED_HEADERS = {"authorization", "apikey", "cookie", "set-cookie", "x-client-info"}
+FILTER_VALUE = re.compile(r"^(not\.)?(eq|neq|gt|gte|lt|lte|like|ilike|is|in|cs|cd)\.")
+ID_SEGMENT = re.compile(r"^(\d+|[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12})$", re.IGNORECASE)
+
+class NetworkRecorder:
+    """Collects one record per request from the Network domain, tagged with the current screen"""
+
+    def __init__(self, session):
+        self.session = session
+        self.screen = "boot"
+        self.records = []
+        self.inflight = {}
+        self.last_activity = time.monotonic()
+        self.lock = threading.Lock()
+        self.listeners = {
+            "Network.requestWillBeSent": self._on_request,
+            "Network.responseReceived": self._on_response,
+            "Network.loadingFinished": self._on_finished,
+            "Network.loadingFailed": self._on_failed,
+        }
+
+    def start(self, disable_cache=False):
+        for event, callback in self.listeners.items():
+            self.session.on(event, callback)
+        self.session.send("Network.enable", {"maxPostDataSize": 0})
+        if disable_cache:
+            self.session.send("Network.setCacheDisabled", {"cacheDisabled": True})
+        return self
+
+    def _on_request(self, params):
+        request = params["request"]
+        if request["url"].startswith("data:"):
+            return
+        with self.lock:
+            previous = self.inflight.pop(params["requestId"], None)
+            if previous is not None and "redirectResponse" in params:
+                # The redirect hop ends where the next one begins
+                self._respond(previous, params["redirectResponse"])
+                previous["end"] = params["timestamp"]
+            record = {
+                "id": params["requestId"], "screen": self.screen, "type": params.get("type"),
+                "method": request["method"], "url": request["url"], "headers": request.get("headers", {}),
+                "start": params["timestamp"], "wall": params["wallTime"], "end": None, "status": None,
+                "bytes": 0, "initiator": params.get("initiator", {}).get("type"),
+            }
+            self.records.append(record)
+            self.inflight[params["requestId"]] = record
+            self.last_activity = time.monotonic()
+
+    def _respond(self, record, response):
+        record.update(status=response.get("status"), status_text=response.get("statusText", ""),
+                      protocol=response.get("protocol", ""), mime=response.get("mimeType", ""),
+                      response_headers=response.get("headers", {}), timing=response.get("timing"),
+                      from_cache=response.get("fromDiskCache") or response.get("fromServiceWorker"))
+
+    def _on_response(self, params):
+        with self.lock:
+            record = self.inflight.get(params["requestId"])
+            if record is not None:
+                self._respond(record, params["response"])
+
+    def _on_finished(self, params):
+        with self.lock:
+            record = self.inflight.pop(params["requestId"], None)
+            if record is not None:
+                record["end"], record["bytes"] = params["timestamp"], params.get("encodedDataLength", 0)
+            self.last_activity = time.monotonic()
+
+    def _on_failed(self, params):
+        with self.lock:
+            record = self.inflight.pop(params["requestId"], None)
+            if record is not None:
+                record["end"], record["error"] = params["timestamp"], params.get("errorText")
+            self.last_activity = time.monotonic()
+
+    def wait_for_quiet(self, quiet=NETWORK_QUIET, timeout=NETWORK_TIMEOUT):
+        """Block until nothing has been in flight for `quiet` seconds; False on timeout"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with self.lock:
+                idle = not self.inflight and time.monotonic() - self.last_activity >= quiet
+            if idle:
+                return True
+            time.sleep(0.05)
+        return False
+
+    def snapshot(self):
+        with self.lock:
+            return [dict(record) for record in self.records]
+
+def is_api(record):
+    return record.get("type") in API_TYPES
+
+def url_key(record):
+    """Method plus URL with its query parameters in a stable order"""
+    parts = urlsplit(record["url"])
+    query = "&".join(f"{k}={v}" for k, v in sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return f"{record['method']} {parts.scheme}://{parts.netloc}{parts.path}{'?' + query if query else ''}"
+
+def endpoint_template(record):
+    """The call with ids in the path and PostgREST filter values replaced by placeholders"""
+    parts = urlsplit(record["url"])
+    path = "/".join(":id" if ID_SEGMENT.match(segment) else segment for segment in parts.path.split("/"))
+    query = []
+    for key, value in sorted(parse_qsl(parts.query, keep_blank_values=True)):
+        match = FILTER_VALUE.match(value)
+        query.append(f"{key}={match.group(0)}?" if match else f"{key}={value}")
+    return f"{record['method']} {parts.netloc}{path}{'?' + '&'.join(query) if query else ''}"
+
+def is_unbounded_read(record):
+    """A PostgREST select with no limit=, Range header or id filter: it returns the whole table"""
+    parts = urlsplit(record["url"])
+    if record["method"] != "GET" or "/rest/v1/" not in parts.path:
+        return False
+    params = dict(parse_qsl(parts.query, keep_blank_values=True))
+    headers = {k.lower() for k in record.get("headers", {})}
+    return "limit" not in params and "range" not in headers and "id" not in params
+
+def find_duplicates(records, window=DUPLICATE_WINDOW):
+    """Repeats of an identical request within `window` seconds of the previous one"""
+    last_seen, duplicates = {}, defaultdict(list)
+    for record in sorted(records, key=lambda r: r["start"]):
+        key = url_key(record)
+        if key in last_seen and record["start"] - last_seen[key] <= window:
+            duplicates[key].append(round(record["start"] - last_seen[key], 3))
+        last_seen[key] = record["start"]
+    return [{"request": key, "repeats": len(gaps), "gaps_s": gaps} for key, gaps in duplicates.items()]
+
+def find_n_plus_one(records, minimum=N_PLUS_ONE_MIN):
+    """Endpoints called with `minimum` or more distinct URLs that differ only in ids or filter values"""
+    groups = defaultdict(set)
+    for record in records:
+        groups[endpoint_template(record)].add(url_key(record))
+    # Calls sharing a template differ only in placeholder values, so several of them are one query per item
+    patterns = [{"endpoint": template, "calls": len(urls), "examples": sorted(urls)[:3]}
+                for template, urls in groups.items() if len(urls) >= minimum]
+    return sorted(patterns, key=lambda p: -p["calls"])
+
+def find_waterfalls(records, gap=WATERFALL_GAP, minimum=WATERFALL_MIN):
+    """Chains of calls where each started only once the previous finished, and what parallelism could save"""
+    calls = sorted((r for r in records if r["end"] is not None), key=lambda r: r["start"])
+    chains, chain = [], []
+    for record in calls:
+        if chain and not 0 <= record["start"] - chain[-1]["end"] <= gap:
+            # Overlapping the previous call, or started after a real pause: the chain ends here
+            if len(chain) >= minimum:
+                chains.append(chain)
+            chain = []
+        chain.append(record)
+    if len(chain) >= minimum:
+        chains.append(chain)
+    result = []
+    for chain in chains:
+        durations = [r["end"] - r["start"] for r in chain]
+        elapsed = chain[-1]["end"] - chain[0]["start"]
+        result.append({
+            "calls": [url_key(r) for r in chain],
+            "elapsed_ms": round(elapsed * 1000, 1),
+            "parallel_ms": round(max(durations) * 1000, 1),
+            "saving_ms": round((elapsed - max(durations)) * 1000, 1),
+        })
+    return sorted(result, key=lambda w: -w["saving_ms"])
+
+def analyze_screen(records, duplicate_window=DUPLICATE_WINDOW, oversized=OVERSIZED_BYTES):
+    api = [r for r in records if is_api(r)]
+    finished = [r for r in records if r["end"] is not None]
+    return {
+        "requests": len(records),
+        "api_requests": len(api),
+        "bytes": sum(r["bytes"] for r in records),
+        "api_bytes": sum(r["bytes"] for r in api),
+        "failed": sum(1 for r in records if r.get("error") or (r["status"] or 0) >= 400),
+        "cached": sum(1 for r in records if r.get("from_cache")),
+        "busy_ms": round((max(r["end"] for r in finished) - min(r["start"] for r in finished)) * 1000, 1)
+        if finished else 0.0,
+        "oversized": [{"request": url_key(r), "bytes": r["bytes"]}
+                      for r in sorted(records, key=lambda r: -r["bytes"]) if r["bytes"] >= oversized],
+        "unbounded_reads": sorted({url_key(r) for r in api if is_unbounded_read(r)}),
+        "duplicates": find_duplicates(api, duplicate_window),
+        "n_plus_one": find_n_plus_one(api),
+        "waterfalls": find_waterfalls(api),
+    }
+
+def _headers(headers):
+    return [{"name": name, "value": "[redacted]" if name.lower() in REDACTED_HEADERS else str(value)}
+            for name, value in headers.items()]
+
+def _iso(wall):
+    return datetime.fromtimestamp(wall, timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+def har_timings(record):
+    """HAR phase timings (ms) from a CDP ResourceTiming; -1 where a phase did not happen"""
+    total = ((record["end"] or record["start"]) - record["start"]) * 1000
+    timing = record.get("timing")
+    if not timing:
+        return {"blocked": -1, "dns": -1, "connect": -1, "ssl": -1, "send": 0, "wait": round(total, 3), "receive": 0}
+
+    def span(start, end):
+        return round(timing[end] - timing[start], 3) if timing.get(start, -1) >= 0 else -1
+
+    blocked = max((timing["requestTime"] - record["start"]) * 1000, 0)
+    headers_end = timing.get("receiveHeadersEnd", 0)
+    receive = max(total - blocked - headers_end, 0)
+    send = span("sendStart", "sendEnd")
+    return {
+        "blocked": round(blocked, 3),
+        "dns": span("dnsStart", "dnsEnd"),
+        "connect": span("connectStart", "connectEnd"),
+        "ssl": span("sslStart", "sslEnd"),
+        "send": max(send, 0),
+        "wait": round(max(headers_end - max(timing.get("sendEnd", 0), 0), 0), 3),
+        "receive": round(receive, 3),
+    }
+
+def to_har(records, screens):
+    """HAR 1.2 log with one page per screen"""
+    first = {}
+    for record in records:
+        first.setdefault(record["screen"], record["wall"])
+    pages = [{"id": screen, "title": screen, "startedDateTime": _iso(first[screen]), "pageTimings": {}}
+             for screen in screens if screen in first]
+    entries = []
+    for record in records:
+        timings = har_timings(record)
+        parts = urlsplit(record["url"])
+        entries.append({
+            "pageref": record["screen"],
+            "startedDateTime": _iso(record["wall"]),
+            "time": round(sum(v for v in timings.values() if v > 0), 3),
+            "request": {
+                "method": record["method"], "url": record["url"], "httpVersion": record.get("protocol", ""),
+                "headers": _headers(record["headers"]), "cookies": [],
+                "queryString": [{"name": k, "value": v} for k, v in parse_qsl(parts.query, keep_blank_values=True)],
+                "headersSize": -1, "bodySize": -1,
+            },
+            "response": {
+                "status": record["status"] or 0, "statusText": record.get("status_text", record.get("error") or ""),
+                "httpVersion": record.get("protocol", ""), "headers": _headers(record.get("response_headers", {})),
+                "cookies": [], "content": {"size": -1, "mimeType": record.get("mime", "")},
+                "redirectURL": "", "headersSize": -1, "bodySize": record["bytes"] or -1,
+                "_transferSize": record["bytes"],
+            },
+            "cache": {}, "timings": timings,
+            "_resourceType": (record["type"] or "other").lower(), "_initiator": record["initiator"],
+        })
+    return {"log": {"version": "1.2", "creator": {"name": "network_profiler", "version": "1"},
+                    "pages": pages, "entries": entries}}
+
+def open_screen(driver, snapshot, screen):
+    snapshot.refresh()
+    nodes = snapshot.find(label=screen) or snapshot.find_containing(screen)
+    if not nodes:
+        return False
+    snapshot.click(nodes[0])
+    return True
+
+def profile(nav_items, disable_cache=False):
+    """Load the app, visit each screen, and return the raw request records"""
+    driver = webdriver.Chrome(service=Service(TestConfig.get_chromedriver_path()),
+                              options=TestConfig.get_chrome_options())
+    try:
+        session = CDPSession.attach(driver, TestConfig.REMOTE_DEBUGGING_PORT)
+        recorder = NetworkRecorder(session).start(disable_cache)
+        driver.get(TestConfig.BASE_URL)
+        if wait_for_flutter_app(driver) is None:
+            raise RuntimeError("Flutter app did not mount")
+        recorder.wait_for_quiet()
+        SemanticsSnapshot.enable_semantics(driver)
+        wait_for_flutter_idle(driver)
+        snapshot = SemanticsSnapshot(driver).capture()
+
+        for item in nav_items:
+            recorder.screen = item
+            if not open_screen(driver, snapshot, item):
+                print(f"WARNING: Could not navigate to {item}")
+                continue
+            wait_for_flutter_idle(driver)
+            if not recorder.wait_for_quiet():
+                print(f"WARNING: {item} still had requests in flight after {NETWORK_TIMEOUT}s")
+        records = recorder.snapshot()
+        session.close()
+        return records
+    finally:
+        driver.quit()
+
+def print_report(screens, report):
+    print(f"\n{'screen':18} {'reqs':>5} {'api':>5} {'KB':>9} {'api KB':>9} {'dup':>4} {'n+1':>4} "
+          f"{'serial':>6} {'big':>4} {'unbounded':>9}")
+    for screen in screens:
+        r = report.get(screen)
+        if r is None:
+            continue
+        print(f"{screen:18} {r['requests']:>5} {r['api_requests']:>5} {r['bytes'] / 1024:>9.1f} "
+              f"{r['api_bytes'] / 1024:>9.1f} {sum(d['repeats'] for d in r['duplicates']):>4} "
+              f"{len(r['n_plus_one']):>4} {len(r['waterfalls']):>6} {len(r['oversized']):>4} "
+              f"{len(r['unbounded_reads']):>9}")
+    for screen in screens:
+        r = report.get(screen)
+        if not r:
+            continue
+        findings = ([f"duplicate x{d['repeats']}: {d['request']}" for d in r["duplicates"]]
+                    + [f"N+1 ({p['calls']} calls): {p['endpoint']}" for p in r["n_plus_one"]]
+                    + [f"serial chain of {len(w['calls'])}, ~{w['saving_ms']:.0f} ms to save: {w['calls'][0]} ..."
+                       for w in r["waterfalls"]]
+                    + [f"{o['bytes'] / 1024:.0f} KB: {o['request']}" for o in r["oversized"]]
+                    + [f"no limit: {u}" for u in r["unbounded_reads"]])
+        if findings:
+            print(f"\n{screen}:")
+            for finding in findings:
+                print(f"  - {finding}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Hacienda Elizabeth per-screen network profiler")
+    parser.add_argument("--screens", nargs="+", default=TestConfig.NAV_ITEMS,
+                        help="navigation items to visit, in order (default: the navigation flow)")
+    parser.add_argument("--duplicate-window", type=float, default=DUPLICATE_WINDOW,
+                        help="seconds within which a repeated identical request counts as a duplicate")
+    parser.add_argument("--oversized-kb", type=int, default=OVERSIZED_BYTES // 1024,
+                        help="flag responses at least this large")
+    parser.add_argument("--disable-cache", action="store_true", help="profile a cold HTTP cache")
+    args = parser.parse_args(argv)
+
+    print("Network Profiler - Hacienda Elizabeth")
+    print("=" * 50)
+
+    records = profile(args.screens, args.disable_cache)
+    screens = ["boot"] + list(args.screens)
+    by_screen = defaultdict(list)
+    for record in records:
+        by_screen[record["screen"]].append(record)
+    report = {screen: analyze_screen(by_screen[screen], args.duplicate_window, args.oversized_kb * 1024)
+              for screen in screens if screen in by_screen}
+    print_report(screens, report)
+
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    har_file = RESULTS_DIR / f"network_{stamp}.har"
+    har_file.write_text(json.dumps(to_har(records, screens), indent=1))
+    summary_file = har_file.with_suffix(".json")
+    summary_file.write_text(json.dumps({"base_url": TestConfig.BASE_URL, "screens": report}, indent=2))
+    print(f"\nHAR saved: {har_file}\nSummary saved: {summary_file}")
+    return True
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -2,14 +2,15 @@
 """
 Quick test script for basic functionality
 """
-import time
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
+from test_config import TestConfig
+from flutter_idle import wait_for_flutter_app, wait_for_flutter_idle
+from semantics_snapshot import SemanticsSnapshot
 
 def quick_test():
     """Run a quick test of the application"""
@@ -21,7 +22,7 @@ def quick_test():
     options.add_argument("--no-sandbox")
     options.add_argument("--disable-dev-shm-usage")
     
-    service = Service(ChromeDriverManager().install())
+    service = Service(TestConfig.get_chromedriver_path())
     driver = webdriver.Chrome(service=service, options=options)
     
     try:
@@ -31,23 +32,23 @@ def quick_test():
         
         # Wait for Flutter app to load
         print("Waiting for Flutter app to load...")
-        time.sleep(10)
         
         # Check if app loaded
-        try:
-            WebDriverWait(driver, 20).until(
-                EC.presence_of_element_located((By.TAG_NAME, "flt-glass-pane"))
-            )
-            print("SUCCESS: Flutter app loaded successfully")
-        except:
+        waited = wait_for_flutter_app(driver)
+        if waited is None:
             print("ERROR: Flutter app failed to load")
             return False
+        print(f"SUCCESS: Flutter app loaded successfully ({waited:.2f}s)")
         
         # Test basic navigation
         print("Testing navigation...")
         
-        # Look for navigation elements
-        nav_elements = driver.find_elements(By.XPATH, "//*[contains(text(), 'Sugar Records') or contains(text(), 'Inventory') or contains(text(), 'Suppliers')]")
+        # Look for navigation elements in one semantics snapshot
+        SemanticsSnapshot.enable_semantics(driver)
+        wait_for_flutter_idle(driver)
+        snapshot = SemanticsSnapshot(driver).capture()
+        nav_elements = [node for label in ("Sugar Records", "Inventory", "Suppliers")
+                        for node in snapshot.find_containing(label)]
         
         if nav_elements:
             print(f"SUCCESS: Found {len(nav_elements)} navigation elements")
@@ -56,9 +57,10 @@ def quick_test():
         
         # Test clicking on Sugar Records
         try:
-            sugar_records = driver.find_element(By.XPATH, "//*[contains(text(), 'Sugar Records')]")
-            sugar_records.click()
-            time.sleep(2)
+            sugar_records = snapshot.find_containing("Sugar Records")
+            if not sugar_records or not snapshot.click(sugar_records[0]):
+                raise RuntimeError("Sugar Records not found")
+            wait_for_flutter_idle(driver)
             print("SUCCESS: Successfully clicked on Sugar Records")
         except:
             print("WARNING: Could not click on Sugar Records")
@@ -0,0 +1,266 @@
+"""
+Supabase Realtime stand-in: Phoenix channel protocol for postgres_changes, plus synthetic change replay
+
+Mounted by supabase_stub.py at /realtime/v1/websocket, where the Supabase
+client looks for it. Changes made through the REST stub and replayed
+synthetic streams are fanned out to every matching subscription.
+"""
+import asyncio
+import json
+import random
+import time
+from datetime import date, datetime, timezone
+
+from ws_frames import OP_CLOSE, OP_PONG, MessageAssembler, accept_key, encode_frame, read_frame_async
+
+CORE_TABLES = ["sugar_records", "inventory_items", "supplier_transactions", "alerts"]
+# Column that carries the "RT-<seq>" marker the benchmark looks for on screen
+MARKER_COLUMNS = {
+    "sugar_records": "variety",
+    "inventory_items": "name",
+    "supplier_transactions": "supplier_name",
+    "alerts": "title",
+    "realtime_events": "message",
+}
+DEFAULT_MIX = {"INSERT": 0.6, "UPDATE": 0.3, "DELETE": 0.1}
+# Postgres type names realtime_client converts record values by, for the stub's column types
+WIRE_TYPES = {"integer": "int4", "numeric": "numeric", "boolean": "bool", "timestamp": "timestamptz", "date": "date"}
+# Per-client send queue; events beyond this are dropped (and counted) rather than buffered forever
+CLIENT_QUEUE_SIZE = 10000
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+class RealtimeClient:
+    """One websocket connection and its channel bindings"""
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.queue = asyncio.Queue(maxsize=CLIENT_QUEUE_SIZE)
+        self.bindings = []  # (topic, join_ref, binding id, table, event)
+        self.array_format = False
+        self.dropped = 0
+
+    def send(self, topic, event, payload, ref=None, join_ref=None):
+        """Queue a message in whichever serializer (vsn 1 objects / vsn 2 arrays) the client uses"""
+        if self.array_format:
+            message = [join_ref, ref, topic, event, payload]
+        else:
+            message = {"topic": topic, "event": event, "payload": payload, "ref": ref}
+            if join_ref is not None:
+                message["join_ref"] = join_ref
+        try:
+            self.queue.put_nowait(json.dumps(message))
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    async def pump(self):
+        while True:
+            message = await self.queue.get()
+            self.writer.write(encode_frame(message))
+            await self.writer.drain()
+
+class RealtimeHub:
+    """Subscriptions across all connected clients"""
+
+    def __init__(self):
+        self.clients = set()
+        self.next_binding_id = 1
+        self.published = 0
+
+    def subscribers(self, table):
+        return sum(1 for c in self.clients for b in c.bindings if b[3] in (table, "*"))
+
+    @property
+    def dropped(self):
+        return sum(c.dropped for c in self.clients)
+
+    async def serve(self, reader, writer, headers):
+        """Complete the upgrade handshake and run the channel protocol until the socket closes"""
+        key = headers.get("sec-websocket-key", "")
+        writer.write((
+            "HTTP/1.1 101 Switching Protocols\r\n"
+            "Upgrade: websocket\r\n"
+            "Connection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {accept_key(key)}\r\n\r\n"
+        ).encode("latin-1"))
+        await writer.drain()
+
+        client = RealtimeClient(writer)
+        self.clients.add(client)
+        pump = asyncio.ensure_future(client.pump())
+        assembler = MessageAssembler()
+        try:
+            while True:
+                kind, data = assembler.feed(*await read_frame_async(reader))
+                if kind == "close":
+                    writer.write(encode_frame(data, OP_CLOSE))
+                    break
+                if kind == "ping":
+                    writer.write(encode_frame(data, OP_PONG))
+                elif kind == "message":
+                    self._handle(client, json.loads(data))
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            pump.cancel()
+            self.clients.discard(client)
+            writer.close()
+
+    def _handle(self, client, message):
+        if isinstance(message, list):
+            client.array_format = True
+            join_ref, ref, topic, event, payload = message
+        else:
+            topic, event, payload, ref = message["topic"], message["event"], message.get("payload"), message.get("ref")
+            join_ref = message.get("join_ref")
+
+        if event == "heartbeat":
+            client.send(topic, "phx_reply", {"status": "ok", "response": {}}, ref)
+        elif event == "phx_join":
+            self._join(client, topic, payload or {}, ref, join_ref or ref)
+        elif event == "phx_leave":
+            client.bindings = [b for b in client.bindings if b[0] != topic]
+            client.send(topic, "phx_reply", {"status": "ok", "response": {}}, ref, join_ref)
+            client.send(topic, "phx_close", {}, ref, join_ref)
+        # access_token, broadcast and presence messages need no answer here
+
+    def _join(self, client, topic, payload, ref, join_ref):
+        changes = []
+        for spec in payload.get("config", {}).get("postgres_changes") or []:
+            binding_id = self.next_binding_id
+            self.next_binding_id += 1
+            table, event = spec.get("table", "*"), spec.get("event", "*")
+            client.bindings.append((topic, join_ref, binding_id, table, event))
+            changes.append({"id": binding_id, **spec})
+        client.send(topic, "phx_reply", {"status": "ok", "response": {"postgres_changes": changes}}, ref, join_ref)
+        if changes:
+            client.send(topic, "system", {
+                "channel": topic.split(":", 1)[-1],
+                "extension": "postgres_changes",
+                "message": "Subscribed to PostgreSQL",
+                "status": "ok",
+            }, None, join_ref)
+
+    def publish(self, table, event_type, new=None, old=None, columns=None):
+        """Fan a row change out to every subscription on that table/event.
+
+        The payload uses the server's wire names (type, record, old_record);
+        realtime_client maps them to eventType/new/old using `columns`.
+        """
+        data = {
+            "schema": "public",
+            "table": table,
+            "commit_timestamp": _now(),
+            "type": event_type,
+            "columns": [{"name": c["name"], "type": WIRE_TYPES.get(c["type"], c["type"])} for c in columns or []],
+            "errors": None,
+        }
+        if event_type in ("INSERT", "UPDATE"):
+            data["record"] = new or {}
+        if event_type in ("UPDATE", "DELETE"):
+            data["old_record"] = old or {}
+        self.published += 1
+        for client in list(self.clients):
+            by_topic = {}
+            for topic, join_ref, binding_id, bound_table, bound_event in client.bindings:
+                if bound_table in (table, "*") and bound_event in (event_type, "*"):
+                    by_topic.setdefault((topic, join_ref), []).append(binding_id)
+            for (topic, join_ref), ids in by_topic.items():
+                client.send(topic, "postgres_changes", {"ids": ids, "data": data}, None, join_ref)
+
+def synthetic_row(table, seq, rng):
+    """A schema-valid row whose marker column reads RT-<seq>"""
+    row = {}
+    marker = MARKER_COLUMNS.get(table.name)
+    for column in table.columns.values():
+        if column.name == table.primary_key:
+            row[column.name] = f"rt-{seq}"
+        elif column.name == marker:
+            row[column.name] = f"RT-{seq}"
+        elif column.choices:
+            row[column.name] = sorted(column.choices)[0]
+        elif column.sql_type == "integer":
+            row[column.name] = rng.randint(1, 500)
+        elif column.sql_type == "numeric":
+            row[column.name] = round(rng.uniform(1, 10000), 2)
+        elif column.sql_type == "boolean":
+            row[column.name] = False
+        elif column.sql_type == "timestamp":
+            row[column.name] = _now()
+        elif column.sql_type == "date":
+            row[column.name] = date.today().isoformat()
+        else:
+            row[column.name] = f"{column.name}-{seq}"
+    return row
+
+class ChangeReplay:
+    """Applies a synthetic INSERT/UPDATE/DELETE stream to the stub's tables at a fixed rate"""
+
+    def __init__(self, stub, rate, duration, tables=None, mix=None, seed=0):
+        self.stub = stub
+        self.rate = rate
+        self.duration = duration
+        self.tables = tables or CORE_TABLES
+        self.mix = mix or DEFAULT_MIX
+        self.rng = random.Random(seed)
+        self.sent = 0
+        self.running = False
+        self.started = None
+        self.finished = None
+        # seq -> (table, event type, wall-clock ms when published)
+        self.events = {}
+        self._live = {name: [] for name in self.tables}
+
+    def status(self):
+        elapsed = ((self.finished or time.time()) - self.started) if self.started else 0
+        return {
+            "running": self.running,
+            "rate": self.rate,
+            "sent": self.sent,
+            "actual_rate": round(self.sent / elapsed, 1) if elapsed else 0.0,
+            "dropped": self.stub.realtime.dropped,
+            "events": self.events,
+        }
+
+    async def run(self):
+        """Emit events on an absolute schedule so slow ticks catch up instead of drifting"""
+        self.running = True
+        self.started = time.time()
+        total = int(self.rate * self.duration)
+        start = time.monotonic()
+        try:
+            while self.sent < total:
+                due = min(total, int((time.monotonic() - start) * self.rate) + 1)
+                while self.sent < due:
+                    self._emit(self.sent + 1)
+                    self.sent += 1
+                await asyncio.sleep(max(0.0, start + self.sent / self.rate - time.monotonic()))
+        finally:
+            self.running = False
+            self.finished = time.time()
+
+    def _emit(self, seq):
+        table_name = self.tables[seq % len(self.tables)]
+        table = self.stub.tables[table_name]
+        live = self._live[table_name]
+        event_type = self.rng.choices(list(self.mix), weights=list(self.mix.values()))[0]
+        if event_type != "INSERT" and not live:
+            event_type = "INSERT"
+
+        if event_type == "INSERT":
+            new = table.insert(synthetic_row(table, seq, self.rng))
+            live.append(new[table.primary_key])
+            old = None
+        elif event_type == "UPDATE":
+            key = self.rng.choice(live)
+            old = {table.primary_key: key}
+            changes = {MARKER_COLUMNS[table_name]: f"RT-{seq}"} if table_name in MARKER_COLUMNS else {}
+            new = table.update(key, changes)
+        else:
+            key = live.pop(self.rng.randrange(len(live)))
+            old = table.delete(key)
+            new = None
+
+        self.events[seq] = (table_name, event_type, time.time() * 1000)
+        self.stub.publish(table, event_type, new, old)
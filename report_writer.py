@@ -0,0 +1,171 @@
+"""
+Streaming, bounded-memory output capture and machine-readable test summaries
+"""
+import collections
+import json
+import os
+import re
+import signal
+import subprocess
+import sys
+import threading
+import xml.etree.ElementTree as ET
+from datetime import datetime
+from pathlib import Path
+
+REPORTS_DIR = Path("reports")
+LOG_DIR = REPORTS_DIR / "logs"
+TAIL_LINES = 500
+# Seconds to wait for the output pumps once the child has exited
+PUMP_GRACE = 5
+
+def log_path_for(test_name, log_dir=LOG_DIR):
+    """reports/logs/<slug>.log for a suite name"""
+    slug = re.sub(r"[^a-z0-9]+", "_", test_name.lower()).strip("_")
+    return Path(log_dir) / f"{slug}.log"
+
+def _pump(stream, label, prefix, log, lock, tail, echo):
+    """Copy one child stream line by line to the log, the console and a bounded tail"""
+    for line in stream:
+        with lock:
+            log.write(f"[{label}] {line}")
+            log.flush()
+        tail.append(line)
+        echo.write(f"{prefix} {line}")
+        echo.flush()
+
+def _kill_group(process):
+    """Kill the child and everything it started (chromedriver, Chrome), which may hold its pipes"""
+    try:
+        if os.name == "posix":
+            os.killpg(process.pid, signal.SIGKILL)
+        else:
+            subprocess.run(["taskkill", "/F", "/T", "/PID", str(process.pid)], capture_output=True)
+    except OSError:
+        process.kill()
+
+def stream_process(command, test_name, env=None, timeout=300, tail_lines=TAIL_LINES):
+    """Run command, streaming its output as it arrives.
+
+    Returns (returncode, stdout_tail, stderr_tail, log_path); returncode is None
+    on timeout. Only the last tail_lines lines of each stream stay in memory.
+    """
+    log_path = log_path_for(test_name)
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    prefix = f"[{test_name}]"
+    stdout_tail = collections.deque(maxlen=tail_lines)
+    stderr_tail = collections.deque(maxlen=tail_lines)
+    lock = threading.Lock()
+
+    with open(log_path, "w", encoding="utf-8") as log:
+        process = subprocess.Popen(
+            command,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+            bufsize=1,
+            env=env,
+            # Its own process group, so a timeout can take down grandchildren too
+            start_new_session=os.name == "posix",
+            creationflags=subprocess.CREATE_NEW_PROCESS_GROUP if os.name == "nt" else 0,
+        )
+        pumps = [
+            threading.Thread(target=_pump, args=(process.stdout, "stdout", prefix, log, lock, stdout_tail, sys.stdout),
+                             daemon=True),
+            threading.Thread(target=_pump, args=(process.stderr, "stderr", prefix, log, lock, stderr_tail, sys.stderr),
+                             daemon=True),
+        ]
+        for pump in pumps:
+            pump.start()
+
+        try:
+            returncode = process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            _kill_group(process)
+            process.wait()
+            returncode = None
+
+        for pump in pumps:
+            pump.join(timeout=PUMP_GRACE)
+        if any(pump.is_alive() for pump in pumps):
+            # The child is gone but something it left behind still holds the pipes
+            _kill_group(process)
+            for pump in pumps:
+                pump.join(timeout=PUMP_GRACE)
+
+    return returncode, "".join(stdout_tail), "".join(stderr_tail), log_path
+
+def _atomic_write(path, text):
+    tmp = Path(f"{path}.tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
+
+class SummaryWriter:
+    """Writes JSON-lines events, a JSON summary and JUnit XML as each suite finishes"""
+
+    def __init__(self, reports_dir=REPORTS_DIR, run_name="hacienda-elizabeth"):
+        self.reports_dir = Path(reports_dir)
+        self.reports_dir.mkdir(parents=True, exist_ok=True)
+        self.run_name = run_name
+        self.started = datetime.now()
+        self.results = []
+        self.events_file = self.reports_dir / "results.jsonl"
+        self.summary_file = self.reports_dir / "summary.json"
+        self.junit_file = self.reports_dir / "junit.xml"
+        self.events_file.write_text("")
+
+    def add(self, result):
+        """Record a finished suite and refresh every output file"""
+        entry = {
+            "name": result["name"],
+            "passed": result["passed"],
+            "duration": round(result["duration"], 3),
+            "log": str(result.get("log") or ""),
+            "finished": datetime.now().isoformat(timespec="seconds"),
+        }
+        self.results.append((entry, result))
+
+        with open(self.events_file, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+        self._write_summary()
+        self._write_junit()
+
+    def _write_summary(self):
+        entries = [entry for entry, _ in self.results]
+        passed = sum(1 for entry in entries if entry["passed"])
+        summary = {
+            "run": self.run_name,
+            "started": self.started.isoformat(timespec="seconds"),
+            "total": len(entries),
+            "passed": passed,
+            "failed": len(entries) - passed,
+            "duration": round(sum(entry["duration"] for entry in entries), 3),
+            "suites": entries,
+        }
+        _atomic_write(self.summary_file, json.dumps(summary, indent=2))
+
+    def _write_junit(self):
+        failures = sum(1 for entry, _ in self.results if not entry["passed"])
+        suite = ET.Element("testsuite", {
+            "name": self.run_name,
+            "tests": str(len(self.results)),
+            "failures": str(failures),
+            "errors": "0",
+            "time": f"{sum(entry['duration'] for entry, _ in self.results):.3f}",
+            "timestamp": self.started.isoformat(timespec="seconds"),
+        })
+        for entry, result in self.results:
+            case = ET.SubElement(suite, "testcase", {
+                "classname": self.run_name,
+                "name": entry["name"],
+                "time": f"{entry['duration']:.3f}",
+            })
+            if not entry["passed"]:
+                failure = ET.SubElement(case, "failure", {"message": f"{entry['name']} failed"})
+                failure.text = result.get("stderr") or ""
+            ET.SubElement(case, "system-out").text = result.get("stdout") or ""
+            if entry["log"]:
+                ET.SubElement(case, "system-err").text = f"Full log: {entry['log']}"
+        _atomic_write(self.junit_file, ET.tostring(suite, encoding="unicode"))
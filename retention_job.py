@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+Nightly retention for realtime_events and alerts: monthly partitions, daily rollups, bulk drops
+
+First run converts each table to a RANGE (timestamp) partitioned table with one
+partition per month (indexes, RLS policies, grants and publications carried
+over; the original stays behind as <table>_legacy). The primary key becomes
+(id, timestamp), so upserts must use both as the conflict target. Every run then:
+  - creates partitions for the coming months
+  - folds each partition that lies entirely beyond the horizon into per-day
+    summary rows (realtime_event_daily, alert_daily) and drops it
+  - does the same for late rows that landed in the default partition
+
+Each table conversion and each expired partition is one transaction, recorded
+in retention_checkpoints, so an interrupted run just continues on the next
+invocation and re-running never double counts. A dry run does the whole pass
+in a single transaction and rolls it back at the end, so every step sees the
+ones before it (bookkeeping tables included).
+"""
+import argparse
+import os
+import re
+import sys
+from datetime import date
+import psycopg2
+
+DEFAULT_DSN = "dbname=hacienda_bench"
+HORIZON_DAYS = 90
+PREMAKE_MONTHS = 3
+# Days (and so partition bounds and summary rows) follow the farm's local calendar
+TIMEZONE = "Asia/Manila"
+LOCK_KEY = "retention_job"
+
+CHECKPOINT_DDL = """
+CREATE TABLE IF NOT EXISTS retention_checkpoints (
+  table_name TEXT NOT NULL,
+  step TEXT NOT NULL,
+  target TEXT NOT NULL,
+  rows BIGINT NOT NULL DEFAULT 0,
+  done_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+  PRIMARY KEY (table_name, step, target)
+)"""
+
+RETENTION = {
+    "realtime_events": {
+        "summary_ddl": """
+CREATE TABLE IF NOT EXISTS realtime_event_daily (
+  day DATE NOT NULL,
+  entity TEXT NOT NULL,
+  action TEXT NOT NULL,
+  events INTEGER NOT NULL,
+  first_at TIMESTAMP WITH TIME ZONE,
+  last_at TIMESTAMP WITH TIME ZONE,
+  PRIMARY KEY (day, entity, action)
+)""",
+        "rollup": """
+INSERT INTO realtime_event_daily AS s (day, entity, action, events, first_at, last_at)
+SELECT timestamp::date, entity, action, count(*), min(timestamp), max(timestamp)
+FROM {source} WHERE {where}
+GROUP BY 1, 2, 3
+ON CONFLICT (day, entity, action) DO UPDATE SET
+  events = s.events + EXCLUDED.events,
+  first_at = least(s.first_at, EXCLUDED.first_at),
+  last_at = greatest(s.last_at, EXCLUDED.last_at)""",
+    },
+    "alerts": {
+        "summary_ddl": """
+CREATE TABLE IF NOT EXISTS alert_daily (
+  day DATE NOT NULL,
+  severity TEXT NOT NULL,
+  alerts INTEGER NOT NULL,
+  unread INTEGER NOT NULL,
+  first_at TIMESTAMP WITH TIME ZONE,
+  last_at TIMESTAMP WITH TIME ZONE,
+  PRIMARY KEY (day, severity)
+)""",
+        "rollup": """
+INSERT INTO alert_daily AS s (day, severity, alerts, unread, first_at, last_at)
+SELECT timestamp::date, severity, count(*), count(*) FILTER (WHERE NOT coalesce(read, false)),
+       min(timestamp), max(timestamp)
+FROM {source} WHERE {where}
+GROUP BY 1, 2
+ON CONFLICT (day, severity) DO UPDATE SET
+  alerts = s.alerts + EXCLUDED.alerts,
+  unread = s.unread + EXCLUDED.unread,
+  first_at = least(s.first_at, EXCLUDED.first_at),
+  last_at = greatest(s.last_at, EXCLUDED.last_at)""",
+    },
+}
+
+def _finisher(conn, dry_run):
+    """Commit after each step, or (dry run) leave it all open for the final rollback"""
+    return (lambda: None) if dry_run else conn.commit
+
+def add_months(day, months):
+    years, month = divmod(day.month - 1 + months, 12)
+    return date(day.year + years, month + 1, 1)
+
+def partition_name(table, month):
+    return f"{table}_p{month:%Y%m}"
+
+def monthly_partitions(cur, table):
+    """[(partition name, first day of its month)] attached to table, oldest first"""
+    cur.execute(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = %s::regclass", (table,))
+    found = []
+    for (name,) in cur.fetchall():
+        match = re.fullmatch(rf"{table}_p(\d{{4}})(\d{{2}})", name)
+        if match:
+            found.append((name, date(int(match.group(1)), int(match.group(2)), 1)))
+    return sorted(found, key=lambda p: p[1])
+
+def is_partitioned(cur, table):
+    cur.execute(
+        "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+        "WHERE c.relname = %s AND c.relnamespace = 'public'::regnamespace", (table,))
+    return cur.fetchone() is not None
+
+def checkpoint(cur, table, step, target, rows=0):
+    cur.execute(
+        "INSERT INTO retention_checkpoints (table_name, step, target, rows) VALUES (%s, %s, %s, %s) "
+        "ON CONFLICT (table_name, step, target) DO UPDATE SET rows = EXCLUDED.rows, done_at = NOW()",
+        (table, step, target, rows))
+
+def create_partition(cur, parent, default, table, month):
+    """Attach the month's partition, first moving any rows for it out of the default partition"""
+    name = partition_name(table, month)
+    cur.execute("SELECT to_regclass(%s)", (name,))
+    if cur.fetchone()[0] is not None:
+        return False
+    lower, upper = str(month), str(add_months(month, 1))
+    cur.execute(f"CREATE TABLE {name} (LIKE {parent} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)")
+    cur.execute(
+        f"WITH moved AS (DELETE FROM {default} WHERE timestamp >= %s AND timestamp < %s RETURNING *) "
+        f"INSERT INTO {name} SELECT * FROM moved", (lower, upper))
+    cur.execute(f"ALTER TABLE {parent} ATTACH PARTITION {name} FOR VALUES FROM (%s) TO (%s)", (lower, upper))
+    return True
+
+def convert(cur, table, today, premake):
+    """Swap table for a partitioned copy in one transaction; no-op if it is already partitioned"""
+    if is_partitioned(cur, table):
+        return None
+    staged, legacy = f"{table}_partitioned", f"{table}_legacy"
+    cur.execute(f"LOCK TABLE {table} IN ACCESS EXCLUSIVE MODE")
+
+    # Everything that has to be recreated on the new table, read while it still has the old name
+    cur.execute("SELECT indexname, indexdef FROM pg_indexes WHERE schemaname = 'public' AND tablename = %s", (table,))
+    indexes = [(name, definition) for name, definition in cur.fetchall() if not name.endswith("_pkey")]
+    cur.execute("SELECT relrowsecurity FROM pg_class WHERE oid = %s::regclass", (table,))
+    row_security = cur.fetchone()[0]
+    cur.execute(
+        "SELECT policyname, permissive, array_to_string(roles, ', '), cmd, qual, with_check FROM pg_policies "
+        "WHERE schemaname = 'public' AND tablename = %s", (table,))
+    policies = cur.fetchall()
+    cur.execute(
+        "SELECT grantee, privilege_type FROM information_schema.role_table_grants "
+        "WHERE table_schema = 'public' AND table_name = %s AND grantee <> current_user", (table,))
+    grants = cur.fetchall()
+    cur.execute(
+        "SELECT p.pubname, p.puballtables FROM pg_publication p JOIN pg_publication_tables t USING (pubname) "
+        "WHERE t.schemaname = 'public' AND t.tablename = %s", (table,))
+    publications = cur.fetchall()
+
+    cur.execute(f"UPDATE {table} SET timestamp = coalesce(created_at, NOW()) WHERE timestamp IS NULL")
+    cur.execute(f"SELECT min(timestamp)::date FROM {table}")
+    oldest = cur.fetchone()[0] or today
+    cur.execute(
+        f"CREATE TABLE {staged} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS, "
+        f"PRIMARY KEY (id, timestamp)) PARTITION BY RANGE (timestamp)")
+    cur.execute(f"CREATE TABLE {table}_default PARTITION OF {staged} DEFAULT")
+    month = oldest.replace(day=1)
+    while month <= add_months(today, premake):
+        create_partition(cur, staged, f"{table}_default", table, month)
+        month = add_months(month, 1)
+    cur.execute(f"INSERT INTO {staged} SELECT * FROM {table}")
+    copied = cur.rowcount
+
+    for name, _ in indexes:
+        cur.execute(f"ALTER INDEX {name} RENAME TO {name}_legacy")
+    cur.execute(f"ALTER TABLE {table} RENAME CONSTRAINT {table}_pkey TO {table}_legacy_pkey")
+    cur.execute(f"ALTER TABLE {table} RENAME TO {legacy}")
+    cur.execute(f"ALTER TABLE {staged} RENAME TO {table}")
+    cur.execute(f"ALTER TABLE {table} RENAME CONSTRAINT {staged}_pkey TO {table}_pkey")
+    for _, definition in indexes:
+        cur.execute(definition)  # CREATE INDEX ... ON public.<table>, now the partitioned parent
+    if row_security:
+        cur.execute(f"ALTER TABLE {table} ENABLE ROW LEVEL SECURITY")
+    for name, permissive, roles, command, using, check in policies:
+        statement = f'CREATE POLICY "{name}" ON {table} AS {permissive} FOR {command} TO {roles}'
+        statement += f" USING ({using})" if using else ""
+        statement += f" WITH CHECK ({check})" if check else ""
+        cur.execute(statement)
+    for grantee, privilege in grants:
+        cur.execute(f"GRANT {privilege} ON {table} TO " + (grantee if grantee == "PUBLIC" else f'"{grantee}"'))
+    for publication, all_tables in publications:
+        # Realtime needs changes reported under the parent's name, not the partition's
+        cur.execute(f"ALTER PUBLICATION {publication} SET (publish_via_partition_root = true)")
+        if not all_tables:
+            cur.execute(f"ALTER PUBLICATION {publication} DROP TABLE {legacy}")
+            cur.execute(f"ALTER PUBLICATION {publication} ADD TABLE {table}")
+    cur.execute(f"ANALYZE {table}")
+    checkpoint(cur, table, "convert", table, copied)
+    return copied
+
+def expire(conn, table, cutoff, dry_run=False):
+    """Roll up and drop every partition wholly older than cutoff, one transaction each"""
+    spec = RETENTION[table]
+    finish = _finisher(conn, dry_run)
+    expired = []
+    with conn.cursor() as cur:
+        candidates = [(name, month) for name, month in monthly_partitions(cur, table) if add_months(month, 1) <= cutoff]
+    for name, month in candidates:
+        with conn.cursor() as cur:
+            cur.execute(f"SELECT count(*) FROM {name}")
+            rows = cur.fetchone()[0]
+            cur.execute(spec["rollup"].format(source=name, where="true"))
+            cur.execute(f"DROP TABLE {name}")
+            checkpoint(cur, table, "expire", name, rows)
+        finish()
+        expired.append((name, rows))
+        print(f"  {name}: {rows} rows rolled up and dropped")
+
+    # Late writes for months that are already gone land in the default partition
+    with conn.cursor() as cur:
+        cur.execute("SELECT to_regclass(%s)", (f"{table}_default",))
+        if cur.fetchone()[0] is not None:
+            where = cur.mogrify("timestamp < %s", (str(cutoff),)).decode()
+            cur.execute(spec["rollup"].format(source=f"{table}_default", where=where))
+            cur.execute(f"DELETE FROM {table}_default WHERE {where}")
+            if cur.rowcount:
+                checkpoint(cur, table, "expire", f"{table}_default<{cutoff}", cur.rowcount)
+                print(f"  {table}_default: {cur.rowcount} late rows rolled up")
+    finish()
+    return expired
+
+def premake_partitions(conn, table, today, months, dry_run=False):
+    created = []
+    with conn.cursor() as cur:
+        if not is_partitioned(cur, table):
+            return created
+        month = today.replace(day=1)
+        for _ in range(months + 1):
+            if create_partition(cur, table, f"{table}_default", table, month):
+                created.append(partition_name(table, month))
+            month = add_months(month, 1)
+    _finisher(conn, dry_run)()
+    return created
+
+def run(conn, tables, horizon_days, premake, drop_legacy=False, dry_run=False):
+    """One nightly pass; returns {table: what was done}"""
+    finish = _finisher(conn, dry_run)
+    with conn.cursor() as cur:
+        cur.execute("SET TIME ZONE %s", (TIMEZONE,))
+        cur.execute("SELECT pg_try_advisory_lock(hashtext(%s))", (LOCK_KEY,))
+        if not cur.fetchone()[0]:
+            raise RuntimeError("another retention run holds the lock")
+    finish()
+
+    with conn.cursor() as cur:
+        cur.execute(CHECKPOINT_DDL)
+        for table in tables:
+            cur.execute(RETENTION[table]["summary_ddl"])
+        cur.execute("SELECT current_date, current_date - %s", (horizon_days,))
+        today, cutoff = cur.fetchone()
+    finish()
+
+    summary = {}
+    for table in tables:
+        print(f"{table} (horizon {horizon_days} days, dropping partitions ending on or before {cutoff}):")
+        with conn.cursor() as cur:
+            converted = convert(cur, table, today, premake)
+        finish()
+        if converted is not None:
+            print(f"  converted to monthly partitions ({converted} rows copied, original kept as {table}_legacy)")
+        created = premake_partitions(conn, table, today, premake, dry_run)
+        expired = expire(conn, table, cutoff, dry_run)
+        if drop_legacy:
+            with conn.cursor() as cur:
+                cur.execute(f"DROP TABLE IF EXISTS {table}_legacy")
+            finish()
+        summary[table] = {"converted": converted, "created": created,
+                          "expired": [name for name, _ in expired],
+                          "rows_expired": sum(rows for _, rows in expired)}
+    if dry_run:
+        conn.rollback()
+    with conn.cursor() as cur:
+        cur.execute("SELECT pg_advisory_unlock(hashtext(%s))", (LOCK_KEY,))
+    conn.commit()
+    return summary
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Hacienda Elizabeth retention job for realtime_events and alerts")
+    parser.add_argument("--dsn", default=os.environ.get("DATABASE_URL", DEFAULT_DSN),
+                        help="libpq connection string (default: $DATABASE_URL or %(default)s)")
+    parser.add_argument("--table", choices=sorted(RETENTION), action="append",
+                        help="limit to one table (repeatable); default both")
+    parser.add_argument("--horizon-days", type=int, default=HORIZON_DAYS,
+                        help="keep raw rows this many days; older whole months become daily summaries")
+    parser.add_argument("--premake", type=int, default=PREMAKE_MONTHS, help="months of partitions to create ahead")
+    parser.add_argument("--drop-legacy", action="store_true", help="drop the pre-partitioning copy of each table")
+    parser.add_argument("--dry-run", action="store_true", help="do everything, then roll back")
+    args = parser.parse_args(argv)
+
+    print("Retention Job - Hacienda Elizabeth")
+    print("=" * 50)
+    conn = psycopg2.connect(args.dsn)
+    try:
+        summary = run(conn, args.table or sorted(RETENTION), args.horizon_days, args.premake,
+                      args.drop_legacy, args.dry_run)
+    finally:
+        conn.close()
+    for table, done in summary.items():
+        print(f"✅ {table}: {len(done['expired'])} partition(s) expired ({done['rows_expired']} rows), "
+              f"{len(done['created'])} created")
+    if args.dry_run:
+        print("Dry run: all changes rolled back")
+    return True
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
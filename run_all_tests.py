@@ -2,14 +2,23 @@
 """
 Comprehensive test runner for Hacienda Elizabeth
 """
-import subprocess
+import argparse
+import shutil
 import sys
+import tempfile
 import time
 import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
+from chromedriver_cache import resolve_chromedriver
+from report_writer import SummaryWriter, stream_process
+from run_history import RunHistory
 
-def run_test(test_name, test_file):
-    """Run a specific test and return results"""
+BASE_DEBUGGING_PORT = 9222
+TEST_TIMEOUT = 300  # 5 minute timeout
+
+def run_test(test_name, test_file, env=None):
+    """Run a specific test, streaming its output, and return results"""
     print(f"\n{'='*60}")
     print(f"Running {test_name}")
     print(f"{'='*60}")
@@ -17,27 +26,25 @@ def run_test(test_name, test_file):
     start_time = time.time()
     
     try:
-        result = subprocess.run([sys.executable, test_file], 
-                              capture_output=True, 
-                              text=True, 
-                              timeout=300)  # 5 minute timeout
+        returncode, stdout, stderr, log_path = stream_process(
+            [sys.executable, "-u", test_file], test_name, env=env, timeout=TEST_TIMEOUT)
         
         end_time = time.time()
         duration = end_time - start_time
         
-        if result.returncode == 0:
+        if returncode is None:
+            print(f"TIMEOUT: {test_name} - TIMEOUT")
+            return False, stdout, stderr + "Test timed out\n", duration, log_path
+        elif returncode == 0:
             print(f"SUCCESS: {test_name} - PASSED ({duration:.2f}s)")
-            return True, result.stdout, result.stderr, duration
+            return True, stdout, stderr, duration, log_path
         else:
             print(f"FAILED: {test_name} - FAILED ({duration:.2f}s)")
-            return False, result.stdout, result.stderr, duration
+            return False, stdout, stderr, duration, log_path
             
-    except subprocess.TimeoutExpired:
-        print(f"TIMEOUT: {test_name} - TIMEOUT")
-        return False, "", "Test timed out", 300
     except Exception as e:
         print(f"ERROR: {test_name} - ERROR: {e}")
-        return False, "", str(e), 0
+        return False, "", str(e), 0, None
 
 def generate_report(results):
     """Generate a test report"""
@@ -66,6 +73,9 @@ def generate_report(results):
             f.write(f"\n{result['name']} - {status} ({result['duration']:.2f}s)\n")
             f.write("-" * 20 + "\n")
             
+            if result.get('log'):
+                f.write(f"Full log: {result['log']}\n")
+            
             if result['stdout']:
                 f.write("STDOUT:\n")
                 f.write(result['stdout'])
@@ -79,8 +89,102 @@ def generate_report(results):
     print(f"\nTest report generated: {report_file}")
     return report_file
 
-def main():
+def run_isolated_test(test_name, test_file, slot, warm_build_hash=None):
+    """Run a test with its own Chrome profile and remote-debugging port"""
+    if warm_build_hash:
+        profile_dir = clone_profile(warm_build_hash)
+    else:
+        profile_dir = tempfile.mkdtemp(prefix=f"chrome-worker-{slot}-")
+    env = dict(os.environ)
+    env['TEST_REMOTE_DEBUGGING_PORT'] = str(BASE_DEBUGGING_PORT + slot)
+    env['TEST_CHROME_PROFILE_DIR'] = profile_dir
+    
+    try:
+        return run_test(test_name, test_file, env=env)
+    finally:
+        shutil.rmtree(profile_dir, ignore_errors=True)
+
+def make_result(test_name, passed, stdout, stderr, duration, log=None):
+    """Result entry as consumed by generate_report and SummaryWriter"""
+    return {
+        'name': test_name,
+        'passed': passed,
+        'stdout': stdout,
+        'stderr': stderr,
+        'duration': duration,
+        'log': log
+    }
+
+def missing_test_result(test_name, test_file):
+    """Result entry for a test file that does not exist"""
+    print(f"WARNING: Test file not found: {test_file}")
+    return make_result(test_name, False, "", f"Test file not found: {test_file}", 0)
+
+def run_sequential(tests, summary, warm_build_hash=None):
+    """Run each test one after another"""
+    results = []
+    
+    for test_name, test_file in tests:
+        if not os.path.exists(test_file):
+            result = missing_test_result(test_name, test_file)
+        elif warm_build_hash:
+            result = make_result(test_name, *run_isolated_test(test_name, test_file, 0, warm_build_hash))
+        else:
+            result = make_result(test_name, *run_test(test_name, test_file))
+        summary.add(result)
+        results.append(result)
+    
+    return results
+
+def clone_profile(warm_build_hash):
+    """Disposable copy of a pre-warmed profile for one worker"""
+    # Imported here: chrome_profiles needs selenium, the orchestrator does not
+    from chrome_profiles import ProfileManager
+    return str(ProfileManager().clone(warm_build_hash))
+
+def prepare_warm_build_hash():
+    """Build (or reuse) the warmed profile for the current app build"""
+    from chrome_profiles import ProfileManager
+    from build_cache import hash_build_inputs
+    build_hash = hash_build_inputs()
+    ProfileManager().ensure_golden(build_hash)
+    return build_hash
+
+def run_parallel(tests, workers, summary, warm_build_hash=None):
+    """Run tests concurrently in a process pool, keeping declaration order"""
+    print(f"Running {len(tests)} test(s) with {workers} worker(s)")
+    
+    results = [None] * len(tests)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {}
+        for slot, (test_name, test_file) in enumerate(tests):
+            if os.path.exists(test_file):
+                futures[pool.submit(run_isolated_test, test_name, test_file, slot, warm_build_hash)] = slot
+            else:
+                results[slot] = missing_test_result(test_name, test_file)
+                summary.add(results[slot])
+        
+        # Summaries are written as each suite finishes, not at the end
+        for future in as_completed(futures):
+            slot = futures[future]
+            results[slot] = make_result(tests[slot][0], *future.result())
+            summary.add(results[slot])
+    
+    return results
+
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Hacienda Elizabeth test runner")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="number of test scripts to run at the same time")
+    parser.add_argument("--warm-profile", action="store_true",
+                        help="start each test script from a clone of a pre-warmed Chrome profile")
+    return parser.parse_args(argv)
+
+def main(argv=None):
     """Main test runner"""
+    args = parse_args(argv)
+    
     print("HACIENDA ELIZABETH - COMPREHENSIVE TEST SUITE")
     print("=" * 60)
     print(f"Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
@@ -92,28 +196,30 @@ def main():
         ("Flutter-Specific Test", "flutter_test.py"),
     ]
     
-    results = []
+    # Resolve ChromeDriver once; every suite inherits CHROMEDRIVER_PATH
+    try:
+        os.environ['CHROMEDRIVER_PATH'] = resolve_chromedriver()
+        print(f"ChromeDriver: {os.environ['CHROMEDRIVER_PATH']}")
+    except Exception as e:
+        print(f"WARNING: Could not resolve ChromeDriver: {e}")
     
     # Run each test
-    for test_name, test_file in tests:
-        if os.path.exists(test_file):
-            passed, stdout, stderr, duration = run_test(test_name, test_file)
-            results.append({
-                'name': test_name,
-                'passed': passed,
-                'stdout': stdout,
-                'stderr': stderr,
-                'duration': duration
-            })
-        else:
-            print(f"WARNING: Test file not found: {test_file}")
-            results.append({
-                'name': test_name,
-                'passed': False,
-                'stdout': "",
-                'stderr': f"Test file not found: {test_file}",
-                'duration': 0
-            })
+    summary = SummaryWriter()
+    warm_build_hash = prepare_warm_build_hash() if args.warm_profile else None
+    if args.workers > 1:
+        results = run_parallel(tests, args.workers, summary, warm_build_hash)
+    else:
+        results = run_sequential(tests, summary, warm_build_hash)
+    
+    # Keep suite durations for run-to-run comparison
+    history = RunHistory()
+    try:
+        run_id = history.start_run("suites")
+        for result in results:
+            if result['passed']:
+                history.add_samples(run_id, result['name'], "duration", [result['duration']])
+    finally:
+        history.close()
     
     # Generate report
     report_file = generate_report(results)
@@ -138,6 +244,8 @@ def main():
         print(f"\n{failed_tests} test(s) failed. Check the report for details.")
     
     print(f"\nDetailed report: {report_file}")
+    print(f"Per-suite logs: {summary.reports_dir / 'logs'}")
+    print(f"Machine-readable: {summary.summary_file}, {summary.junit_file}")
     print(f"Screenshots: Check the current directory for .png files")
     
     return passed_tests == total_tests
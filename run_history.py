@@ -0,0 +1,185 @@
+"""
+Local SQLite history of test/benchmark measurements and a statistical regression gate
+"""
+import math
+import os
+import socket
+import sqlite3
+import statistics
+import subprocess
+from datetime import datetime
+from pathlib import Path
+
+HISTORY_DB = Path(os.environ.get("RUN_HISTORY_DB", "reports/run_history.sqlite"))
+BASELINE_RUNS = 10
+MIN_SAMPLES = 5
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    started TEXT NOT NULL,
+    git_rev TEXT,
+    host TEXT,
+    gate TEXT
+);
+CREATE TABLE IF NOT EXISTS samples (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    value REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_samples_name_metric ON samples(name, metric, run_id);
+CREATE INDEX IF NOT EXISTS idx_runs_kind ON runs(kind, id);
+"""
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                              capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+class RunHistory:
+    """Per-run samples of named metrics, e.g. ('nav.Inventory', 'latency_ms')"""
+
+    def __init__(self, path=HISTORY_DB):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.executescript(SCHEMA)
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(runs)")}
+        if "gate" not in columns:
+            # Histories written before the regression gate recorded its verdict
+            with self.conn:
+                self.conn.execute("ALTER TABLE runs ADD COLUMN gate TEXT")
+
+    def close(self):
+        self.conn.close()
+
+    def start_run(self, kind):
+        """Create a run and return its id"""
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO runs (kind, started, git_rev, host) VALUES (?, ?, ?, ?)",
+                (kind, datetime.now().isoformat(timespec="seconds"), git_revision(), socket.gethostname()),
+            )
+        return cursor.lastrowid
+
+    def set_gate(self, run_id, passed):
+        """Record the regression gate's verdict; failed runs never become baseline"""
+        with self.conn:
+            self.conn.execute("UPDATE runs SET gate = ? WHERE id = ?", ("passed" if passed else "failed", run_id))
+
+    def add_samples(self, run_id, name, metric, values):
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO samples (run_id, name, metric, value) VALUES (?, ?, ?, ?)",
+                [(run_id, name, metric, float(v)) for v in values],
+            )
+
+    def samples(self, run_id, name, metric):
+        rows = self.conn.execute(
+            "SELECT value FROM samples WHERE run_id = ? AND name = ? AND metric = ?",
+            (run_id, name, metric),
+        )
+        return [row[0] for row in rows]
+
+    def series(self, run_id):
+        """Distinct (name, metric) pairs recorded in a run"""
+        return self.conn.execute(
+            "SELECT DISTINCT name, metric FROM samples WHERE run_id = ?", (run_id,)
+        ).fetchall()
+
+    def baseline(self, name, metric, kind, before_run, runs=BASELINE_RUNS):
+        """Pooled samples from the last `runs` runs of this kind before before_run, gate failures excluded"""
+        rows = self.conn.execute(
+            """
+            SELECT s.value FROM samples s
+            WHERE s.name = ? AND s.metric = ? AND s.run_id IN (
+                SELECT id FROM runs WHERE kind = ? AND id < ? AND gate IS NOT 'failed'
+                ORDER BY id DESC LIMIT ?
+            )
+            """,
+            (name, metric, kind, before_run, runs),
+        )
+        return [row[0] for row in rows]
+
+    def median_by_name(self, kind, metric, runs=BASELINE_RUNS):
+        """Median of each name's samples over the last `runs` runs of this kind"""
+        rows = self.conn.execute(
+            """
+            SELECT s.name, s.value FROM samples s
+            WHERE s.metric = ? AND s.run_id IN (
+                SELECT id FROM runs WHERE kind = ? ORDER BY id DESC LIMIT ?
+            )
+            """,
+            (metric, kind, runs),
+        )
+        values = {}
+        for name, value in rows:
+            values.setdefault(name, []).append(value)
+        return {name: statistics.median(v) for name, v in values.items()}
+
+def mann_whitney_u(current, baseline):
+    """One-sided Mann-Whitney U test that `current` tends to be larger than `baseline`.
+
+    Uses the normal approximation with tie and continuity correction; returns (U, p).
+    """
+    n1, n2 = len(current), len(baseline)
+    combined = sorted([(v, 0) for v in current] + [(v, 1) for v in baseline])
+
+    ranks = [0.0] * len(combined)
+    tie_term = 0
+    i = 0
+    while i < len(combined):
+        j = i
+        while j + 1 < len(combined) and combined[j + 1][0] == combined[i][0]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[k] = (i + j) / 2 + 1
+        size = j - i + 1
+        tie_term += size ** 3 - size
+        i = j + 1
+
+    rank_sum = sum(rank for rank, (_, group) in zip(ranks, combined) if group == 0)
+    u = rank_sum - n1 * (n1 + 1) / 2
+    n = n1 + n2
+    variance = n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1)))
+    if variance <= 0:
+        return u, 1.0
+    z = (u - n1 * n2 / 2 - 0.5) / math.sqrt(variance)
+    return u, 0.5 * math.erfc(z / math.sqrt(2))
+
+def check_regressions(history, run_id, kind, threshold=0.10, alpha=0.05, min_samples=MIN_SAMPLES):
+    """Metrics in run_id that are significantly slower than their stored baseline.
+
+    A metric regresses only if the shift is significant (p < alpha) AND its
+    median grew by more than `threshold`; either alone is treated as noise.
+    The verdict is stored on the run so a regressed run can't become baseline.
+    """
+    regressions = []
+    for name, metric in history.series(run_id):
+        current = history.samples(run_id, name, metric)
+        baseline = history.baseline(name, metric, kind, before_run=run_id)
+        if len(current) < min_samples or len(baseline) < min_samples:
+            continue
+
+        base_median = statistics.median(baseline)
+        current_median = statistics.median(current)
+        if base_median <= 0:
+            continue
+        change = current_median / base_median - 1
+        _, p_value = mann_whitney_u(current, baseline)
+
+        if p_value < alpha and change > threshold:
+            regressions.append({
+                "name": name,
+                "metric": metric,
+                "baseline_median": base_median,
+                "current_median": current_median,
+                "change": change,
+                "p_value": p_value,
+            })
+    history.set_gate(run_id, not regressions)
+    return regressions
@@ -2,11 +2,18 @@
 """
 Test execution script for Hacienda Elizabeth
 """
+import argparse
+import json
 import os
+import shutil
 import sys
 import subprocess
-import time
 from pathlib import Path
+from app_server import FlutterRunProcess, StaticAppServer, dart_define_args, wait_until_ready
+from asset_proxy import AssetProxy
+from build_cache import BuildCache, hash_build_inputs
+from run_history import RunHistory, check_regressions
+from supabase_stub import PROFILES, SupabaseStub
 
 def create_directories():
     """Create necessary directories"""
@@ -26,26 +33,91 @@ def install_dependencies():
         return False
     return True
 
-def run_flutter_app():
-    """Start Flutter app in background"""
-    print("🚀 Starting Flutter app...")
+def build_web_app(dart_defines=None):
+    """Build the Flutter web bundle into build/web"""
+    print("🔨 Building Flutter web app...")
     try:
-        # Start Flutter app
-        process = subprocess.Popen(
-            ['flutter', 'run', '-d', 'chrome', '--web-port=3000'],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE
-        )
+        subprocess.run([shutil.which('flutter') or 'flutter', 'build', 'web'] + dart_define_args(dart_defines), check=True)
+        return True
+    except (OSError, subprocess.CalledProcessError) as e:
+        print(f"❌ Failed to build Flutter app: {e}")
+        return False
+
+def prepare_web_build(dart_defines=None):
+    """Reuse a cached build/web when lib/, assets/, web/ and pubspec are unchanged"""
+    cache = BuildCache()
+    # Defines are compiled in, so a stub-backed build is a different artifact
+    key = hash_build_inputs(extra=json.dumps(dart_defines or {}, sort_keys=True))
+    
+    if cache.is_current(key):
+        print(f"✅ build/web is up to date ({key[:12]})")
+        return True
+    if cache.restore(key):
+        print(f"✅ Restored cached web build ({key[:12]})")
+        return True
+    
+    if not build_web_app(dart_defines):
+        return False
+    cache.store(key)
+    print(f"✅ Cached web build ({key[:12]})")
+    return True
+
+def run_flutter_app(mode="live", dart_defines=None):
+    """Start Flutter app in background and wait until it serves its first byte"""
+    print(f"🚀 Starting Flutter app ({mode})...")
+    try:
+        if mode == "build":
+            if not prepare_web_build(dart_defines):
+                return None
+            app = StaticAppServer(precompress=True).start()
+        else:
+            app = FlutterRunProcess(dart_defines=dart_defines).start()
         
         # Wait for app to start
-        time.sleep(30)
-        print("✅ Flutter app started")
-        return process
+        waited = wait_until_ready(app.url)
+        if waited is None:
+            print("❌ Flutter app did not become ready")
+            app.stop()
+            return None
+        
+        print(f"✅ Flutter app started ({waited:.1f}s)")
+        return app
     except Exception as e:
         print(f"❌ Failed to start Flutter app: {e}")
         return None
 
-def run_tests(test_type="all"):
+def start_asset_proxy(offline=False):
+    """Serve CanvasKit and fonts locally; browsers started after this pick it up"""
+    print("🗄️ Starting asset proxy...")
+    try:
+        proxy = AssetProxy(offline=offline).start()
+    except (OSError, subprocess.CalledProcessError) as e:
+        print(f"⚠️ Asset proxy unavailable, browsers will use the CDN: {e}")
+        return None
+    # Inherited by pytest and the benchmark through TestConfig.ASSET_PROXY
+    os.environ["TEST_ASSET_PROXY"] = proxy.address
+    print(f"✅ Asset proxy on {proxy.address}")
+    return proxy
+
+def start_supabase_stub(profile):
+    """Local PostgREST stand-in; returns (stub, dart defines pointing the app at it)"""
+    print(f"🗃️ Starting Supabase stub ({profile})...")
+    try:
+        stub = SupabaseStub(profile=profile).start()
+    except (OSError, RuntimeError) as e:
+        print(f"❌ Supabase stub failed to start: {e}")
+        return None, None
+    print(f"✅ Supabase stub on {stub.url}")
+    return stub, {"SUPABASE_URL": stub.url}
+
+def report_asset_misses(proxy):
+    """List assets that were not cached when first requested"""
+    misses = proxy.cache.misses
+    if misses:
+        print(f"⚠️ {len(misses)} asset(s) missed the cache (see {proxy.cache.misses_file}); "
+              f"seed them with: python asset_proxy.py --seed-misses")
+
+def run_tests(test_type="all", shard=None):
     """Run tests based on type"""
     print(f"🧪 Running {test_type} tests...")
     
@@ -61,14 +133,41 @@ def run_tests(test_type="all"):
         print(f"❌ Unknown test type: {test_type}")
         return False
     
+    command = list(test_commands[test_type])
+    if shard:
+        command += ["--shard", shard]
+    
     try:
-        result = subprocess.run(test_commands[test_type], check=True)
+        result = subprocess.run(command, check=True)
         print("✅ Tests completed successfully")
         return True
     except subprocess.CalledProcessError as e:
         print(f"❌ Tests failed: {e}")
         return False
 
+def run_perf_gate(iterations, threshold):
+    """Benchmark navigation and fail on statistically significant slowdowns"""
+    print(f"📈 Running performance gate ({iterations} iterations)...")
+    # Imported here: it needs selenium, which install_dependencies() provides
+    from benchmark_navigation import run_benchmark
+    
+    result = run_benchmark(iterations)
+    history = RunHistory()
+    try:
+        run_id = history.start_run("benchmark")
+        for name, values in result["samples"].items():
+            history.add_samples(run_id, name, "ms", values)
+        regressions = check_regressions(history, run_id, "benchmark", threshold=threshold)
+    finally:
+        history.close()
+    
+    for regression in regressions:
+        print(f"❌ {regression['name']}: {regression['baseline_median']:.1f} -> "
+              f"{regression['current_median']:.1f} ms (+{regression['change']:.0%}, p={regression['p_value']:.4f})")
+    if not regressions:
+        print("✅ No performance regressions")
+    return not regressions
+
 def generate_report():
     """Generate test report"""
     print("📊 Generating test report...")
@@ -80,8 +179,35 @@ def generate_report():
     except Exception as e:
         print(f"⚠️ Failed to generate Allure report: {e}")
 
-def main():
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Hacienda Elizabeth test suite")
+    parser.add_argument("test_type", nargs="?", default="all",
+                        help="smoke, regression, integration, ui or all")
+    parser.add_argument("--app", choices=["live", "build"], default="live",
+                        help="live: flutter run with hot reload; build: serve prebuilt build/web")
+    parser.add_argument("--shard", default=None,
+                        help="run shard i of n (e.g. 2/4) of the selected tests, slowest first")
+    parser.add_argument("--perf-gate", action="store_true",
+                        help="fail if navigation benchmarks regress against run history")
+    parser.add_argument("--perf-iterations", type=int, default=10,
+                        help="benchmark samples per metric for the performance gate")
+    parser.add_argument("--perf-threshold", type=float, default=0.10,
+                        help="minimum median slowdown (fraction) that counts as a regression")
+    parser.add_argument("--backend", choices=["remote", "stub"], default="remote",
+                        help="remote: the configured Supabase project; stub: local in-memory stand-in")
+    parser.add_argument("--backend-profile", choices=sorted(PROFILES), default="fast",
+                        help="latency/error profile for --backend stub")
+    parser.add_argument("--asset-proxy", action="store_true",
+                        help="serve CanvasKit and fonts from the local asset cache")
+    parser.add_argument("--offline-assets", action="store_true",
+                        help="with --asset-proxy, never fetch cache misses from the CDN")
+    return parser.parse_args(argv)
+
+def main(argv=None):
     """Main execution function"""
+    args = parse_args(argv)
+    
     print("🌾 Hacienda Elizabeth Test Suite")
     print("=" * 50)
     
@@ -92,17 +218,30 @@ def main():
     if not install_dependencies():
         sys.exit(1)
     
-    # Get test type from command line
-    test_type = sys.argv[1] if len(sys.argv) > 1 else "all"
+    # Start asset proxy before any browser is launched
+    asset_proxy = start_asset_proxy(args.offline_assets) if args.asset_proxy else None
+    
+    # Start the backend stand-in first: its URL is compiled into the app
+    supabase_stub, dart_defines = None, None
+    if args.backend == "stub":
+        supabase_stub, dart_defines = start_supabase_stub(args.backend_profile)
+        if not supabase_stub:
+            sys.exit(1)
     
     # Start Flutter app
-    flutter_process = run_flutter_app()
-    if not flutter_process:
+    flutter_app = run_flutter_app(args.app, dart_defines)
+    if not flutter_app:
+        if asset_proxy:
+            asset_proxy.stop()
+        if supabase_stub:
+            supabase_stub.stop()
         sys.exit(1)
     
     try:
         # Run tests
-        success = run_tests(test_type)
+        success = run_tests(args.test_type, args.shard)
+        if args.perf_gate:
+            success = run_perf_gate(args.perf_iterations, args.perf_threshold) and success
         
         # Generate report
         generate_report()
@@ -115,9 +254,14 @@ def main():
             
     finally:
         # Cleanup
-        if flutter_process:
-            flutter_process.terminate()
+        if flutter_app:
+            flutter_app.stop()
             print("🧹 Flutter app stopped")
+        if asset_proxy:
+            report_asset_misses(asset_proxy)
+            asset_proxy.stop()
+        if supabase_stub:
+            supabase_stub.stop()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,216 @@
+"""
+Rolling CDP screencast for failed tests: delta-encoded frames in memory, a clip on disk only on failure
+
+Chrome pushes JPEG frames (Page.startScreencast) only when the page repaints.
+The recorder acks each one on the CDP reader thread, throttles to the
+configured fps and encodes on its own worker thread:
+  - a keyframe (the JPEG as received) starts a group every KEYFRAME_SECONDS
+  - every other frame keeps only the TILE x TILE tiles that changed since the
+    previous frame, zlib-compressed; unchanged repaints cost nothing
+Whole groups older than the window are evicted, so memory stays at a few
+seconds of mostly tiny deltas. flush() replays the window into an animated
+WebP (GIF if Pillow lacks WebP) with the original frame timing.
+"""
+import base64
+import io
+import queue
+import re
+import threading
+import time
+import zlib
+from collections import deque, namedtuple
+from pathlib import Path
+import numpy as np
+from PIL import Image, features
+from cdp_client import CDPError, session_for
+
+CLIP_DIR = Path("reports/screencasts")
+FPS = 5
+WINDOW_SECONDS = 15
+KEYFRAME_SECONDS = 3
+TILE = 32  # a multiple of JPEG's 16px MCU, so untouched tiles decode byte-identical
+MAX_SIZE = (960, 540)  # Chrome scales frames down before sending them
+JPEG_QUALITY = 60
+COMPOSITOR_FPS = 60
+
+Frame = namedtuple("Frame", "timestamp keyframe shape payload tiles")
+
+def to_tiles(pixels, tile=TILE):
+    """(rows * cols, tile, tile, 3) view of an image padded to whole tiles"""
+    height, width, _ = pixels.shape
+    rows, cols = -(-height // tile), -(-width // tile)
+    padded = np.pad(pixels, ((0, rows * tile - height), (0, cols * tile - width), (0, 0)))
+    return padded.reshape(rows, tile, cols, tile, 3).swapaxes(1, 2).reshape(rows * cols, tile, tile, 3)
+
+def from_tiles(tiles, shape, tile=TILE):
+    height, width, _ = shape
+    rows, cols = -(-height // tile), -(-width // tile)
+    padded = tiles.reshape(rows, cols, tile, tile, 3).swapaxes(1, 2).reshape(rows * tile, cols * tile, 3)
+    return padded[:height, :width]
+
+def encode_delta(tiles, previous):
+    """Indices of changed tiles and their compressed pixels; None if nothing changed"""
+    changed = np.flatnonzero((tiles != previous).reshape(len(tiles), -1).any(axis=1))
+    if not len(changed):
+        return None
+    return changed, zlib.compress(np.ascontiguousarray(tiles[changed]).tobytes(), 1)
+
+def _decode_jpeg(data):
+    return np.asarray(Image.open(io.BytesIO(data)).convert("RGB"))
+
+class ScreencastRecorder:
+    """Keeps the last WINDOW_SECONDS of one page's screencast"""
+
+    def __init__(self, session, fps=FPS, window=WINDOW_SECONDS, max_size=MAX_SIZE):
+        self.session = session
+        self.fps = fps
+        self.window = window
+        self.max_size = max_size
+        self.groups = deque()
+        self.previous = None
+        self.previous_shape = None
+        self.last_timestamp = 0.0
+        self.lock = threading.Lock()
+        self.inbox = queue.Queue(maxsize=4)
+        self.stats = {"received": 0, "skipped": 0, "keyframes": 0, "deltas": 0, "unchanged": 0}
+        self.worker = None
+
+    def start(self):
+        self.session.on("Page.screencastFrame", self._on_frame)
+        self.worker = threading.Thread(target=self._work, name="screencast-encoder", daemon=True)
+        self.worker.start()
+        self.session.send("Page.startScreencast", {
+            "format": "jpeg",
+            "quality": JPEG_QUALITY,
+            "maxWidth": self.max_size[0],
+            "maxHeight": self.max_size[1],
+            "everyNthFrame": max(1, round(COMPOSITOR_FPS / self.fps)),
+        })
+        return self
+
+    def stop(self):
+        try:
+            self.session.send("Page.stopScreencast")
+        except CDPError:
+            pass
+        self.session.off("Page.screencastFrame", self._on_frame)
+        self.inbox.put(None)
+
+    def _on_frame(self, params):
+        # Runs on the CDP reader thread: ack first or Chrome stops sending, then get out of the way
+        self.session.send_nowait("Page.screencastFrameAck", {"sessionId": params["sessionId"]})
+        self.stats["received"] += 1
+        timestamp = params.get("metadata", {}).get("timestamp") or time.time()
+        if timestamp - self.last_timestamp < 1.0 / self.fps:
+            self.stats["skipped"] += 1
+            return
+        try:
+            self.inbox.put_nowait((timestamp, params["data"]))
+            self.last_timestamp = timestamp
+        except queue.Full:
+            self.stats["skipped"] += 1
+
+    def _work(self):
+        while True:
+            try:
+                item = self.inbox.get(timeout=1)
+            except queue.Empty:
+                if self.session.closed.is_set():
+                    return
+                continue
+            if item is None:
+                return
+            try:
+                self._encode(*item)
+            except Exception as e:
+                print(f"⚠️ Screencast frame dropped: {e}")
+            finally:
+                self.inbox.task_done()
+
+    def _encode(self, timestamp, data):
+        jpeg = base64.b64decode(data)
+        pixels = _decode_jpeg(jpeg)
+        tiles = to_tiles(pixels)
+        with self.lock:
+            if (self.previous is None or self.previous.shape != tiles.shape or not self.groups
+                    or timestamp - self.groups[-1][0].timestamp >= KEYFRAME_SECONDS):
+                self.groups.append([Frame(timestamp, True, pixels.shape, jpeg, None)])
+                self.stats["keyframes"] += 1
+            else:
+                delta = encode_delta(tiles, self.previous)
+                if delta is None:
+                    self.stats["unchanged"] += 1
+                    return
+                self.groups[-1].append(Frame(timestamp, False, pixels.shape, delta[1], delta[0]))
+                self.stats["deltas"] += 1
+            self.previous, self.previous_shape = tiles, pixels.shape
+            while len(self.groups) > 1 and self.groups[1][0].timestamp <= timestamp - self.window:
+                self.groups.popleft()
+
+    def restart(self):
+        """Forget the window (a new test begins); the current picture becomes the first keyframe"""
+        with self.lock:
+            self.groups.clear()
+            if self.previous is not None:
+                buffer = io.BytesIO()
+                Image.fromarray(from_tiles(self.previous, self.previous_shape)).save(
+                    buffer, "JPEG", quality=JPEG_QUALITY)
+                self.groups.append([Frame(time.time(), True, self.previous_shape, buffer.getvalue(), None)])
+
+    @property
+    def size_bytes(self):
+        with self.lock:
+            return sum(len(f.payload) + (f.tiles.nbytes if f.tiles is not None else 0)
+                       for group in self.groups for f in group)
+
+    def frames(self):
+        """Decoded (timestamp, pixels) for every frame in the window"""
+        with self.lock:
+            groups = [list(group) for group in self.groups]
+        for group in groups:
+            canvas = None
+            for frame in group:
+                if frame.keyframe:
+                    pixels = _decode_jpeg(frame.payload)
+                    canvas = to_tiles(pixels).copy()
+                else:
+                    tiles = np.frombuffer(zlib.decompress(frame.payload), dtype=np.uint8)
+                    canvas[frame.tiles] = tiles.reshape(len(frame.tiles), TILE, TILE, 3)
+                    pixels = from_tiles(canvas, frame.shape)
+                yield frame.timestamp, pixels
+
+    def flush(self, path, drain_timeout=1.0):
+        """Write the window as an animated clip; returns its path, or None if nothing was recorded"""
+        deadline = time.monotonic() + drain_timeout
+        while self.inbox.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.02)
+        frames = list(self.frames())
+        if not frames:
+            return None
+        images = [Image.fromarray(pixels) for _, pixels in frames]
+        durations = [max(int((b[0] - a[0]) * 1000), 20) for a, b in zip(frames, frames[1:])] + [1000]
+        path = Path(path).with_suffix(".webp" if features.check("webp") else ".gif")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        options = {"quality": 50, "method": 0} if path.suffix == ".webp" else {"optimize": False}
+        images[0].save(path, save_all=True, append_images=images[1:], duration=durations, loop=0, **options)
+        return path
+
+def clip_path(test_id, root=CLIP_DIR):
+    """Where a test's clip goes (suffix chosen by flush)"""
+    return Path(root) / (re.sub(r"[^\w.-]+", "_", test_id).strip("_") or "screencast")
+
+_RECORDERS = {}
+
+def recorder_for(driver, fps=FPS, fallback_port=None, url_prefix=None):
+    """The running recorder for a WebDriver session, started on first use; None if CDP is unreachable"""
+    recorder = _RECORDERS.get(driver.session_id)
+    if recorder is not None and not recorder.session.closed.is_set():
+        return recorder
+    try:
+        session = session_for(driver, fallback_port, url_prefix)
+        recorder = ScreencastRecorder(session, fps).start()
+    except (CDPError, OSError) as e:
+        print(f"⚠️ Screencast unavailable: {e}")
+        return None
+    _RECORDERS[driver.session_id] = recorder
+    return recorder
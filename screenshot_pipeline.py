@@ -0,0 +1,228 @@
+"""
+Asynchronous screenshot capture: CDP frames handed to a writer thread, deduplicated and stored by content
+
+The test thread only asks Chrome for a frame (Page.captureScreenshot already
+returns encoded PNG) and queues it. The writer thread does the rest:
+  - frames wait in memory until their test finishes; with the default
+    "failed" retention a passing test's frames are dropped without ever
+    being decoded or written
+  - kept frames are hashed (sha256 of the file, a 64-bit dHash of the
+    picture) and stored once in objects/<sha[:2]>/<sha>.png; a frame reuses
+    an object with the same sha256, or one with the same dHash whose decoded
+    pixels are identical (the same picture encoded differently), so a
+    reference never shows a picture other than the one captured
+  - runs/<run id>/<test>/<name>.png are hard links into the store, and
+    refs.jsonl records every frame with the object it resolved to
+
+Objects no longer referenced by the last KEEP_RUNS runs are pruned on close.
+"""
+import base64
+import hashlib
+import io
+import json
+import os
+import queue
+import re
+import shutil
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+import numpy as np
+from PIL import Image
+
+SCREENSHOT_DIR = Path("screenshots")
+QUEUE_SIZE = 32
+# Seconds a test thread may wait on a full queue before the frame is dropped
+QUEUE_TIMEOUT = 2.0
+KEEP_RUNS = 5
+
+def dhash(png):
+    """64-bit difference hash: brightness gradients of a 9x8 grayscale thumbnail"""
+    image = Image.open(io.BytesIO(png)).convert("L").resize((9, 8), Image.BILINEAR)
+    pixels = np.asarray(image, dtype=np.int16)
+    return int(np.packbits(pixels[:, 1:] > pixels[:, :-1]).view(">u8")[0])
+
+def pixels(png):
+    """Decoded image as an array, for exact comparison"""
+    image = Image.open(io.BytesIO(png))
+    return np.asarray(image.convert("RGBA" if "A" in image.getbands() else "RGB"))
+
+def _safe(name):
+    return re.sub(r"[^\w.-]+", "_", name).strip("_") or "screenshot"
+
+class ScreenshotPipeline:
+    """Bounded queue plus one writer thread; capture() never encodes or touches the disk"""
+
+    def __init__(self, root=SCREENSHOT_DIR, retention="failed", queue_size=QUEUE_SIZE):
+        self.root = Path(root)
+        self.retention = retention
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.run_id = time.strftime("%Y%m%d_%H%M%S")
+        self.thread = None
+        self.stats = {"captured": 0, "dropped": 0, "discarded": 0, "stored": 0, "duplicates": 0}
+        # Writer thread only
+        self.pending = defaultdict(list)
+        self.index = {}
+        # dHash -> objects with that hash, the candidates for a pixel comparison
+        self.by_dhash = defaultdict(list)
+        self.names = defaultdict(int)
+        self.refs = None
+
+    def start(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, name="screenshot-writer", daemon=True)
+            self.thread.start()
+        return self
+
+    def capture(self, driver, name, test_id=None):
+        """Grab the viewport over CDP and queue it; True unless the queue stayed full"""
+        self.start()
+        data = driver.execute_cdp_cmd("Page.captureScreenshot", {"format": "png", "optimizeForSpeed": True})["data"]
+        self.stats["captured"] += 1
+        try:
+            self.queue.put(("frame", test_id, name, time.time(), data), timeout=QUEUE_TIMEOUT)
+            return True
+        except queue.Full:
+            self.stats["dropped"] += 1
+            return False
+
+    def finish(self, test_id, failed):
+        """Test outcome is known: keep its frames if it failed (or retention is "all")"""
+        if self.thread is not None:
+            self._send(("finish", test_id, failed))
+
+    def close(self):
+        """Drain the queue, keep frames of tests that never reported, prune old runs"""
+        if self.thread is None:
+            return self.stats
+        if not self._send(("stop",)):
+            print("⚠️ Screenshot writer thread died; queued frames were lost")
+        self.thread.join()
+        self.thread = None
+        self._prune()
+        return self.stats
+
+    def _send(self, message):
+        """Queue a control message, giving up if the writer thread has died"""
+        while self.thread.is_alive():
+            try:
+                self.queue.put(message, timeout=QUEUE_TIMEOUT)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _run(self):
+        self._load_index()
+        self.refs = open(self.root / "refs.jsonl", "a", encoding="utf-8")
+        try:
+            while True:
+                message = self.queue.get()
+                if message[0] == "stop":
+                    break
+                try:
+                    if message[0] == "frame":
+                        self._frame(*message[1:])
+                    else:
+                        self._finish(*message[1:])
+                except Exception as e:
+                    print(f"⚠️ Screenshot writer: {e}")
+            for test_id in list(self.pending):
+                self._finish(test_id, True)
+        finally:
+            self.refs.close()
+            (self.root / "objects" / "index.json").write_text(json.dumps(self.index))
+
+    def _load_index(self):
+        (self.root / "objects").mkdir(parents=True, exist_ok=True)
+        index_file = self.root / "objects" / "index.json"
+        if index_file.exists():
+            self.index = {sha: value for sha, value in json.loads(index_file.read_text()).items()
+                          if self._object_path(sha).exists()}
+        for sha, value in self.index.items():
+            self.by_dhash[value].append(sha)
+
+    def _frame(self, test_id, name, taken, data):
+        frame = (test_id, name, taken, data)
+        if self.retention == "all" or test_id is None:
+            self._store(*frame)
+        else:
+            self.pending[test_id].append(frame)
+
+    def _finish(self, test_id, failed):
+        frames = self.pending.pop(test_id, [])
+        if failed:
+            for frame in frames:
+                self._store(*frame)
+        else:
+            self.stats["discarded"] += len(frames)
+
+    def _object_path(self, sha):
+        return self.root / "objects" / sha[:2] / f"{sha}.png"
+
+    def _store(self, test_id, name, taken, data):
+        png = base64.b64decode(data)
+        sha = hashlib.sha256(png).hexdigest()
+        value = dhash(png)
+        duplicate_of = sha if sha in self.index else self._same_picture(png, value)
+
+        if duplicate_of:
+            sha = duplicate_of
+            self.stats["duplicates"] += 1
+        else:
+            path = self._object_path(sha)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            temp = path.with_suffix(".tmp")
+            temp.write_bytes(png)
+            os.replace(temp, path)
+            self.index[sha] = value
+            self.by_dhash[value].append(sha)
+            self.stats["stored"] += 1
+
+        test_dir = _safe(test_id or "session")
+        self.names[(test_dir, name)] += 1
+        count = self.names[(test_dir, name)]
+        link = self.root / "runs" / self.run_id / test_dir / f"{_safe(name)}{'' if count == 1 else f'-{count}'}.png"
+        link.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.link(self._object_path(sha), link)
+        except OSError:
+            shutil.copyfile(self._object_path(sha), link)
+        self.refs.write(json.dumps({
+            "run": self.run_id, "test": test_id, "name": name, "taken": taken, "object": sha,
+            "dhash": f"{value:016x}", "duplicate": duplicate_of is not None,
+            "path": str(link),
+        }) + "\n")
+        self.refs.flush()
+
+    def _same_picture(self, png, value):
+        """A stored object with the same dHash and exactly the same pixels, if any"""
+        frame = None
+        for sha in self.by_dhash.get(value, ()):
+            frame = pixels(png) if frame is None else frame
+            if np.array_equal(frame, pixels(self._object_path(sha).read_bytes())):
+                return sha
+        return None
+
+    def _prune(self):
+        """Forget runs beyond the last KEEP_RUNS and delete objects none of the rest use"""
+        refs_file = self.root / "refs.jsonl"
+        if not refs_file.exists():
+            return
+        refs = [json.loads(line) for line in refs_file.read_text(encoding="utf-8").splitlines() if line.strip()]
+        runs_dir = self.root / "runs"
+        runs = sorted({r["run"] for r in refs} | ({p.name for p in runs_dir.iterdir()} if runs_dir.exists() else set()))
+        keep = set(runs[-KEEP_RUNS:])
+        refs = [r for r in refs if r["run"] in keep]
+        refs_file.write_text("".join(json.dumps(r) + "\n" for r in refs), encoding="utf-8")
+        for run in set(runs) - keep:
+            shutil.rmtree(runs_dir / run, ignore_errors=True)
+
+        used = {r["object"] for r in refs}
+        for sha in [sha for sha in self.index if sha not in used]:
+            self._object_path(sha).unlink(missing_ok=True)
+            self.by_dhash[self.index.pop(sha)].remove(sha)
+        (self.root / "objects" / "index.json").write_text(json.dumps(self.index))
+
+PIPELINE = ScreenshotPipeline()
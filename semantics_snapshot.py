@@ -0,0 +1,168 @@
+"""
+Single-round-trip snapshot of the Flutter semantics tree with in-Python lookups
+"""
+from collections import defaultdict, namedtuple
+
+# Installs a MutationObserver on first use, then returns either every
+# flt-semantics node (full) or only the nodes that changed since last call.
+SNAPSHOT_SCRIPT = """
+var full = arguments[0];
+var index = window.__semanticsIndex;
+if (!index) {
+    index = window.__semanticsIndex = {next: 1, dirty: new Set(), removed: new Set()};
+    index.handle = function (el) {
+        if (!el.dataset.semanticsHandle) {
+            el.dataset.semanticsHandle = String(index.next++);
+        }
+        return el.dataset.semanticsHandle;
+    };
+    index.collect = function (node, callback) {
+        if (node.nodeType !== 1) { return; }
+        if (node.tagName === 'FLT-SEMANTICS') { callback(node); }
+        node.querySelectorAll('flt-semantics').forEach(callback);
+    };
+    new MutationObserver(function (mutations) {
+        mutations.forEach(function (m) {
+            if (m.attributeName === 'data-semantics-handle') { return; }
+            if (m.type === 'childList') {
+                m.addedNodes.forEach(function (n) {
+                    index.collect(n, function (el) { index.dirty.add(el); });
+                });
+                m.removedNodes.forEach(function (n) {
+                    index.collect(n, function (el) {
+                        if (el.dataset.semanticsHandle) { index.removed.add(el.dataset.semanticsHandle); }
+                    });
+                });
+            }
+            var target = m.target.nodeType === 1 ? m.target : m.target.parentElement;
+            var owner = target && target.closest('flt-semantics');
+            if (owner) {
+                // Moving a node moves its children, so their rects are stale too
+                index.collect(owner, function (el) { index.dirty.add(el); });
+            }
+        });
+    }).observe(document.documentElement, {
+        subtree: true, childList: true, attributes: true, characterData: true
+    });
+}
+
+// Text of the node itself; nested flt-semantics nodes are described on their own,
+// otherwise every container would carry the labels of everything inside it
+function ownText(el) {
+    var text = '';
+    el.childNodes.forEach(function (child) {
+        if (child.nodeType === 3) {
+            text += child.nodeValue;
+        } else if (child.nodeType === 1 && child.tagName !== 'FLT-SEMANTICS') {
+            text += ownText(child);
+        }
+    });
+    return text;
+}
+
+function describe(el) {
+    var r = el.getBoundingClientRect();
+    return {
+        handle: index.handle(el),
+        label: el.getAttribute('aria-label') || ownText(el).trim(),
+        role: el.getAttribute('role') || '',
+        rect: [r.x, r.y, r.width, r.height]
+    };
+}
+
+var changed = [];
+var removed = [];
+if (full) {
+    document.querySelectorAll('flt-semantics').forEach(function (el) { changed.push(describe(el)); });
+} else {
+    index.dirty.forEach(function (el) { if (el.isConnected) { changed.push(describe(el)); } });
+    removed = Array.from(index.removed);
+}
+index.dirty.clear();
+index.removed.clear();
+return {changed: changed, removed: removed};
+"""
+
+CLICK_SCRIPT = """
+var el = document.querySelector('flt-semantics[data-semantics-handle="' + arguments[0] + '"]');
+if (!el) { return false; }
+el.click();
+return true;
+"""
+
+# Flutter only builds the semantics tree once accessibility is switched on
+ENABLE_SEMANTICS_SCRIPT = """
+var placeholder = document.querySelector('flt-semantics-placeholder');
+if (placeholder) { placeholder.click(); }
+return placeholder !== null;
+"""
+
+SemanticsNode = namedtuple("SemanticsNode", "handle label role rect")
+
+class SemanticsSnapshot:
+    """All flt-semantics nodes fetched in one execute_script call, indexed by label and role"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.nodes = {}
+        self.by_label = defaultdict(set)
+        self.by_role = defaultdict(set)
+
+    @staticmethod
+    def enable_semantics(driver):
+        """Turn on the Flutter semantics tree; True if it was off"""
+        return driver.execute_script(ENABLE_SEMANTICS_SCRIPT)
+
+    def capture(self):
+        """Rebuild the snapshot from every node on the page"""
+        self.nodes.clear()
+        self.by_label.clear()
+        self.by_role.clear()
+        self._apply(self.driver.execute_script(SNAPSHOT_SCRIPT, True))
+        return self
+
+    def refresh(self):
+        """Apply only the changes the MutationObserver saw; returns the number of nodes touched"""
+        delta = self.driver.execute_script(SNAPSHOT_SCRIPT, False)
+        self._apply(delta)
+        return len(delta["changed"]) + len(delta["removed"])
+
+    def _apply(self, delta):
+        for handle in delta["removed"]:
+            self._unindex(handle)
+        for item in delta["changed"]:
+            self._unindex(item["handle"])
+            node = SemanticsNode(item["handle"], item["label"], item["role"], tuple(item["rect"]))
+            self.nodes[node.handle] = node
+            self.by_label[node.label.lower()].add(node.handle)
+            self.by_role[node.role].add(node.handle)
+
+    def _unindex(self, handle):
+        node = self.nodes.pop(handle, None)
+        if node is None:
+            return
+        self.by_label[node.label.lower()].discard(handle)
+        self.by_role[node.role].discard(handle)
+
+    def find(self, label=None, role=None):
+        """Nodes with an exact (case-insensitive) label and/or role"""
+        handles = None
+        if label is not None:
+            handles = set(self.by_label.get(label.lower(), ()))
+        if role is not None:
+            by_role = self.by_role.get(role, set())
+            handles = set(by_role) if handles is None else handles & by_role
+        if handles is None:
+            handles = self.nodes.keys()
+        return [self.nodes[h] for h in handles]
+
+    def find_containing(self, text, role=None):
+        """Nodes whose label contains text; scans the local snapshot, no round trip"""
+        text = text.lower()
+        candidates = self.find(role=role) if role is not None else self.nodes.values()
+        return [node for node in candidates if text in node.label.lower()]
+
+    def click(self, node):
+        """Click a node through its cached handle; False if it has left the page"""
+        handle = node.handle if isinstance(node, SemanticsNode) else node
+        return self.driver.execute_script(CLICK_SCRIPT, handle)
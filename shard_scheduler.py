@@ -0,0 +1,59 @@
+"""
+Duration-aware test sharding (longest processing time first) for pytest
+"""
+import heapq
+import json
+import statistics
+from pathlib import Path
+
+DEFAULT_DURATION = 30.0  # seconds, for tests with no history at all
+# Committed medians every runner shards by; local run history differs between CI machines
+DURATIONS_FILE = Path("benchmarks/test_durations.json")
+
+def parse_shard(value):
+    """'2/4' -> (1, 4): zero-based shard index and shard count"""
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise ValueError(f"--shard expects i/n, got {value!r}")
+    if not 1 <= index <= count:
+        raise ValueError(f"--shard index must be between 1 and {count}, got {index}")
+    return index - 1, count
+
+def estimate_durations(test_ids, history):
+    """Historical median per test; unknown tests get the median of the known ones"""
+    known = {test_id: history[test_id] for test_id in test_ids if test_id in history}
+    fallback = statistics.median(known.values()) if known else DEFAULT_DURATION
+    return {test_id: known.get(test_id, fallback) for test_id in test_ids}
+
+def assign_shards(durations, count):
+    """Greedy LPT: hand the longest remaining test to the least-loaded shard.
+
+    Returns a list of (load, [test ids]) per shard, each list longest first.
+    """
+    shards = [[] for _ in range(count)]
+    loads = [(0.0, index) for index in range(count)]
+    heapq.heapify(loads)
+
+    # Ties broken by test id so every runner computes the same split
+    for test_id in sorted(durations, key=lambda t: (-durations[t], t)):
+        load, index = heapq.heappop(loads)
+        shards[index].append(test_id)
+        heapq.heappush(loads, (load + durations[test_id], index))
+
+    totals = [sum(durations[t] for t in shard) for shard in shards]
+    return list(zip(totals, shards))
+
+def load_durations(path=DURATIONS_FILE):
+    """{test id: seconds} from a durations file; empty if there is none"""
+    try:
+        return {test_id: float(seconds) for test_id, seconds in json.loads(Path(path).read_text()).items()}
+    except (OSError, ValueError):
+        return {}
+
+def save_durations(medians, path=DURATIONS_FILE):
+    """Write medians sorted by test id (stable diffs when the file is committed)"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({t: round(medians[t], 2) for t in sorted(medians)}, indent=2) + "\n")
+    return path
@@ -2,7 +2,6 @@
 """
 Simple test script for basic functionality
 """
-import time
 import os
 from selenium import webdriver
 from selenium.webdriver.common.by import By
@@ -10,6 +9,8 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
+from test_config import TestConfig
+from flutter_idle import wait_for_flutter_app
 
 def simple_test():
     """Run a simple test of the application"""
@@ -25,7 +26,8 @@ def simple_test():
     options.add_argument("--disable-logging")
     options.add_argument("--disable-web-security")
     options.add_argument("--allow-running-insecure-content")
-    options.add_argument("--remote-debugging-port=9222")
+    TestConfig.apply_worker_isolation(options)
+    TestConfig.apply_asset_proxy(options)
     
     # Try to find Chrome executable
     chrome_paths = [
@@ -49,7 +51,7 @@ def simple_test():
     try:
         # Try to create driver
         print("Creating Chrome driver...")
-        driver = webdriver.Chrome(options=options)
+        driver = webdriver.Chrome(service=Service(TestConfig.get_chromedriver_path()), options=options)
         print("SUCCESS: Chrome driver created")
         
         # Navigate to the app
@@ -58,7 +60,11 @@ def simple_test():
         
         # Wait for page to load
         print("Waiting for page to load...")
-        time.sleep(15)  # Give more time for Flutter to load
+        waited = wait_for_flutter_app(driver)
+        if waited is not None:
+            print(f"Flutter app settled after {waited:.2f}s")
+        else:
+            print("WARNING: Flutter app did not mount in time")
         
         # Check page title
         title = driver.title
@@ -0,0 +1,124 @@
+"""
+Step timing instrumentation for BaseTest actions and WebDriver round trips
+"""
+import functools
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+
+MAX_TRACE_EVENTS = 200000
+PERCENTILES = (50, 95, 99)
+
+def percentile(sorted_values, pct):
+    """Linear-interpolated percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = (len(sorted_values) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (rank - low)
+
+def _stats(durations):
+    values = sorted(durations)
+    stats = {
+        "count": len(values),
+        "total": round(sum(values), 6),
+        "max": round(values[-1], 6),
+    }
+    for pct in PERCENTILES:
+        stats[f"p{pct}"] = round(percentile(values, pct), 6)
+    return stats
+
+class StepTimer:
+    """Collects wall time per action, tagged with the current test and screen"""
+
+    def __init__(self):
+        self.test = None
+        self.screen = None
+        self.by_action = defaultdict(list)
+        self.by_target = defaultdict(list)
+        self.trace_events = []
+        self.origin = time.perf_counter()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def step(self, action, category="action", target=None):
+        """Time the enclosed block as one step"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(action, start, time.perf_counter() - start, category, target)
+
+    def record(self, action, start, duration, category="action", target=None):
+        with self._lock:
+            self.by_action[action].append(duration)
+            if target is not None:
+                self.by_target[(action, target)].append(duration)
+            if len(self.trace_events) < MAX_TRACE_EVENTS:
+                self.trace_events.append({
+                    "name": action,
+                    "cat": category,
+                    "ph": "X",
+                    "ts": round((start - self.origin) * 1e6),
+                    "dur": round(duration * 1e6),
+                    "pid": os.getpid(),
+                    "tid": threading.get_ident(),
+                    "args": {"test": self.test, "screen": self.screen, "target": target},
+                })
+
+    def instrument_driver(self, driver):
+        """Time every WebDriver command the driver sends"""
+        if getattr(driver, "_step_timer", None) is self:
+            return driver
+        execute = driver.execute
+
+        def timed_execute(driver_command, params=None):
+            with self.step(f"webdriver.{driver_command}", category="webdriver"):
+                return execute(driver_command, params)
+
+        driver.execute = timed_execute
+        driver._step_timer = self
+        return driver
+
+    def summary(self, top_targets=10):
+        """Per-action percentiles plus the slowest targets (selectors) per action"""
+        with self._lock:
+            actions = {action: _stats(d) for action, d in self.by_action.items()}
+            targets = sorted(
+                ({"action": action, "target": target, **_stats(d)}
+                 for (action, target), d in self.by_target.items()),
+                key=lambda item: item["total"],
+                reverse=True,
+            )
+        return {"actions": actions, "slowest_targets": targets[:top_targets]}
+
+    def export(self, directory):
+        """Write timings.json (histograms) and trace.json (chrome://tracing format)"""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        timings_file = directory / "timings.json"
+        trace_file = directory / "trace.json"
+        timings_file.write_text(json.dumps(self.summary(), indent=2))
+        with self._lock:
+            trace = {"traceEvents": list(self.trace_events), "displayTimeUnit": "ms"}
+        trace_file.write_text(json.dumps(trace))
+        return timings_file, trace_file
+
+TIMER = StepTimer()
+
+def timed_action(action):
+    """Decorator timing a BaseTest method; a locator first argument becomes the target"""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            locator = args[0] if args and isinstance(args[0], tuple) else None
+            target = locator[1] if locator else None
+            with TIMER.step(action, target=target):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,628 @@
+#!/usr/bin/env python3
+"""
+Offline Supabase stand-in: the PostgREST subset SupabaseService uses, over an in-memory store
+
+Tables, defaults, CHECK lists and indexes come from the schema SQL. Build
+the app with --dart-define=SUPABASE_URL=<stub url> (run_tests.py --backend
+stub does this) to point it here. Realtime subscriptions are served by
+realtime_stub.py on the same port.
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import sys
+import threading
+import uuid
+from datetime import date, datetime, timezone
+from pathlib import Path
+from urllib.parse import parse_qsl, unquote, urlsplit
+from realtime_stub import ChangeReplay, RealtimeHub
+
+SCHEMA_FILE = Path("HACIENDA_ELIZABETH_COMPLETE_SCHEMA_WITH_INSIGHTS.sql")
+STUB_PORT = 54321
+
+# Injected delay (ms) and failure rate per backend profile
+PROFILES = {
+    "fast": {"latency_ms": 0, "jitter_ms": 0, "error_rate": 0.0},
+    "lan": {"latency_ms": 5, "jitter_ms": 2, "error_rate": 0.0},
+    "slow": {"latency_ms": 400, "jitter_ms": 150, "error_rate": 0.0},
+    "flaky": {"latency_ms": 80, "jitter_ms": 40, "error_rate": 0.1},
+}
+
+CREATE_TABLE = re.compile(r"CREATE TABLE IF NOT EXISTS (\w+)\s*\((.*?)\);", re.S | re.I)
+CREATE_INDEX = re.compile(r"CREATE (UNIQUE )?INDEX (?:IF NOT EXISTS )?(\w+) ON (\w+)\s*\(([^)]*)\)", re.I)
+COLUMN_TYPE = re.compile(r"^(TIMESTAMP WITH TIME ZONE|TIMESTAMP|DECIMAL\(\d+,\s*\d+\)|\w+)", re.I)
+COLUMN_DEFAULT = re.compile(r"DEFAULT\s+('(?:[^']|'')*'|[\w.]+(?:\(\))?(?:::\w+)?)", re.I)
+COLUMN_CHECK = re.compile(r"CHECK\s*\(\s*\w+\s+IN\s*\(([^)]*)\)\s*\)", re.I)
+CONSTRAINT_KEYWORDS = ("PRIMARY", "UNIQUE", "CONSTRAINT", "CHECK", "FOREIGN")
+
+class PostgrestError(Exception):
+    """Error reported to the client in PostgREST's JSON shape"""
+
+    def __init__(self, status, code, message, details=None):
+        super().__init__(message)
+        self.status = status
+        self.body = {"code": code, "message": message, "details": details, "hint": None}
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+def _split_top_level(text):
+    """Split a column list on commas that aren't inside parentheses"""
+    parts, depth, current = [], 0, []
+    for char in text:
+        if char == "," and depth == 0:
+            parts.append("".join(current))
+            current = []
+            continue
+        depth += char == "("
+        depth -= char == ")"
+        current.append(char)
+    parts.append("".join(current))
+    return [p.strip() for p in parts if p.strip()]
+
+def _default_factory(expression):
+    """Callable producing a column's DEFAULT value at insert time"""
+    lowered = expression.lower()
+    if lowered.startswith("gen_random_uuid") or lowered.startswith("uuid_generate"):
+        return lambda: str(uuid.uuid4())
+    if lowered.startswith("now") or lowered == "current_timestamp":
+        return _now
+    if lowered == "current_date":
+        return lambda: date.today().isoformat()
+    if lowered in ("true", "false"):
+        return lambda: lowered == "true"
+    if expression.startswith("'"):
+        value = expression[1:-1].replace("''", "'")
+        return lambda: value
+    try:
+        value = int(expression)
+    except ValueError:
+        value = float(expression)
+    return lambda: value
+
+class Column:
+    def __init__(self, name, sql_type, not_null=False, default=None, choices=None):
+        self.name = name
+        self.sql_type = sql_type
+        self.not_null = not_null
+        self.default = default
+        self.choices = choices
+
+    def coerce(self, value):
+        """Query-string value -> Python value comparable with stored ones"""
+        if value is None:
+            return None
+        if self.sql_type == "integer":
+            return int(value)
+        if self.sql_type == "numeric":
+            return float(value)
+        if self.sql_type == "boolean":
+            return value if isinstance(value, bool) else str(value).lower() == "true"
+        return str(value)
+
+class Table:
+    """Rows by primary key plus hash indexes mirroring the schema's CREATE INDEX set"""
+
+    def __init__(self, name, columns, primary_key, unique=()):
+        self.name = name
+        self.columns = {c.name: c for c in columns}
+        self.primary_key = primary_key
+        self.unique = list(unique)
+        self.rows = {}
+        self.indexes = {}
+
+    def add_index(self, name, columns):
+        self.indexes[name] = (tuple(columns), {})
+        for key, row in self.rows.items():
+            self._index_row(key, row)
+
+    def _index_row(self, key, row):
+        for columns, buckets in self.indexes.values():
+            buckets.setdefault(tuple(row.get(c) for c in columns), set()).add(key)
+
+    def _unindex_row(self, key, row):
+        for columns, buckets in self.indexes.values():
+            bucket = buckets.get(tuple(row.get(c) for c in columns))
+            if bucket:
+                bucket.discard(key)
+
+    def _check_columns(self, row):
+        for name in row:
+            if name not in self.columns:
+                raise PostgrestError(400, "PGRST204",
+                                     f"Could not find the '{name}' column of '{self.name}' in the schema cache")
+
+    def _validate(self, row):
+        self._check_columns(row)
+        for column in self.columns.values():
+            value = row.get(column.name)
+            if value is None and column.not_null:
+                raise PostgrestError(400, "23502",
+                                     f'null value in column "{column.name}" of relation "{self.name}" '
+                                     f"violates not-null constraint")
+            if value is not None and column.choices and value not in column.choices:
+                raise PostgrestError(400, "23514",
+                                     f'new row for relation "{self.name}" violates check constraint '
+                                     f'"{self.name}_{column.name}_check"')
+
+    def _conflict(self, row, conflict_columns):
+        if conflict_columns == (self.primary_key,):
+            return row.get(self.primary_key) if row.get(self.primary_key) in self.rows else None
+        for key, existing in self.rows.items():
+            if all(existing.get(c) == row.get(c) for c in conflict_columns):
+                return key
+        return None
+
+    def insert(self, row, resolution=None, on_conflict=None):
+        """Insert one row; resolution is None, 'merge-duplicates' or 'ignore-duplicates'"""
+        self._check_columns(row)
+        conflict_columns = tuple(on_conflict) if on_conflict else (self.primary_key,)
+        existing_key = self._conflict(row, conflict_columns)
+        if existing_key is not None:
+            if resolution == "merge-duplicates":
+                return self.update(existing_key, row)
+            if resolution == "ignore-duplicates":
+                return None
+            raise PostgrestError(409, "23505",
+                                 f'duplicate key value violates unique constraint "{self.name}_pkey"')
+
+        full = {}
+        for column in self.columns.values():
+            if column.name in row:
+                full[column.name] = row[column.name]
+            else:
+                full[column.name] = column.default() if column.default else None
+        self._validate(full)
+        for columns in self.unique:
+            if self._conflict(full, columns) is not None:
+                raise PostgrestError(409, "23505",
+                                     f'duplicate key value violates unique constraint "{self.name}_{columns[0]}_key"')
+        key = full[self.primary_key]
+        self.rows[key] = full
+        self._index_row(key, full)
+        return full
+
+    def update(self, key, changes):
+        old = self.rows[key]
+        new = {**old, **changes}
+        # Mirrors the schema's update_updated_at_column trigger
+        if "updated_at" in self.columns and "updated_at" not in changes:
+            new["updated_at"] = _now()
+        self._validate(new)
+        self._unindex_row(key, old)
+        if new[self.primary_key] != key:
+            del self.rows[key]
+            key = new[self.primary_key]
+        self.rows[key] = new
+        self._index_row(key, new)
+        return new
+
+    def delete(self, key):
+        row = self.rows.pop(key)
+        self._unindex_row(key, row)
+        return row
+
+    def candidate_keys(self, filters):
+        """Smallest key set the primary key or an index can narrow eq/in filters to"""
+        equal = {}
+        for column, operator, value in filters:
+            if operator == "eq":
+                equal[column] = [value]
+            elif operator == "in":
+                equal.setdefault(column, value)
+
+        if self.primary_key in equal:
+            return [k for k in equal[self.primary_key] if k in self.rows]
+        best = None
+        for columns, buckets in self.indexes.values():
+            if not all(c in equal for c in columns):
+                continue
+            keys = set()
+            for combination in _combinations([equal[c] for c in columns]):
+                keys |= buckets.get(combination, set())
+            if best is None or len(keys) < len(best):
+                best = keys
+        return list(self.rows) if best is None else list(best)
+
+def _combinations(value_lists):
+    if not value_lists:
+        yield ()
+        return
+    for value in value_lists[0]:
+        for rest in _combinations(value_lists[1:]):
+            yield (value,) + rest
+
+def load_schema(path=SCHEMA_FILE):
+    """Tables (with their indexes) defined by a schema SQL file"""
+    sql = re.sub(r"--[^\n]*", "", Path(path).read_text(encoding="utf-8"))
+    tables = {}
+    for name, body in CREATE_TABLE.findall(sql):
+        columns, primary_key, unique = [], None, []
+        for definition in _split_top_level(body):
+            if definition.split()[0].upper() in CONSTRAINT_KEYWORDS:
+                continue
+            column_name, rest = definition.split(None, 1)
+            sql_type = COLUMN_TYPE.match(rest).group(1).lower()
+            if sql_type.startswith("timestamp"):
+                sql_type = "timestamp"
+            elif sql_type.startswith(("decimal", "numeric", "real", "double")):
+                sql_type = "numeric"
+            elif sql_type in ("int", "bigint", "smallint", "serial"):
+                sql_type = "integer"
+            elif sql_type == "bool":
+                sql_type = "boolean"
+            upper = rest.upper()
+            default = COLUMN_DEFAULT.search(rest)
+            check = COLUMN_CHECK.search(rest)
+            columns.append(Column(
+                column_name,
+                sql_type,
+                not_null="NOT NULL" in upper or "PRIMARY KEY" in upper,
+                default=_default_factory(default.group(1)) if default else None,
+                choices={c.strip().strip("'") for c in check.group(1).split(",")} if check else None,
+            ))
+            if "PRIMARY KEY" in upper:
+                primary_key = column_name
+            elif re.search(r"\bUNIQUE\b", upper):
+                unique.append((column_name,))
+        tables[name] = Table(name, columns, primary_key or "id", unique)
+
+    for _, index_name, table_name, index_columns in CREATE_INDEX.findall(sql):
+        if table_name in tables:
+            tables[table_name].add_index(index_name, [c.strip().split()[0] for c in index_columns.split(",")])
+    return tables
+
+def _parse_filter(table, column_name, expression):
+    """'eq.5' / 'in.(a,b)' / 'is.null' / 'not.eq.5' -> (column, operator, value, negated)"""
+    column = table.columns.get(column_name)
+    if column is None:
+        raise PostgrestError(400, "42703", f"column {table.name}.{column_name} does not exist")
+    negated = expression.startswith("not.")
+    if negated:
+        expression = expression[4:]
+    operator, _, raw = expression.partition(".")
+    if operator == "in":
+        values = [v.strip().strip('"') for v in raw.strip("()").split(",") if v.strip()]
+        return column_name, "in", [column.coerce(v) for v in values], negated
+    if operator == "is":
+        value = {"null": None, "true": True, "false": False}.get(raw.lower())
+        return column_name, "is", value, negated
+    if operator in ("like", "ilike"):
+        pattern = "^" + re.escape(raw).replace(r"\*", ".*").replace("%", ".*") + "$"
+        return column_name, operator, re.compile(pattern, re.I if operator == "ilike" else 0), negated
+    if operator not in ("eq", "neq", "gt", "gte", "lt", "lte"):
+        raise PostgrestError(400, "PGRST100", f'"failed to parse filter ({operator}.{raw})"')
+    return column_name, operator, column.coerce(raw), negated
+
+def _matches(row, filters):
+    for column, operator, expected, negated in filters:
+        value = row.get(column)
+        if operator == "eq":
+            result = value == expected
+        elif operator == "neq":
+            result = value is not None and value != expected
+        elif operator == "in":
+            result = value in expected
+        elif operator == "is":
+            result = value is expected
+        elif operator in ("like", "ilike"):
+            result = value is not None and bool(expected.match(str(value)))
+        elif value is None:
+            result = False
+        else:
+            result = {"gt": value > expected, "gte": value >= expected,
+                      "lt": value < expected, "lte": value <= expected}[operator]
+        if result == negated:
+            return False
+    return True
+
+def _sort(rows, order):
+    """PostgREST order=col.desc.nullslast,col2 (asc defaults to nulls last, desc to nulls first)"""
+    for term in reversed([t for t in order.split(",") if t]):
+        parts = term.split(".")
+        column = parts[0]
+        descending = "desc" in parts[1:]
+        nulls_first = "nullsfirst" in parts[1:] or (descending and "nullslast" not in parts[1:])
+        present = [r for r in rows if r.get(column) is not None]
+        missing = [r for r in rows if r.get(column) is None]
+        present.sort(key=lambda r: r[column], reverse=descending)
+        rows = missing + present if nulls_first else present + missing
+    return rows
+
+def load_seed(path):
+    """{table: [rows]} from a JSON file, or from a directory of <table>.jsonl files"""
+    path = Path(path)
+    if not path.is_dir():
+        return json.loads(path.read_text(encoding="utf-8"))
+    data = {}
+    for file in sorted(path.glob("*.jsonl")):
+        with open(file, encoding="utf-8") as f:
+            data[file.stem] = [json.loads(line) for line in f if line.strip()]
+    return data
+
+class SupabaseStub:
+    """asyncio HTTP server for /rest/v1 on its own event loop thread"""
+
+    def __init__(self, schema_path=SCHEMA_FILE, port=STUB_PORT, host="127.0.0.1", profile="fast", seed=None):
+        self.schema_path = schema_path
+        self.tables = load_schema(schema_path)
+        self.host = host
+        self.port = port
+        self.config = dict(PROFILES[profile], error_status=503)
+        self.stats = {}
+        self.realtime = RealtimeHub()
+        self.replay = None
+        self.rng = random.Random(0)
+        self.loop = None
+        self.server = None
+        self.thread = None
+        self._ready = threading.Event()
+        if seed:
+            self.seed(load_seed(seed))
+
+    @property
+    def url(self):
+        return f"http://localhost:{self.port}"
+
+    def seed(self, data):
+        """Load {table: [rows]} (e.g. from a dataset generator) into the store"""
+        for table_name, rows in data.items():
+            table = self.tables[table_name]
+            for row in rows:
+                table.insert(row, resolution="merge-duplicates")
+
+    def publish(self, table, event_type, new=None, old=None):
+        columns = [{"name": c.name, "type": c.sql_type} for c in table.columns.values()]
+        self.realtime.publish(table.name, event_type, new, old, columns)
+
+    def reset(self):
+        self.tables = load_schema(self.schema_path)
+        self.stats.clear()
+
+    # -- HTTP plumbing -------------------------------------------------------
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        if not self._ready.wait(timeout=10):
+            raise RuntimeError("Supabase stub did not start")
+        return self
+
+    def _run(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.server = self.loop.run_until_complete(
+            asyncio.start_server(self._handle_connection, self.host, self.port))
+        self._ready.set()
+        self.loop.run_forever()
+        self.server.close()
+        # Open keep-alive and websocket connections are still parked in reads
+        pending = asyncio.all_tasks(self.loop)
+        for task in pending:
+            task.cancel()
+        self.loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+        self.loop.close()
+
+    def stop(self):
+        if self.loop and self.loop.is_running():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join(timeout=5)
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, target, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                if headers.get("upgrade", "").lower() == "websocket" and \
+                        target.startswith("/realtime/v1/websocket"):
+                    await self.realtime.serve(reader, writer, headers)
+                    return
+                length = int(headers.get("content-length", 0))
+                body = await reader.readexactly(length) if length else b""
+
+                status, response_headers, payload = await self._dispatch(method, target, headers, body)
+                self._write_response(writer, status, response_headers, payload)
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    def _write_response(self, writer, status, headers, payload):
+        reason = {200: "OK", 201: "Created", 204: "No Content", 400: "Bad Request", 404: "Not Found",
+                  406: "Not Acceptable", 409: "Conflict"}.get(status, "Error")
+        headers = {
+            "Access-Control-Allow-Origin": "*",
+            "Access-Control-Allow-Methods": "GET, POST, PATCH, DELETE, OPTIONS",
+            "Access-Control-Allow-Headers": "*",
+            "Access-Control-Expose-Headers": "Content-Range",
+            "Content-Length": str(len(payload)),
+            **headers,
+        }
+        head = f"HTTP/1.1 {status} {reason}\r\n" + "".join(f"{k}: {v}\r\n" for k, v in headers.items())
+        writer.write(head.encode("latin-1") + b"\r\n" + payload)
+
+    async def _dispatch(self, method, target, headers, body):
+        if method == "OPTIONS":
+            return 204, {}, b""
+        split = urlsplit(target)
+        path = unquote(split.path).rstrip("/")
+        params = parse_qsl(split.query, keep_blank_values=True)
+
+        if path.startswith("/__stub/"):
+            return self._control(method, path[len("/__stub/"):], body)
+
+        delay = self.config["latency_ms"] + self.rng.uniform(-1, 1) * self.config["jitter_ms"]
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+        if self.config["error_rate"] and self.rng.random() < self.config["error_rate"]:
+            return self._json(self.config["error_status"],
+                              {"code": "PGRST000", "message": "Injected failure", "details": None, "hint": None})
+
+        if not path.startswith("/rest/v1/"):
+            return self._json(404, {"code": "PGRST125", "message": f"Invalid path {path}", "details": None, "hint": None})
+        table_name = path[len("/rest/v1/"):]
+        stat = self.stats.setdefault(f"{method} {table_name}", {"count": 0, "rows": 0})
+        stat["count"] += 1
+        try:
+            table = self.tables.get(table_name)
+            if table is None:
+                raise PostgrestError(404, "42P01", f'relation "public.{table_name}" does not exist')
+            status, rows, extra_headers = self._rest(method, table, params, headers, body)
+        except PostgrestError as e:
+            return self._json(e.status, e.body)
+        except json.JSONDecodeError as e:
+            return self._json(400, PostgrestError(400, "PGRST102", f"Empty or invalid json: {e}").body)
+        except ValueError as e:
+            # A filter, limit or offset value the column type can't parse
+            return self._json(400, PostgrestError(400, "22P02", f"invalid input syntax: {e}").body)
+        stat["rows"] += len(rows) if rows is not None else 0
+
+        prefer = headers.get("prefer", "")
+        if rows is None:
+            return status, extra_headers, b""
+        if "application/vnd.pgrst.object+json" in headers.get("accept", ""):
+            if len(rows) != 1:
+                return self._json(406, {"code": "PGRST116", "message": "JSON object requested, multiple (or no) rows returned",
+                                        "details": f"The result contains {len(rows)} rows", "hint": None})
+            return self._json(status, rows[0], extra_headers)
+        if method != "GET" and "return=representation" not in prefer:
+            return (204 if method != "POST" else 201), extra_headers, b""
+        return self._json(status, rows, extra_headers)
+
+    def _json(self, status, data, headers=None):
+        return status, {"Content-Type": "application/json; charset=utf-8", **(headers or {})}, \
+            json.dumps(data).encode("utf-8")
+
+    def _control(self, method, action, body):
+        """Runtime knobs for tests: config (latency/errors), stats, reset, seed, replay"""
+        if action == "replay":
+            if method == "POST":
+                options = json.loads(body or b"{}")
+                self.replay = ChangeReplay(self, options.get("rate", 10), options.get("duration", 10),
+                                           options.get("tables"), options.get("mix"), options.get("seed", 0))
+                asyncio.ensure_future(self.replay.run())
+            return self._json(200, self.replay.status() if self.replay else {"running": False})
+        if action == "realtime":
+            return self._json(200, {
+                "clients": len(self.realtime.clients),
+                "subscribers": {name: self.realtime.subscribers(name) for name in self.tables},
+                "published": self.realtime.published,
+                "dropped": self.realtime.dropped,
+            })
+        if action == "config" and method == "POST":
+            self.config.update(json.loads(body or b"{}"))
+        elif action == "reset" and method == "POST":
+            self.reset()
+        elif action == "seed" and method == "POST":
+            self.seed(json.loads(body))
+        elif action == "stats":
+            return self._json(200, self.stats)
+        return self._json(200, self.config)
+
+    # -- PostgREST semantics -------------------------------------------------
+
+    def _rest(self, method, table, params, headers, body):
+        filters, select, order, limit, offset, on_conflict = [], None, None, None, 0, None
+        for name, value in params:
+            if name == "select":
+                select = None if value in ("", "*") else [c.strip() for c in value.split(",")]
+            elif name == "order":
+                order = value
+            elif name == "limit":
+                limit = int(value)
+            elif name == "offset":
+                offset = int(value)
+            elif name == "on_conflict":
+                on_conflict = [c.strip() for c in value.split(",")]
+            elif name == "columns":
+                continue
+            else:
+                filters.append(_parse_filter(table, name, value))
+        prefer = headers.get("prefer", "")
+
+        if method == "POST":
+            payload = json.loads(body or b"[]")
+            resolution = next((p.split("=", 1)[1] for p in re.split(r"[,\s]+", prefer)
+                               if p.startswith("resolution=")), None)
+            rows = []
+            for row in payload if isinstance(payload, list) else [payload]:
+                if not isinstance(row, dict):
+                    raise PostgrestError(400, "PGRST102", "All object keys must match")
+                existed = row.get(table.primary_key) in table.rows
+                stored = table.insert(row, resolution, on_conflict)
+                if stored is not None:
+                    rows.append(stored)
+                    self.publish(table, "UPDATE" if existed else "INSERT", stored)
+            return 201, self._project(rows, select), {}
+
+        keys = table.candidate_keys([(c, op, v) for c, op, v, negated in filters if not negated])
+        matched = [table.rows[k] for k in keys if _matches(table.rows[k], filters)]
+
+        if method == "GET" or method == "HEAD":
+            total = len(matched)
+            if order:
+                matched = _sort(matched, order)
+            page = matched[offset:offset + limit if limit is not None else None]
+            extra = {}
+            if "count=exact" in prefer:
+                end = offset + len(page) - 1
+                extra["Content-Range"] = f"{offset}-{end}/{total}" if page else f"*/{total}"
+            return 200, self._project(page, select), extra
+        if method == "PATCH":
+            changes = json.loads(body or b"{}")
+            if not isinstance(changes, dict):
+                raise PostgrestError(400, "PGRST102", "Expected a JSON object")
+            table._check_columns(changes)
+            rows = []
+            for row in matched:
+                rows.append(table.update(row[table.primary_key], changes))
+                self.publish(table, "UPDATE", rows[-1], {table.primary_key: row[table.primary_key]})
+            return 200, self._project(rows, select), {}
+        if method == "DELETE":
+            rows = [table.delete(row[table.primary_key]) for row in matched]
+            for row in rows:
+                self.publish(table, "DELETE", None, row)
+            return 200, self._project(rows, select), {}
+        raise PostgrestError(405, "PGRST117", f"Unsupported HTTP method: {method}")
+
+    def _project(self, rows, select):
+        if select is None:
+            return [dict(r) for r in rows]
+        return [{c: r.get(c) for c in select} for r in rows]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline Supabase (PostgREST) stand-in")
+    parser.add_argument("--port", type=int, default=STUB_PORT)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--schema", default=str(SCHEMA_FILE))
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="fast",
+                        help="injected latency and error rate")
+    parser.add_argument("--seed", metavar="PATH",
+                        help="JSON {table: [rows]} file, or a directory of <table>.jsonl files, to preload")
+    args = parser.parse_args(argv)
+
+    stub = SupabaseStub(args.schema, args.port, args.host, args.profile, args.seed).start()
+    print(f"Supabase stub on {stub.url} ({args.profile}), tables: {', '.join(sorted(stub.tables))}")
+    try:
+        stub.thread.join()
+    except KeyboardInterrupt:
+        stub.stop()
+    return True
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
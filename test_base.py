@@ -1,82 +1,125 @@
 """
 Base test class for Selenium testing
 """
-import time
 import pytest
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.common.keys import Keys
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.service import Service
 from test_config import TestConfig
+from flutter_idle import wait_for_flutter_idle
+from step_timing import timed_action
+from screenshot_pipeline import PIPELINE
+from screencast_recorder import clip_path, recorder_for
+from browser_logs import collector_for, log_path
 
 class BaseTest:
     """Base test class with common functionality"""
     
     @pytest.fixture(autouse=True)
-    def setup(self):
+    def setup(self, request, driver_pool, step_timings):
         """Setup for each test"""
-        # Setup Chrome driver
-        service = Service(ChromeDriverManager().install())
-        self.driver = webdriver.Chrome(service=service, options=TestConfig.get_chrome_options())
-        self.driver.implicitly_wait(TestConfig.IMPLICIT_WAIT)
+        self.timings = step_timings
+        self.timings.test = request.node.name
+        self.test_id = request.node.nodeid
+        self.timings.screen = "Home"
+        
+        # Reuse the session's Chrome driver; either way it has just loaded the app
+        self.driver = driver_pool.acquire()
+        self.timings.instrument_driver(self.driver)
         self.wait = WebDriverWait(self.driver, TestConfig.EXPLICIT_WAIT)
         self.actions = ActionChains(self.driver)
         
-        # Navigate to the application
-        self.driver.get(TestConfig.BASE_URL)
-        
         # Wait for Flutter app to load
         self.wait_for_flutter_app()
         
+        # Record the screen in the background; the clip is written only if the test fails
+        self.screencast = None
+        if TestConfig.SCREENCAST_FPS:
+            self.screencast = recorder_for(self.driver, TestConfig.SCREENCAST_FPS,
+                                           TestConfig.REMOTE_DEBUGGING_PORT, TestConfig.BASE_URL)
+            if self.screencast:
+                self.screencast.restart()
+        
+        # Console and network entries, kept in memory like the screencast
+        self.browser_log = None
+        if TestConfig.BROWSER_LOG_CAPACITY:
+            self.browser_log = collector_for(self.driver, TestConfig.BROWSER_LOG_CAPACITY,
+                                             TestConfig.REMOTE_DEBUGGING_PORT, TestConfig.BASE_URL)
+            if self.browser_log:
+                self.browser_log.clear()
+        
         yield
         
-        # Cleanup
-        self.driver.quit()
+        report = getattr(request.node, "rep_call", None)
+        if report is not None and report.failed:
+            if self.screencast:
+                clip = self.screencast.flush(clip_path(self.test_id, TestConfig.SCREENCAST_DIR))
+                if clip:
+                    print(f"🎞️ Screencast saved: {clip}")
+            self.save_browser_log()
+        
+        # Hand the driver back for the next test
+        driver_pool.release(self.driver)
     
+    @timed_action("wait_for_flutter_app")
     def wait_for_flutter_app(self):
         """Wait for Flutter app to load completely"""
         try:
             # Wait for the main app container
             self.wait.until(EC.presence_of_element_located((By.TAG_NAME, "flt-glass-pane")))
-            time.sleep(3)  # Additional wait for Flutter to initialize
-            print("✅ Flutter app loaded successfully")
+            waited = self.wait_for_flutter_idle()
+            print(f"✅ Flutter app loaded successfully (settled in {waited:.2f}s)")
         except Exception as e:
             print(f"⚠️ Flutter app loading timeout: {e}")
     
+    @timed_action("wait_for_flutter_idle")
+    def wait_for_flutter_idle(self, quiet_window=None, timeout=None):
+        """Wait until the Flutter app has settled; returns seconds waited"""
+        return wait_for_flutter_idle(self.driver, quiet_window, timeout)
+    
+    @timed_action("wait_for_element")
     def wait_for_element(self, locator, timeout=10):
         """Wait for element to be present and visible"""
         return WebDriverWait(self.driver, timeout).until(
             EC.presence_of_element_located(locator)
         )
     
+    @timed_action("wait_for_clickable")
     def wait_for_clickable(self, locator, timeout=10):
         """Wait for element to be clickable"""
         return WebDriverWait(self.driver, timeout).until(
             EC.element_to_be_clickable(locator)
         )
     
+    @timed_action("click_element")
     def click_element(self, locator):
         """Click element with wait"""
         element = self.wait_for_clickable(locator)
         element.click()
-        time.sleep(1)  # Small delay for UI updates
+        self.wait_for_flutter_idle()
+    
+    def navigate_to(self, item):
+        """Open a screen from the navigation; later step timings are tagged with it"""
+        self.timings.screen = item
+        self.click_element((By.CSS_SELECTOR, f"text*='{item}'"))
     
+    @timed_action("input_text")
     def input_text(self, locator, text):
         """Input text into element"""
         element = self.wait_for_element(locator)
         element.clear()
         element.send_keys(text)
-        time.sleep(0.5)
+        self.wait_for_flutter_idle()
     
+    @timed_action("get_text")
     def get_text(self, locator):
         """Get text from element"""
         element = self.wait_for_element(locator)
         return element.text
     
+    @timed_action("is_element_present")
     def is_element_present(self, locator):
         """Check if element is present"""
         try:
@@ -85,13 +128,48 @@ class BaseTest:
         except:
             return False
     
+    @timed_action("scroll_to_element")
     def scroll_to_element(self, locator):
         """Scroll to element"""
         element = self.wait_for_element(locator)
         self.driver.execute_script("arguments[0].scrollIntoView(true);", element)
-        time.sleep(1)
+        self.wait_for_flutter_idle()
     
+    @timed_action("take_screenshot")
     def take_screenshot(self, name):
-        """Take screenshot for debugging"""
-        self.driver.save_screenshot(f"screenshots/{name}.png")
-        print(f"📸 Screenshot saved: {name}.png")
+        """Queue a screenshot; it is written only if the test fails (see screenshot_pipeline.py)"""
+        if PIPELINE.capture(self.driver, name, self.test_id):
+            print(f"📸 Screenshot queued: {name}")
+        else:
+            print(f"⚠️ Screenshot dropped (writer queue full): {name}")
+    
+    def save_browser_log(self, name=None):
+        """Write the browser console/network entries collected so far in this test"""
+        if not self.browser_log:
+            return None
+        path = self.browser_log.dump(log_path(name or self.test_id, TestConfig.BROWSER_LOG_DIR))
+        if path:
+            summary = self.browser_log.summary()
+            print(f"🧾 Browser log saved: {path} ({summary['levels'].get('error', 0)} errors, "
+                  f"{summary['supabase_failures']} failed Supabase requests)")
+        return path
+    
+    @timed_action("check_visual")
+    def check_visual(self, name, ignore_labels=()):
+        """Compare the screen with its visual baseline; labels matching ignore_labels are masked"""
+        # Imported here: numpy and Pillow are only needed by tests that take visual checks
+        from visual_regression import MAX_MASK_RATIO, VisualCheck
+        self.wait_for_flutter_idle()
+        check = VisualCheck(TestConfig.VISUAL_BASELINE_DIR, update=TestConfig.UPDATE_BASELINES)
+        result = check.check(self.driver, name, ignore_labels)
+        if result["status"] == "updated":
+            print(f"🆕 Visual baseline recorded: {result['baseline']}")
+        if result["status"] == "missing":
+            pytest.skip(f"No visual baseline for {name} at {result['viewport']} ({result['baseline']}); "
+                        f"record it with TEST_UPDATE_BASELINES=1")
+        if result.get("masked_ratio", 0) > MAX_MASK_RATIO:
+            print(f"⚠️ {name}: {result['masked_ratio']:.0%} of the screen is masked and was not compared")
+        assert result["status"] in ("passed", "updated"), (
+            f"{name} differs from its baseline ({result.get('diff_ratio', 0):.4%} of pixels, "
+            f"{len(result.get('failed_tiles', []))} tiles); heatmap: {result.get('heatmap', result['status'])}")
+        return result
@@ -0,0 +1,109 @@
+"""
+Build cache: LRU eviction under the size cap, precompressed variants, and the SDK version in the key
+"""
+import json
+import os
+import stat
+import sys
+from types import SimpleNamespace
+import pytest
+import build_cache
+from build_cache import BuildCache
+
+def _fake_flutter(bin_dir, framework, dart="3.5.0"):
+    bin_dir.mkdir(parents=True, exist_ok=True)
+    info = {"frameworkRevision": framework, "engineRevision": "e1", "dartSdkVersion": dart}
+    path = bin_dir / "flutter"
+    # flutter prints notices before the JSON on a fresh SDK
+    path.write_text(f"#!/bin/sh\necho 'Waiting for another flutter command...'\necho '{json.dumps(info)}'\n")
+    path.chmod(path.stat().st_mode | stat.S_IEXEC)
+
+@pytest.mark.skipif(sys.platform == "win32", reason="the fake flutter is a shell script")
+class TestSdkVersion:
+    """flutter --version --machine is part of the build hash"""
+
+    @pytest.fixture(autouse=True)
+    def sdk(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("PATH", str(tmp_path / "bin"))
+        build_cache.flutter_sdk_version.cache_clear()
+        yield tmp_path / "bin"
+        build_cache.flutter_sdk_version.cache_clear()
+
+    def test_version_from_machine_output(self, sdk):
+        _fake_flutter(sdk, "abc123")
+        assert build_cache.flutter_sdk_version() == "abc123 e1 3.5.0"
+
+    def test_missing_flutter_is_empty(self):
+        assert build_cache.flutter_sdk_version() == ""
+
+    def test_upgrade_changes_the_hash(self, sdk, tmp_path):
+        (tmp_path / "lib").mkdir()
+        (tmp_path / "lib" / "main.dart").write_text("void main() {}")
+        _fake_flutter(sdk, "abc123")
+        before = build_cache.hash_build_inputs(tmp_path)
+        assert build_cache.hash_build_inputs(tmp_path) == before
+
+        _fake_flutter(sdk, "def456")
+        build_cache.flutter_sdk_version.cache_clear()
+        assert build_cache.hash_build_inputs(tmp_path) != before
+
+class TestEviction:
+    """Least recently used goes first, whether a build or a compressed variant"""
+
+    @pytest.fixture
+    def clock(self, monkeypatch):
+        now = [1000.0]
+
+        def tick():
+            now[0] += 1
+            return now[0]
+        monkeypatch.setattr(build_cache, "time", SimpleNamespace(time=tick))
+        return now
+
+    def _build(self, tmp_path, name, size):
+        source = tmp_path / "builds" / name
+        source.mkdir(parents=True)
+        (source / "main.dart.js").write_bytes(b"x" * size)
+        return source
+
+    def _keys(self, cache):
+        return sorted(json.loads(cache.index_file.read_text()))
+
+    def test_least_recently_used_build_is_evicted(self, tmp_path, clock):
+        # Each build is 1000 bytes of output plus its one-byte .build_hash marker
+        cache = BuildCache(tmp_path / "cache", max_bytes=2200)
+        for key in ("a", "b"):
+            cache.store(key, self._build(tmp_path, key, 1000))
+        assert cache.restore("a", tmp_path / "web")
+
+        cache.store("c", self._build(tmp_path, "c", 1000))
+        assert self._keys(cache) == ["a", "c"]
+        assert not (tmp_path / "cache" / "b").exists()
+        assert not cache.restore("b", tmp_path / "web")
+
+    def test_new_build_is_kept_even_over_the_cap(self, tmp_path, clock):
+        cache = BuildCache(tmp_path / "cache", max_bytes=500)
+        cache.store("a", self._build(tmp_path, "a", 400))
+        cache.store("b", self._build(tmp_path, "b", 1000))
+        assert self._keys(cache) == ["b"]
+
+    def test_compressed_variants_count_against_the_cap(self, tmp_path, clock):
+        cache = BuildCache(tmp_path / "cache", max_bytes=2800)
+        cache.store("a", self._build(tmp_path, "a", 1000))
+        compressed = tmp_path / "cache" / "compressed"
+        compressed.mkdir()
+        # One variant older than build "a", one used after it
+        for name, size, used in (("old.br", 600, 500), ("new.gz", 600, 1500)):
+            (compressed / name).write_bytes(b"z" * size)
+            os.utime(compressed / name, (used, used))
+        (compressed / "writing.br.1.tmp").write_bytes(b"z" * 600)
+
+        clock[0] = 2000
+        cache.store("b", self._build(tmp_path, "b", 1000))
+        assert self._keys(cache) == ["a", "b"]
+        assert sorted(p.name for p in compressed.iterdir()) == ["new.gz", "writing.br.1.tmp"]
+
+        cache.max_bytes = 2000
+        cache.evict()
+        assert self._keys(cache) == ["b"]
+        assert (compressed / "new.gz").exists()
@@ -0,0 +1,54 @@
+"""
+ChromeDriver resolution when Chrome's version can't be read or nothing matches it
+"""
+import json
+import os
+import stat
+import sys
+import pytest
+import chromedriver_cache
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="fake drivers are shell scripts")
+
+def _fake_driver(path, version):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(f"#!/bin/sh\necho 'ChromeDriver {version} (abc)'\n")
+    path.chmod(path.stat().st_mode | stat.S_IEXEC)
+    return str(path)
+
+class TestResolveChromedriver:
+    """Cache and PATH fallbacks"""
+
+    @pytest.fixture
+    def cache(self, tmp_path, monkeypatch):
+        monkeypatch.delenv("CHROMEDRIVER_PATH", raising=False)
+        monkeypatch.setattr(chromedriver_cache, "CACHE_DIR", tmp_path / "cache")
+        monkeypatch.setattr(chromedriver_cache, "INDEX_FILE", tmp_path / "cache" / "index.json")
+        monkeypatch.setenv("PATH", str(tmp_path / "bin"))
+        index = {
+            "139": _fake_driver(tmp_path / "cache" / "139" / "chromedriver", "139.0.7258.66"),
+            "141": _fake_driver(tmp_path / "cache" / "141" / "chromedriver", "141.0.7390.54"),
+            "140": str(tmp_path / "cache" / "140" / "gone"),
+        }
+        (tmp_path / "cache" / "index.json").write_text(json.dumps(index))
+        return tmp_path, index
+
+    def test_unknown_chrome_version_uses_newest_cached(self, cache, monkeypatch, capsys):
+        _, index = cache
+        monkeypatch.setattr(chromedriver_cache, "detect_chrome_version", lambda: None)
+        assert chromedriver_cache.resolve_chromedriver() == index["141"]
+        assert "Chrome version unknown" in capsys.readouterr().out
+
+    def test_known_version_uses_its_cache_entry(self, cache, monkeypatch, capsys):
+        _, index = cache
+        monkeypatch.setattr(chromedriver_cache, "detect_chrome_version", lambda: "139.0.7258.100")
+        assert chromedriver_cache.resolve_chromedriver() == index["139"]
+        assert capsys.readouterr().out == ""
+
+    def test_offline_fallback_warns_on_mismatch(self, cache, monkeypatch, capsys):
+        tmp_path, _ = cache
+        local = _fake_driver(tmp_path / "bin" / "chromedriver", "138.0.7204.49")
+        monkeypatch.setattr(chromedriver_cache, "detect_chrome_version", lambda: "142.0.7444.3")
+        monkeypatch.setitem(sys.modules, "webdriver_manager", None)  # import fails as if offline
+        assert os.path.samefile(chromedriver_cache.resolve_chromedriver(), local)
+        assert "ChromeDriver 138 at" in capsys.readouterr().out
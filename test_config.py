@@ -3,6 +3,8 @@ Configuration file for Selenium testing
 """
 import os
 from selenium.webdriver.chrome.options import Options
+from chromedriver_cache import resolve_chromedriver
+from asset_proxy import ASSET_HOSTS
 
 class TestConfig:
     # Application URL
@@ -17,15 +19,62 @@ class TestConfig:
     TEST_SUGAR_VARIETY = "Phil 2018"
     TEST_SUPPLIER_NAME = "Test Supplier"
     
+    # Main navigation items, in the order the navigation flow visits them
+    NAV_ITEMS = [
+        "Home", "Sugar Records", "Inventory", "Suppliers",
+        "Weather", "Generate Insight", "View Insights", "Reports", "Settings"
+    ]
+    
     # Timeouts
     IMPLICIT_WAIT = 10
     EXPLICIT_WAIT = 20
     
+    # Flutter idle detection: settled once nothing changed for the quiet window
+    IDLE_QUIET_WINDOW = 0.3
+    IDLE_TIMEOUT = 10
+    # Frames that leave the semantics tree unchanged this long are an ambient animation, not activity
+    IDLE_ANIMATION_WINDOW = 1.0
+    IDLE_POLL_INTERVAL = 0.05
+    
+    # Step timing output (histograms + chrome://tracing file)
+    TIMINGS_DIR = "reports/timings"
+    
+    # ChromeDriver binary, resolved once per session (see get_chromedriver_path)
+    CHROMEDRIVER_PATH = None
+    
+    # Start browsers from a clone of a pre-warmed profile (see chrome_profiles.py)
+    USE_WARM_PROFILE = os.environ.get("TEST_WARM_PROFILE", "0") == "1"
+    
+    # Per-worker isolation (set by run_all_tests.py --workers)
+    REMOTE_DEBUGGING_PORT = int(os.environ.get("TEST_REMOTE_DEBUGGING_PORT", "9222"))
+    CHROME_PROFILE_DIR = os.environ.get("TEST_CHROME_PROFILE_DIR")
+    
+    # host:port of asset_proxy.py serving CanvasKit and fonts (set by run_tests.py --asset-proxy)
+    ASSET_PROXY = os.environ.get("TEST_ASSET_PROXY")
+    
+    # Visual regression baselines (see visual_regression.py); set TEST_UPDATE_BASELINES=1 to re-record them
+    VISUAL_BASELINE_DIR = "visual_baselines"
+    UPDATE_BASELINES = os.environ.get("TEST_UPDATE_BASELINES", "0") == "1"
+    
+    # Screenshots taken by BaseTest.take_screenshot: keep them for "failed" tests only, or "all"
+    SCREENSHOT_RETENTION = os.environ.get("TEST_SCREENSHOTS", "failed")
+    
+    # Rolling CDP screencast, saved for failed tests only (see screencast_recorder.py); TEST_SCREENCAST_FPS=0 disables it
+    SCREENCAST_FPS = float(os.environ.get("TEST_SCREENCAST_FPS", "5"))
+    SCREENCAST_DIR = "reports/screencasts"
+    
+    # Browser console/network entries kept per test (see browser_logs.py), written for failed tests; 0 disables
+    BROWSER_LOG_CAPACITY = int(os.environ.get("TEST_BROWSER_LOG_CAPACITY", "2000"))
+    BROWSER_LOG_DIR = "reports/browser_logs"
+    
     @staticmethod
-    def get_chrome_options():
+    def get_chrome_options(profile_dir=None):
         """Get Chrome options for testing"""
         options = Options()
         
+        if profile_dir:
+            options.add_argument(f"--user-data-dir={profile_dir}")
+        
         if TestConfig.HEADLESS:
             options.add_argument("--headless")
         
@@ -42,4 +91,31 @@ class TestConfig:
         options.add_argument("--disable-features=VizDisplayCompositor")
         options.add_argument("--enable-features=NetworkService,NetworkServiceLogging")
         
+        return TestConfig.apply_asset_proxy(options)
+    
+    @staticmethod
+    def get_chromedriver_path():
+        """ChromeDriver path, resolved once and shared with child processes"""
+        if not TestConfig.CHROMEDRIVER_PATH:
+            TestConfig.CHROMEDRIVER_PATH = resolve_chromedriver()
+            os.environ["CHROMEDRIVER_PATH"] = TestConfig.CHROMEDRIVER_PATH
+        return TestConfig.CHROMEDRIVER_PATH
+    
+    @staticmethod
+    def apply_worker_isolation(options):
+        """Give this process its own debugging port and Chrome profile"""
+        options.add_argument(f"--remote-debugging-port={TestConfig.REMOTE_DEBUGGING_PORT}")
+        if TestConfig.CHROME_PROFILE_DIR:
+            options.add_argument(f"--user-data-dir={TestConfig.CHROME_PROFILE_DIR}")
+        return options
+    
+    @staticmethod
+    def apply_asset_proxy(options):
+        """Resolve the CanvasKit and font CDN hosts to the local asset proxy"""
+        if TestConfig.ASSET_PROXY:
+            rules = ",".join(f"MAP {host} {TestConfig.ASSET_PROXY}" for host in ASSET_HOSTS)
+            options.add_argument(f"--host-resolver-rules={rules}")
+            # The proxy presents a self-signed certificate for the CDN hosts
+            options.add_argument("--ignore-certificate-errors")
+            options.add_argument("--disable-quic")
         return options
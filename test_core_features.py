@@ -2,7 +2,6 @@
 Test cases for core features of Hacienda Elizabeth
 """
 import pytest
-import time
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from test_base import BaseTest
@@ -29,12 +28,10 @@ class TestCoreFeatures(BaseTest):
         print("🧪 Testing sugar records management...")
         
         # Navigate to Sugar Records
-        self.click_element((By.CSS_SELECTOR, "text*='Sugar Records'"))
-        time.sleep(2)
+        self.navigate_to("Sugar Records")
         
         # Test adding new sugar record
         self.click_element((By.CSS_SELECTOR, "text*='Add'"))
-        time.sleep(1)
         
         # Fill form data
         self.input_text((By.CSS_SELECTOR, "input[placeholder*='variety']"), TestConfig.TEST_SUGAR_VARIETY)
@@ -43,7 +40,6 @@ class TestCoreFeatures(BaseTest):
         
         # Save record
         self.click_element((By.CSS_SELECTOR, "text*='Save'"))
-        time.sleep(2)
         
         # Verify record was added
         assert self.is_element_present((By.CSS_SELECTOR, f"text*='{TestConfig.TEST_SUGAR_VARIETY}'")), "Sugar record not added"
@@ -55,12 +51,10 @@ class TestCoreFeatures(BaseTest):
         print("🧪 Testing inventory management...")
         
         # Navigate to Inventory
-        self.click_element((By.CSS_SELECTOR, "text*='Inventory'"))
-        time.sleep(2)
+        self.navigate_to("Inventory")
         
         # Test adding inventory item
         self.click_element((By.CSS_SELECTOR, "text*='Add'"))
-        time.sleep(1)
         
         # Fill inventory form
         self.input_text((By.CSS_SELECTOR, "input[placeholder*='name']"), "Test Fertilizer")
@@ -69,7 +63,6 @@ class TestCoreFeatures(BaseTest):
         
         # Save item
         self.click_element((By.CSS_SELECTOR, "text*='Save'"))
-        time.sleep(2)
         
         # Verify item was added
         assert self.is_element_present((By.CSS_SELECTOR, "text*='Test Fertilizer'")), "Inventory item not added"
@@ -81,12 +74,10 @@ class TestCoreFeatures(BaseTest):
         print("🧪 Testing supplier transactions...")
         
         # Navigate to Suppliers
-        self.click_element((By.CSS_SELECTOR, "text*='Suppliers'"))
-        time.sleep(2)
+        self.navigate_to("Suppliers")
         
         # Test adding supplier transaction
         self.click_element((By.CSS_SELECTOR, "text*='Add'"))
-        time.sleep(1)
         
         # Fill supplier form
         self.input_text((By.CSS_SELECTOR, "input[placeholder*='supplier']"), TestConfig.TEST_SUPPLIER_NAME)
@@ -96,7 +87,6 @@ class TestCoreFeatures(BaseTest):
         
         # Save transaction
         self.click_element((By.CSS_SELECTOR, "text*='Save'"))
-        time.sleep(2)
         
         # Verify transaction was added
         assert self.is_element_present((By.CSS_SELECTOR, f"text*='{TestConfig.TEST_SUPPLIER_NAME}'")), "Supplier transaction not added"
@@ -108,8 +98,7 @@ class TestCoreFeatures(BaseTest):
         print("🧪 Testing insights generation...")
         
         # Navigate to Generate Insight
-        self.click_element((By.CSS_SELECTOR, "text*='Generate Insight'"))
-        time.sleep(2)
+        self.navigate_to("Generate Insight")
         
         # Fill insight form
         self.input_text((By.CSS_SELECTOR, "input[placeholder*='variety']"), TestConfig.TEST_SUGAR_VARIETY)
@@ -118,7 +107,7 @@ class TestCoreFeatures(BaseTest):
         
         # Generate insight
         self.click_element((By.CSS_SELECTOR, "text*='Generate'"))
-        time.sleep(5)  # Wait for AI processing
+        self.wait_for_flutter_idle(timeout=30)  # Wait for AI processing
         
         # Verify insight was generated
         assert self.is_element_present((By.CSS_SELECTOR, "text*='insight'")), "Insight not generated"
@@ -130,16 +119,14 @@ class TestCoreFeatures(BaseTest):
         print("🧪 Testing data cleanup...")
         
         # Navigate to Data Cleanup
-        self.click_element((By.CSS_SELECTOR, "text*='Data Cleanup'"))
-        time.sleep(2)
+        self.navigate_to("Data Cleanup")
         
         # Test complete cleanup
         self.click_element((By.CSS_SELECTOR, "text*='Complete Cleanup'"))
-        time.sleep(1)
         
         # Confirm cleanup
         self.click_element((By.CSS_SELECTOR, "text*='Yes'"))
-        time.sleep(5)  # Wait for cleanup to complete
+        self.wait_for_flutter_idle(timeout=30)  # Wait for cleanup to complete
         
         # Verify cleanup completed
         assert self.is_element_present((By.CSS_SELECTOR, "text*='cleanup completed'")), "Data cleanup not completed"
@@ -155,7 +142,6 @@ class TestCoreFeatures(BaseTest):
         
         # Click notification bell
         self.click_element((By.CSS_SELECTOR, "[data-testid='notification-bell']"))
-        time.sleep(2)
         
         # Check if notification panel opens
         assert self.is_element_present((By.CSS_SELECTOR, "[data-testid='notification-panel']")), "Notification panel not opened"
@@ -167,15 +153,9 @@ class TestCoreFeatures(BaseTest):
         print("🧪 Testing navigation flow...")
         
         # Test all main navigation items
-        nav_items = [
-            "Home", "Sugar Records", "Inventory", "Suppliers", 
-            "Weather", "Generate Insight", "View Insights", "Reports", "Settings"
-        ]
-        
-        for item in nav_items:
+        for item in TestConfig.NAV_ITEMS:
             try:
-                self.click_element((By.CSS_SELECTOR, f"text*='{item}'"))
-                time.sleep(2)
+                self.navigate_to(item)
                 print(f"✅ Navigated to {item}")
             except Exception as e:
                 print(f"⚠️ Failed to navigate to {item}: {e}")
@@ -191,7 +171,7 @@ class TestCoreFeatures(BaseTest):
         
         for width, height in screen_sizes:
             self.driver.set_window_size(width, height)
-            time.sleep(2)
+            self.wait_for_flutter_idle()
             
             # Check if main elements are still visible
             assert self.is_element_present((By.CSS_SELECTOR, "[data-testid='main-navigation']")), f"Navigation not visible at {width}x{height}"
@@ -208,9 +188,35 @@ class TestCoreFeatures(BaseTest):
         
         # Refresh page to test persistence
         self.driver.refresh()
-        time.sleep(5)
+        self.wait_for_flutter_app()
         
         # Check if data persisted
         assert self.is_element_present((By.CSS_SELECTOR, f"text*='{TestConfig.TEST_SUGAR_VARIETY}'")), "Data not synchronized"
         
         print("✅ Data synchronization test passed")
+    
+    def test_11_visual_regression(self):
+        """Compare every screen at every viewport with its visual baseline"""
+        print("🧪 Testing visual regression...")
+        
+        failures, missing = [], []
+        for width, height in [(1920, 1080), (1366, 768), (768, 1024)]:
+            self.driver.set_window_size(width, height)
+            for item in TestConfig.NAV_ITEMS:
+                try:
+                    self.navigate_to(item)
+                except Exception as e:
+                    print(f"⚠️ Failed to navigate to {item}: {e}")
+                    continue
+                try:
+                    self.check_visual(item.replace(" ", "_"))
+                except AssertionError as e:
+                    failures.append(str(e))
+                except pytest.skip.Exception:
+                    missing.append(f"{item}@{width}x{height}")
+        self.driver.set_window_size(*TestConfig.WINDOW_SIZE)
+        
+        assert not failures, "\n".join(failures)
+        if missing:
+            pytest.skip(f"No visual baseline for {', '.join(missing)}; record them with TEST_UPDATE_BASELINES=1")
+        print("✅ Visual regression test passed")
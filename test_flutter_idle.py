@@ -0,0 +1,56 @@
+"""
+Idle detection against scripted probe states instead of a browser
+"""
+import pytest
+from flutter_idle import wait_for_flutter_idle
+from test_config import TestConfig
+
+class ScriptedDriver:
+    """Returns the next probe state on each execute_script call; the last one repeats"""
+
+    def __init__(self, states):
+        self.states = list(states)
+
+    def execute_script(self, script):
+        state = self.states.pop(0) if len(self.states) > 1 else self.states[0]
+        return dict(state)
+
+class AnimatingDriver:
+    """A spinner: a new frame on every poll, always one pending, semantics unchanged"""
+
+    def __init__(self, semantics=7):
+        self.frames = 0
+        self.semantics = semantics
+
+    def execute_script(self, script):
+        self.frames += 1
+        return {"frames": self.frames, "lastFrame": 0, "pendingFrames": 1, "inflight": 0,
+                "semantics": self.semantics}
+
+class TestWaitForFlutterIdle:
+    """How long each kind of page keeps the wait going"""
+
+    @pytest.fixture(autouse=True)
+    def fast_config(self, monkeypatch):
+        monkeypatch.setattr(TestConfig, "IDLE_QUIET_WINDOW", 0.05)
+        monkeypatch.setattr(TestConfig, "IDLE_POLL_INTERVAL", 0.01)
+        monkeypatch.setattr(TestConfig, "IDLE_ANIMATION_WINDOW", 0.2)
+        monkeypatch.setattr(TestConfig, "IDLE_TIMEOUT", 3)
+
+    def test_still_page_settles_after_the_quiet_window(self):
+        state = {"frames": 5, "lastFrame": 0, "pendingFrames": 0, "inflight": 0, "semantics": 1}
+        assert wait_for_flutter_idle(ScriptedDriver([state])) < 0.2
+
+    def test_endless_animation_does_not_run_to_the_timeout(self):
+        waited = wait_for_flutter_idle(AnimatingDriver())
+        assert 0.2 <= waited < 1
+
+    def test_changing_semantics_or_requests_keep_waiting(self):
+        class Loading(AnimatingDriver):
+            def execute_script(self, script):
+                self.semantics += 1
+                return super().execute_script(script)
+        assert wait_for_flutter_idle(Loading(), timeout=0.5) >= 0.5
+
+        busy = {"frames": 5, "lastFrame": 0, "pendingFrames": 0, "inflight": 1, "semantics": 1}
+        assert wait_for_flutter_idle(ScriptedDriver([busy]), timeout=0.5) >= 0.5
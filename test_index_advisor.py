@@ -0,0 +1,99 @@
+"""
+Index advisor: candidate derivation from real EXPLAIN plans of the workload
+
+The plans are PostgreSQL 16 output for benchmarks/workload.sql over
+generated data, trimmed to the keys the advisor reads.
+"""
+import os
+import pytest
+from index_advisor import SUPABASE_ROLES, candidates_for, merge_candidates, predicates, sort_keys, walk
+
+COLUMNS = {
+    "supplier_transactions": {"id", "supplier_name", "date", "amount", "created_at"},
+    "alerts": {"id", "severity", "title", "message", "timestamp", "read", "created_at"},
+}
+
+BY_SUPPLIER_PERIOD = {"Node Type": "Sort", "Sort Key": ["date DESC"], "Plans": [{
+    "Node Type": "Bitmap Heap Scan", "Relation Name": "supplier_transactions",
+    "Filter": "(supplier_name = 'AgriSupply Co.'::text)",
+    "Recheck Cond": "((date >= '2024-01-01'::date) AND (date <= '2024-03-31'::date))",
+    "Plans": [{"Node Type": "Bitmap Index Scan", "Index Name": "idx_supplier_transactions_date",
+               "Index Cond": "((date >= '2024-01-01'::date) AND (date <= '2024-03-31'::date))"}]}]}
+
+UNREAD = {"Node Type": "Limit", "Plans": [{"Node Type": "Sort", "Sort Key": ["\"timestamp\" DESC"], "Plans": [{
+    "Node Type": "Index Scan", "Relation Name": "alerts", "Index Name": "idx_alerts_read",
+    "Index Cond": "(read = false)"}]}]}
+
+UNREAD_COUNT_SEQ = {"Node Type": "Aggregate", "Plans": [{
+    "Node Type": "Seq Scan", "Relation Name": "alerts", "Filter": "(NOT read)"}]}
+
+RECENT_BY_SEVERITY = {"Node Type": "Sort", "Sort Key": ["\"timestamp\" DESC"], "Plans": [{
+    "Node Type": "Bitmap Heap Scan", "Relation Name": "alerts", "Filter": "(severity = 'warning'::text)",
+    "Recheck Cond": "(\"timestamp\" >= '2024-12-01 00:00:00+00'::timestamp with time zone)",
+    "Plans": [{"Node Type": "Bitmap Index Scan", "Index Name": "idx_alerts_timestamp",
+               "Index Cond": "(\"timestamp\" >= '2024-12-01 00:00:00+00'::timestamp with time zone)"}]}]}
+
+LIST = {"Node Type": "Sort", "Sort Key": ["created_at DESC"], "Plans": [{
+    "Node Type": "Seq Scan", "Relation Name": "supplier_transactions"}]}
+
+def _candidates(name, plan):
+    return candidates_for({"name": name}, {"plan": plan}, COLUMNS)
+
+def _scan(plan):
+    return next((node, parents) for node, parents in walk(plan) if "Relation Name" in node)
+
+class TestIndexAdvisor:
+    """predicates / sort_keys / candidates_for on the workload's plans"""
+
+    def test_predicates(self):
+        node, _ = _scan(BY_SUPPLIER_PERIOD)
+        condition = f"({node['Recheck Cond']}) AND ({node['Filter']})"
+        assert predicates(condition, COLUMNS["supplier_transactions"]) == (["supplier_name"], ["date"], [])
+        assert predicates("(read = false)", COLUMNS["alerts"]) == (["read"], [], [])
+        assert predicates("(NOT read)", COLUMNS["alerts"]) == ([], [], ["NOT read"])
+        # Quoted AND inside a literal is not a conjunction; unknown columns are ignored
+        assert predicates("((title = 'Rain AND wind'::text) AND (x > 1))", COLUMNS["alerts"]) == (["title"], [], [])
+
+    def test_sort_keys(self):
+        node, parents = _scan(UNREAD)
+        assert sort_keys(parents, "alerts", COLUMNS["alerts"]) == ["timestamp DESC"]  # through the Limit
+        node, parents = _scan(BY_SUPPLIER_PERIOD)
+        assert sort_keys(parents, "supplier_transactions", COLUMNS["supplier_transactions"]) == ["date DESC"]
+        node, parents = _scan(UNREAD_COUNT_SEQ)
+        assert sort_keys(parents, "alerts", COLUMNS["alerts"]) == []  # an Aggregate is not an ordering
+        assert sort_keys([{"Node Type": "Sort", "Sort Key": ["lower(title)"]}], "alerts", COLUMNS["alerts"]) == []
+
+    def test_candidates(self):
+        assert [c["columns"] for c in _candidates("by_supplier_period", BY_SUPPLIER_PERIOD)] == \
+            [["supplier_name", "date DESC"]]
+        assert [c["columns"] for c in _candidates("unread", UNREAD)] == [["read", "timestamp DESC"]]
+        assert [c["columns"] for c in _candidates("recent_by_severity", RECENT_BY_SEVERITY)] == \
+            [["severity", "timestamp DESC"]]
+        assert [c["columns"] for c in _candidates("list", LIST)] == [["created_at DESC"]]
+
+        partial, = _candidates("unread_count", UNREAD_COUNT_SEQ)
+        assert (partial["columns"], partial["where"]) == (["id"], "NOT read")
+
+    def test_merge_skips_covered_and_combines_queries(self):
+        candidates = _candidates("a", LIST) + _candidates("b", LIST) + _candidates("unread", UNREAD)
+        existing = {"idx_alerts_read_timestamp": ("alerts", ["read", "timestamp"], None, False)}
+        merged = merge_candidates(candidates, existing)
+        assert len(merged) == 1
+        assert merged[0]["queries"] == ["a", "b"]
+
+@pytest.mark.skipif(not os.environ.get("TEST_DATABASE_URL"), reason="needs TEST_DATABASE_URL (a scratch PostgreSQL)")
+def test_reset_database_on_plain_postgres():
+    """The Supabase schema applies to a database without Supabase's roles"""
+    import psycopg2
+    from index_advisor import reset_database
+    conn = psycopg2.connect(os.environ["TEST_DATABASE_URL"])
+    conn.set_client_encoding("UTF8")
+    try:
+        reset_database(conn)
+        with conn.cursor() as cur:
+            cur.execute("SELECT count(*) FROM pg_roles WHERE rolname = ANY(%s)", (list(SUPABASE_ROLES),))
+            assert cur.fetchone()[0] == len(SUPABASE_ROLES)
+            cur.execute("SELECT has_table_privilege('anon', 'alerts', 'SELECT')")
+            assert cur.fetchone()[0]
+    finally:
+        conn.close()
@@ -0,0 +1,97 @@
+"""
+Realtime stand-in: postgres_changes messages in the shape realtime_client decodes
+"""
+import json
+import socket
+import urllib.request
+import pytest
+from supabase_stub import SupabaseStub
+from ws_frames import MessageAssembler, accept_key, encode_frame, new_client_key, read_frame
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+class RealtimeSocket:
+    """Just enough of a Phoenix websocket client to join a channel and read its messages"""
+
+    def __init__(self, port):
+        self.sock = socket.create_connection(("127.0.0.1", port), timeout=5)
+        key = new_client_key()
+        self.sock.sendall((
+            "GET /realtime/v1/websocket?vsn=1.0.0 HTTP/1.1\r\n"
+            f"Host: 127.0.0.1:{port}\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+            f"Sec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n").encode("latin-1"))
+        self.stream = self.sock.makefile("rb")
+        assert b" 101 " in self.stream.readline()
+        headers = dict(line.decode().strip().split(": ", 1) for line in iter(self.stream.readline, b"\r\n"))
+        assert headers["Sec-WebSocket-Accept"] == accept_key(key)
+        self.assembler = MessageAssembler()
+
+    def send(self, message):
+        self.sock.sendall(encode_frame(json.dumps(message), mask=True))
+
+    def receive(self):
+        while True:
+            kind, data = self.assembler.feed(*read_frame(self.stream.read))
+            if kind == "message":
+                return json.loads(data)
+
+    def close(self):
+        self.sock.close()
+
+def _rest(port, method, path, body=None):
+    request = urllib.request.Request(f"http://127.0.0.1:{port}/rest/v1/{path}", method=method,
+                                     data=json.dumps(body).encode() if body is not None else None,
+                                     headers={"Content-Type": "application/json", "Prefer": "return=representation"})
+    with urllib.request.urlopen(request, timeout=5) as response:
+        return json.loads(response.read())
+
+class TestRealtimeStub:
+    """A REST write reaches a subscribed channel as wire-format postgres_changes"""
+
+    @pytest.fixture
+    def stub(self):
+        stub = SupabaseStub(port=_free_port()).start()
+        yield stub
+        stub.stop()
+
+    @pytest.fixture
+    def channel(self, stub):
+        client = RealtimeSocket(stub.port)
+        client.send({"topic": "realtime:public:sugar_records", "event": "phx_join", "ref": "1", "join_ref": "1",
+                     "payload": {"config": {"postgres_changes": [
+                         {"event": "*", "schema": "public", "table": "sugar_records"}]}}})
+        reply = client.receive()
+        assert reply["event"] == "phx_reply" and reply["payload"]["status"] == "ok"
+        binding_id = reply["payload"]["response"]["postgres_changes"][0]["id"]
+        assert client.receive()["event"] == "system"
+        yield client, binding_id
+        client.close()
+
+    def test_insert_and_delete_payloads(self, stub, channel):
+        client, binding_id = channel
+        row = {"id": "sr-1", "date": "2024-05-01", "variety": "Phil 2018", "soil_test": "ok",
+               "fertilizer": "urea", "height_cm": 120}
+        stored = _rest(stub.port, "POST", "sugar_records", row)[0]
+
+        message = client.receive()
+        assert message["event"] == "postgres_changes"
+        assert message["payload"]["ids"] == [binding_id]
+        data = message["payload"]["data"]
+        assert data.pop("commit_timestamp")
+        columns = data.pop("columns")
+        assert data == {"schema": "public", "table": "sugar_records", "type": "INSERT",
+                        "record": stored, "errors": None}
+        types = {c["name"]: c["type"] for c in columns}
+        assert types["height_cm"] == "int4"
+        assert types["created_at"] == "timestamptz"
+        assert types["date"] == "date"
+        assert types["variety"] == "text"
+
+        _rest(stub.port, "DELETE", "sugar_records?id=eq.sr-1")
+        data = client.receive()["payload"]["data"]
+        assert data["type"] == "DELETE"
+        assert data["old_record"] == stored
+        assert "record" not in data
@@ -0,0 +1,44 @@
+"""
+stream_process: timeouts and children that leave processes holding the output pipes
+"""
+import sys
+import time
+import pytest
+import report_writer
+
+# Starts a grandchild that inherits stdout/stderr and outlives the child, like chromedriver
+SPAWN_LINGERING = (
+    "import subprocess, sys, time\n"
+    "subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)'])\n"
+    "print('started', flush=True)\n"
+)
+
+@pytest.mark.skipif(sys.platform == "win32", reason="process groups are POSIX here")
+class TestStreamProcess:
+    """The runner never waits on pipes held open by grandchildren"""
+
+    @pytest.fixture(autouse=True)
+    def logs(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(report_writer, "log_path_for", lambda name: tmp_path / f"{name}.log")
+        monkeypatch.setattr(report_writer, "PUMP_GRACE", 0.5)
+
+    def test_output_and_exit_code(self):
+        returncode, stdout, stderr, log = report_writer.stream_process(
+            [sys.executable, "-c", "import sys; print('out'); print('err', file=sys.stderr); sys.exit(3)"], "ok")
+        assert (returncode, stdout, stderr) == (3, "out\n", "err\n")
+        assert "[stdout] out" in log.read_text()
+
+    def test_timeout_kills_grandchildren(self):
+        start = time.monotonic()
+        returncode, stdout, _, _ = report_writer.stream_process(
+            [sys.executable, "-c", SPAWN_LINGERING + "time.sleep(60)"], "hung", timeout=1)
+        assert returncode is None
+        assert stdout == "started\n"
+        assert time.monotonic() - start < 10
+
+    def test_exited_child_with_lingering_grandchild(self):
+        start = time.monotonic()
+        returncode, stdout, _, _ = report_writer.stream_process(
+            [sys.executable, "-c", SPAWN_LINGERING], "lingering", timeout=30)
+        assert (returncode, stdout) == (0, "started\n")
+        assert time.monotonic() - start < 10
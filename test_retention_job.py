@@ -0,0 +1,126 @@
+"""
+Retention job against a real PostgreSQL: dry run on a fresh database, conversion, expiry, re-runs
+
+Needs TEST_DATABASE_URL pointing at a scratch database; its tables are
+dropped and recreated from the schema.
+"""
+import os
+import pytest
+
+pytestmark = pytest.mark.skipif(not os.environ.get("TEST_DATABASE_URL"),
+                                reason="needs TEST_DATABASE_URL (a scratch PostgreSQL)")
+
+BOOKKEEPING = ["retention_checkpoints", "realtime_event_daily", "alert_daily",
+               "realtime_events_legacy", "alerts_legacy"]
+
+def _scalar(conn, sql, params=None):
+    with conn.cursor() as cur:
+        cur.execute(sql, params)
+        value = cur.fetchone()[0]
+    conn.commit()
+    return value
+
+class TestRetentionJob:
+    """run() on both tables with rows spread over the last ten months"""
+
+    @pytest.fixture
+    def conn(self):
+        import psycopg2
+        from index_advisor import reset_database
+        conn = psycopg2.connect(os.environ["TEST_DATABASE_URL"])
+        conn.set_client_encoding("UTF8")
+        with conn.cursor() as cur:
+            cur.execute("DROP TABLE IF EXISTS %s CASCADE" % ", ".join(BOOKKEEPING))
+            cur.execute("DROP PUBLICATION IF EXISTS retention_test")
+        conn.commit()
+        reset_database(conn)
+        with conn.cursor() as cur:
+            cur.execute("TRUNCATE realtime_events, alerts")
+            # One row a day for 300 days, stamped at local noon so no day straddles a month boundary
+            cur.execute(
+                "INSERT INTO realtime_events (id, entity, action, message, timestamp) "
+                "SELECT 'ev-' || d, 'sugar_record', 'create', 'm', "
+                "(current_date - d + time '12:00') AT TIME ZONE 'Asia/Manila' FROM generate_series(0, 299) d")
+            cur.execute(
+                "INSERT INTO alerts (id, title, message, severity, read, timestamp) "
+                "SELECT 'al-' || d, 't', 'm', 'warning', d % 2 = 0, "
+                "(current_date - d + time '12:00') AT TIME ZONE 'Asia/Manila' FROM generate_series(0, 299) d")
+            cur.execute("CREATE PUBLICATION retention_test FOR TABLE alerts")
+        conn.commit()
+        yield conn
+        conn.rollback()
+        with conn.cursor() as cur:
+            cur.execute("DROP PUBLICATION IF EXISTS retention_test")
+        conn.commit()
+        conn.close()
+
+    def test_dry_run_on_fresh_database_changes_nothing(self, conn):
+        from retention_job import RETENTION, run
+        summary = run(conn, sorted(RETENTION), 90, 3, dry_run=True)
+        for table in RETENTION:
+            assert summary[table]["converted"] == 300
+            assert summary[table]["expired"]
+            assert summary[table]["rows_expired"] > 0
+            assert _scalar(conn, "SELECT relkind FROM pg_class WHERE relname = %s", (table,)) == "r"
+            assert _scalar(conn, f"SELECT count(*) FROM {table}") == 300
+        for name in BOOKKEEPING:
+            assert _scalar(conn, "SELECT to_regclass(%s)", (name,)) is None
+
+    def test_run_converts_expires_and_is_idempotent(self, conn):
+        from retention_job import RETENTION, run
+        summary = run(conn, sorted(RETENTION), 90, 3)
+        expired = summary["realtime_events"]["rows_expired"]
+        assert summary["realtime_events"]["converted"] == 300
+        assert _scalar(conn, "SELECT relkind FROM pg_class WHERE relname = 'realtime_events'") == "p"
+        assert _scalar(conn, "SELECT count(*) FROM realtime_events_legacy") == 300
+
+        # Every row is either still there or counted in the daily summary, and all kept rows are recent
+        assert _scalar(conn, "SELECT count(*) FROM realtime_events") + expired == 300
+        assert _scalar(conn, "SELECT sum(events) FROM realtime_event_daily") == expired
+        assert _scalar(conn, "SELECT sum(alerts) FROM alert_daily") == summary["alerts"]["rows_expired"]
+        assert _scalar(conn, "SELECT sum(unread) FROM alert_daily") == _scalar(
+            conn, "SELECT count(*) FROM alerts_legacy l WHERE NOT l.read "
+                  "AND NOT EXISTS (SELECT 1 FROM alerts a WHERE a.id = l.id)")
+        assert _scalar(conn, "SELECT min(timestamp) >= now() - interval '4 months' FROM realtime_events")
+
+        # RLS, policies and publication membership followed the table
+        assert _scalar(conn, "SELECT relrowsecurity FROM pg_class WHERE relname = 'alerts'")
+        assert _scalar(conn, "SELECT count(*) FROM pg_policies WHERE tablename = 'alerts'") >= 1
+        assert _scalar(conn, "SELECT count(*) FROM pg_publication_tables "
+                             "WHERE pubname = 'retention_test' AND tablename = 'alerts'") == 1
+        assert _scalar(conn, "SELECT has_table_privilege('anon', 'alerts', 'SELECT')")
+
+        again = run(conn, sorted(RETENTION), 90, 3)
+        assert again["realtime_events"]["converted"] is None
+        assert again["realtime_events"]["expired"] == []
+        assert _scalar(conn, "SELECT sum(events) FROM realtime_event_daily") == expired
+
+        # A late row for an expired month lands in the default partition and is rolled up next run
+        with conn.cursor() as cur:
+            cur.execute("INSERT INTO realtime_events (id, entity, action, message, timestamp) "
+                        "VALUES ('late', 'sugar_record', 'create', 'm', now() - interval '200 days')")
+        conn.commit()
+        run(conn, ["realtime_events"], 90, 3)
+        assert _scalar(conn, "SELECT sum(events) FROM realtime_event_daily") == expired + 1
+        assert _scalar(conn, "SELECT count(*) FROM realtime_events WHERE id = 'late'") == 0
+
+    def test_upserts_keyed_on_id_and_timestamp(self, conn):
+        import psycopg2
+        from retention_job import run
+        run(conn, ["alerts"], 90, 3)
+        upsert = ("INSERT INTO alerts (id, title, message, severity, read, timestamp) "
+                  "SELECT id, 'updated', message, severity, true, timestamp FROM alerts WHERE id = 'al-0' "
+                  "ON CONFLICT (%s) DO UPDATE SET title = EXCLUDED.title, read = EXCLUDED.read")
+
+        # What the app's saveAlerts sends: the partitioned key still identifies the row
+        with conn.cursor() as cur:
+            cur.execute(upsert % "id, timestamp")
+        conn.commit()
+        assert _scalar(conn, "SELECT count(*) FROM alerts WHERE id = 'al-0'") == 1
+        assert _scalar(conn, "SELECT title FROM alerts WHERE id = 'al-0'") == "updated"
+
+        # id alone is no longer a unique key on a table partitioned by timestamp
+        with pytest.raises(psycopg2.errors.InvalidColumnReference):
+            with conn.cursor() as cur:
+                cur.execute(upsert % "id")
+        conn.rollback()
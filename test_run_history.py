@@ -0,0 +1,70 @@
+"""
+Run history: the Mann-Whitney U test and the regression gate's baseline
+"""
+import sqlite3
+import pytest
+from run_history import RunHistory, check_regressions, mann_whitney_u
+
+BASE = [100, 102, 98, 101, 99, 103, 97]
+SLOW = [130, 128, 135, 131, 129, 133, 127]
+
+class TestMannWhitneyU:
+    """Values checked against a hand-ranked example (and scipy's asymptotic, continuity-corrected test)"""
+
+    def test_known_values_with_ties(self):
+        u, p = mann_whitney_u([12, 14, 15, 18, 20], [10, 11, 11, 13, 9, 12])
+        assert u == 28.5
+        assert p == pytest.approx(0.0085552, abs=1e-6)
+
+    def test_direction_is_one_sided(self):
+        u, p = mann_whitney_u([1, 2, 3, 4, 5], [6, 7, 8, 9, 10])
+        assert u == 0
+        assert p > 0.99
+
+    def test_all_ties(self):
+        assert mann_whitney_u([5, 5, 5], [5, 5, 5]) == (4.5, 1.0)
+
+class TestCheckRegressions:
+    """A run that fails the gate is left out of later baselines"""
+
+    @pytest.fixture
+    def history(self, tmp_path):
+        history = RunHistory(tmp_path / "history.sqlite")
+        yield history
+        history.close()
+
+    def _run(self, history, values):
+        run_id = history.start_run("benchmark")
+        history.add_samples(run_id, "nav.Inventory", "ms", values)
+        return run_id, check_regressions(history, run_id, "benchmark")
+
+    def test_regressed_run_does_not_become_baseline(self, history):
+        for _ in range(3):
+            assert self._run(history, BASE)[1] == []
+        slow_run, regressions = self._run(history, SLOW)
+        assert [r["name"] for r in regressions] == ["nav.Inventory"]
+        assert regressions[0]["p_value"] < 0.05
+
+        # Still slow: compared with the good runs only, so it is flagged again
+        _, regressions = self._run(history, SLOW)
+        assert regressions and regressions[0]["baseline_median"] == 100
+        assert history.conn.execute("SELECT gate FROM runs WHERE id = ?", (slow_run,)).fetchone() == ("failed",)
+
+    def test_noise_passes(self, history):
+        self._run(history, BASE)
+        assert self._run(history, [v + 1 for v in BASE])[1] == []
+
+    def test_old_history_gains_the_gate_column(self, tmp_path):
+        path = tmp_path / "old.sqlite"
+        conn = sqlite3.connect(path)
+        conn.execute("CREATE TABLE runs (id INTEGER PRIMARY KEY AUTOINCREMENT, kind TEXT NOT NULL, "
+                     "started TEXT NOT NULL, git_rev TEXT, host TEXT)")
+        conn.execute("INSERT INTO runs (kind, started) VALUES ('benchmark', '2024-01-01')")
+        conn.commit()
+        conn.close()
+        history = RunHistory(path)
+        try:
+            history.set_gate(1, True)
+            assert history.conn.execute("SELECT gate FROM runs").fetchone() == ("passed",)
+        finally:
+            history.close()
@@ -0,0 +1,74 @@
+"""
+Screenshot pipeline: which frames share a stored picture, and shutdown with a dead writer
+"""
+import base64
+import io
+import json
+import threading
+import numpy as np
+from PIL import Image
+from screenshot_pipeline import ScreenshotPipeline
+
+class FakeDriver:
+    """Answers Page.captureScreenshot with whatever frame is set"""
+
+    def __init__(self):
+        self.png = None
+
+    def show(self, brightness, dot=None, compress_level=6):
+        pixels = np.tile(np.linspace(0, brightness, 64, dtype=np.uint8), (48, 1))
+        if dot:
+            pixels[dot[1], dot[0]] = 255 - pixels[dot[1], dot[0]]
+        buffer = io.BytesIO()
+        Image.fromarray(pixels).save(buffer, format="PNG", compress_level=compress_level)
+        self.png = buffer.getvalue()
+
+    def execute_cdp_cmd(self, command, params):
+        return {"data": base64.b64encode(self.png).decode()}
+
+def _refs(root):
+    return [json.loads(line) for line in (root / "refs.jsonl").read_text().splitlines()]
+
+class TestScreenshotPipeline:
+    """Two runs over one store"""
+
+    def test_only_identical_pictures_are_shared(self, tmp_path):
+        driver = FakeDriver()
+        first = ScreenshotPipeline(tmp_path, retention="all")
+        first.run_id = "run1"
+        driver.show(200)
+        first.capture(driver, "home", "t1")
+        assert first.close()["stored"] == 1
+
+        second = ScreenshotPipeline(tmp_path, retention="all")
+        second.run_id = "run2"
+        # One pixel off: same dHash, different picture
+        driver.show(200, dot=(10, 10))
+        second.capture(driver, "home", "t1")
+        driver.show(200, dot=(20, 20))
+        second.capture(driver, "home", "t2")
+        # Same pixels, different bytes
+        driver.show(200, compress_level=1)
+        second.capture(driver, "home", "t3")
+        driver.show(200)
+        second.capture(driver, "home", "t4")
+        stats = second.close()
+
+        refs = [r for r in _refs(tmp_path) if r["run"] == "run2"]
+        first_object = _refs(tmp_path)[0]["object"]
+        assert len({r["dhash"] for r in refs}) == 1
+        assert len({first_object, refs[0]["object"], refs[1]["object"]}) == 3
+        assert not refs[0]["duplicate"] and not refs[1]["duplicate"]
+        assert refs[2]["object"] == refs[3]["object"] == first_object
+        assert refs[2]["duplicate"] and refs[3]["duplicate"]
+        assert (stats["stored"], stats["duplicates"]) == (2, 2)
+
+    def test_finish_and_close_return_when_the_writer_died(self, tmp_path):
+        pipeline = ScreenshotPipeline(tmp_path, queue_size=1)
+        pipeline.thread = threading.Thread(target=lambda: None)
+        pipeline.thread.start()
+        pipeline.thread.join()
+        pipeline.queue.put(("frame",))
+        pipeline.finish("t1", True)
+        pipeline.close()
+        assert pipeline.thread is None
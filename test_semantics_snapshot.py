@@ -0,0 +1,54 @@
+"""
+Semantics snapshot labels on a hand-written flt-semantics tree in headless Chrome
+"""
+import urllib.parse
+import pytest
+from chromedriver_cache import detect_chrome_version
+
+pytestmark = pytest.mark.skipif(detect_chrome_version() is None, reason="needs Chrome")
+
+# A navigation rail: an unlabeled container whose children are the items
+PAGE = """
+<flt-semantics id="rail" style="position:absolute;left:0;top:0;width:200px;height:300px">
+  <span>Menu</span>
+  <flt-semantics-container>
+    <flt-semantics role="button" style="position:absolute;left:0;top:100px;width:200px;height:40px">
+      <span>Inventory</span>
+    </flt-semantics>
+    <flt-semantics role="button" aria-label="Suppliers"
+                   style="position:absolute;left:0;top:150px;width:200px;height:40px"></flt-semantics>
+  </flt-semantics-container>
+</flt-semantics>
+"""
+
+class TestSemanticsSnapshot:
+    """Labels are the node's own text, never its descendants'"""
+
+    @pytest.fixture(scope="class")
+    def driver(self):
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options
+        from selenium.webdriver.chrome.service import Service
+        from test_config import TestConfig
+        options = Options()
+        for argument in ("--headless", "--no-sandbox", "--disable-dev-shm-usage"):
+            options.add_argument(argument)
+        driver = webdriver.Chrome(service=Service(TestConfig.get_chromedriver_path()), options=options)
+        yield driver
+        driver.quit()
+
+    def test_nested_container(self, driver):
+        from semantics_snapshot import SemanticsSnapshot
+        driver.get("data:text/html," + urllib.parse.quote(PAGE))
+        snapshot = SemanticsSnapshot(driver).capture()
+
+        assert sorted(node.label for node in snapshot.nodes.values()) == ["Inventory", "Menu", "Suppliers"]
+        item, = snapshot.find_containing("Inventory")
+        assert (item.role, item.rect[1]) == ("button", 100)
+
+        # A child's text change re-describes the child alone
+        driver.execute_script("document.querySelector('[role=button] span').textContent = 'Stock';")
+        snapshot.refresh()
+        assert snapshot.find_containing("Inventory") == []
+        assert [n.role for n in snapshot.find(label="Stock")] == ["button"]
+        assert [n.role for n in snapshot.find(label="Menu")] == [""]
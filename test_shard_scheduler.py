@@ -0,0 +1,49 @@
+"""
+Shard scheduler: argument parsing and a split every runner agrees on
+"""
+import random
+import pytest
+from shard_scheduler import DEFAULT_DURATION, assign_shards, estimate_durations, load_durations, parse_shard, \
+    save_durations
+
+class TestShardScheduler:
+    """parse_shard / estimate_durations / assign_shards"""
+
+    def test_parse_shard(self):
+        assert parse_shard("1/1") == (0, 1)
+        assert parse_shard("2/4") == (1, 4)
+        for bad in ("0/4", "5/4", "2", "a/b", "1/2/3"):
+            with pytest.raises(ValueError):
+                parse_shard(bad)
+
+    def test_every_test_runs_exactly_once(self):
+        rng = random.Random(1)
+        durations = {f"test_core_features.py::T::test_{i:02}": rng.uniform(1, 60) for i in range(37)}
+        for count in (1, 2, 3, 5, 40):
+            shards = assign_shards(durations, count)
+            assigned = [t for _, tests in shards for t in tests]
+            assert sorted(assigned) == sorted(durations)
+            assert len(shards) == count
+
+    def test_longest_first_balances(self):
+        shards = assign_shards({"a": 8, "b": 7, "c": 6, "d": 5, "e": 4}, 2)
+        assert shards == [(17.0, ["a", "d", "e"]), (13.0, ["b", "c"])]
+
+    def test_split_does_not_depend_on_input_order(self):
+        durations = {f"t{i}": float(i % 4) for i in range(20)}  # plenty of ties
+        reversed_input = dict(reversed(list(durations.items())))
+        assert assign_shards(durations, 3) == assign_shards(reversed_input, 3)
+
+    def test_no_history_splits_by_test_id(self):
+        durations = estimate_durations(["t3", "t1", "t2", "t4"], {})
+        assert set(durations.values()) == {DEFAULT_DURATION}
+        assert [tests for _, tests in assign_shards(durations, 2)] == [["t1", "t3"], ["t2", "t4"]]
+
+    def test_unknown_tests_get_median_of_known(self):
+        assert estimate_durations(["a", "b", "c", "new"], {"a": 1, "b": 5, "c": 9})["new"] == 5
+
+    def test_durations_file_round_trip(self, tmp_path):
+        path = save_durations({"b": 2.345, "a": 1}, tmp_path / "durations.json")
+        assert load_durations(path) == {"a": 1.0, "b": 2.35}
+        assert path.read_text().index('"a"') < path.read_text().index('"b"')
+        assert load_durations(tmp_path / "missing.json") == {}
@@ -0,0 +1,57 @@
+"""
+Supabase stand-in: malformed writes and filters get PostgREST's 400 errors
+"""
+import json
+import urllib.error
+import urllib.request
+import pytest
+from supabase_stub import SupabaseStub
+from test_realtime_stub import _free_port
+
+ROW = {"id": "sr-1", "date": "2024-05-01", "variety": "Phil 2018", "soil_test": "ok",
+       "fertilizer": "urea", "height_cm": 120}
+
+def _request(port, method, path, body=None):
+    """(status, decoded JSON body) for one REST call, error responses included"""
+    data = body if isinstance(body, bytes) or body is None else json.dumps(body).encode()
+    request = urllib.request.Request(f"http://127.0.0.1:{port}/rest/v1/{path}", method=method, data=data,
+                                     headers={"Content-Type": "application/json", "Prefer": "return=representation"})
+    try:
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return response.status, json.loads(response.read() or b"null")
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+class TestPostgrestErrors:
+    """Bad requests are answered, never dropped with the connection"""
+
+    @pytest.fixture
+    def stub(self):
+        stub = SupabaseStub(port=_free_port()).start()
+        yield stub
+        stub.stop()
+
+    def test_insert_with_unknown_column(self, stub):
+        status, body = _request(stub.port, "POST", "sugar_records", {**ROW, "colour": "green"})
+        assert (status, body["code"]) == (400, "PGRST204")
+        assert "'colour'" in body["message"]
+        assert _request(stub.port, "GET", "sugar_records") == (200, [])
+
+    def test_update_with_unknown_column(self, stub):
+        _request(stub.port, "POST", "sugar_records", ROW)
+        status, body = _request(stub.port, "PATCH", "sugar_records?id=eq.nothing", {"colour": "green"})
+        assert (status, body["code"]) == (400, "PGRST204")
+
+    def test_invalid_json_body(self, stub):
+        status, body = _request(stub.port, "POST", "sugar_records", b"{not json")
+        assert (status, body["code"]) == (400, "PGRST102")
+        status, body = _request(stub.port, "POST", "sugar_records", [1, 2])
+        assert (status, body["code"]) == (400, "PGRST102")
+
+    def test_unparseable_filter_value(self, stub):
+        status, body = _request(stub.port, "GET", "sugar_records?height_cm=eq.tall")
+        assert (status, body["code"]) == (400, "22P02")
+        status, body = _request(stub.port, "GET", "sugar_records?limit=ten")
+        assert (status, body["code"]) == (400, "22P02")
+        # The stub keeps serving after a bad request
+        assert _request(stub.port, "GET", "sugar_records") == (200, [])
@@ -0,0 +1,59 @@
+"""
+Visual regression: label masks, missing baselines and the masked share of a diff
+"""
+import numpy as np
+from PIL import Image
+from semantics_snapshot import ENABLE_SEMANTICS_SCRIPT, SNAPSHOT_SCRIPT
+from visual_regression import compare_file, label_rects
+
+class SemanticsDriver:
+    """Answers the scripts label_rects runs with a fixed semantics tree in a 1000x800 viewport"""
+
+    def __init__(self, nodes):
+        self.nodes = nodes
+
+    def execute_script(self, script, *args):
+        if script == ENABLE_SEMANTICS_SCRIPT:
+            return False
+        if script == SNAPSHOT_SCRIPT:
+            return {"changed": [{"handle": str(i), "label": label, "role": "", "rect": rect}
+                                for i, (label, rect) in enumerate(self.nodes)], "removed": []}
+        return [1000, 800]
+
+class TestLabelRects:
+    """Which semantics nodes a label pattern masks"""
+
+    def test_masks_matching_nodes_but_not_whole_containers(self, capsys):
+        driver = SemanticsDriver([
+            ("Weather", [0, 0, 1000, 800]),
+            ("31.5 °C", [10, 10, 80, 20]),
+            ("Humidity 80%", [10, 40, 80, 20]),
+            ("Forecast: 30 °C all week", [0, 100, 1000, 500]),
+        ])
+        assert label_rects(driver, [r"\d+(\.\d+)?\s*°"]) == [[10, 10, 80, 20]]
+        assert "covers 62% of the viewport" in capsys.readouterr().out
+        assert label_rects(driver, []) == []
+
+class TestCompareFile:
+    """compare_file against a baseline directory"""
+
+    def _job(self, tmp_path, image, rects=(), update=False):
+        path = tmp_path / "shot.png"
+        Image.fromarray(image).save(path)
+        return ("Home", path, tmp_path / "baselines", tmp_path / "report", list(rects), 1.0, {"update": update})
+
+    def test_missing_baseline_is_reported_not_recorded(self, tmp_path):
+        image = np.zeros((40, 40, 3), dtype=np.uint8)
+        result = compare_file(self._job(tmp_path, image))
+        assert result["status"] == "missing"
+        assert not (tmp_path / "baselines" / "40x40" / "Home.png").exists()
+        assert compare_file(self._job(tmp_path, image, update=True))["status"] == "updated"
+        assert compare_file(self._job(tmp_path, image))["status"] == "passed"
+
+    def test_masked_ratio(self, tmp_path):
+        image = np.zeros((40, 40, 3), dtype=np.uint8)
+        compare_file(self._job(tmp_path, image, update=True))
+        changed = image.copy()
+        changed[:20] = 255
+        result = compare_file(self._job(tmp_path, changed, rects=[(0, 0, 40, 20)]))
+        assert (result["status"], result["masked_ratio"]) == ("passed", 0.5)
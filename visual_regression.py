@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Visual regression for Flutter's canvas: tiled NumPy screenshot diffs against stored baselines
+
+Pixels are compared with a perceptual (YIQ-weighted) colour distance, so
+anti-aliasing and colour-space noise below the threshold are ignored. The
+image is then cut into tiles, and a tile fails only if more than
+tile_tolerance of its non-masked pixels differ. Masks cover dynamic regions
+(weather, clocks, timestamps), given as CSS-pixel rects or as semantics
+labels that are resolved to rects on the live page.
+
+A single diff is a handful of vectorised array operations whose cost
+follows the changed area (about a millisecond for an unchanged 1080p frame). Batches of screenshots are spread across a process pool, and each
+worker reads its own files, so nothing large is pickled.
+
+Baselines live in visual_baselines/<width>x<height>/<name>.png, and
+visual_baselines/masks.json holds the per-screen masks ("*" applies
+everywhere). Heatmaps and a summary are written to reports/visual/.
+"""
+import argparse
+import io
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import numpy as np
+from PIL import Image
+
+BASELINE_DIR = Path("visual_baselines")
+REPORT_DIR = Path("reports/visual")
+MASKS_FILE = "masks.json"
+TILE = 64
+# Per-pixel perceptual threshold (0..1; 0.1 matches pixelmatch's default)
+THRESHOLD = 0.1
+# Share of a tile's compared pixels that may differ before the tile fails
+TILE_TOLERANCE = 0.005
+# A label mask bigger than this share of the viewport is a container, not a
+# dynamic value, and is dropped; a total mask this big is reported
+MAX_MASK_RATIO = 0.25
+
+# RGB -> YIQ columns and the weights of pixelmatch's colour delta, normalised to 0..1
+YIQ = np.array([[0.29889531, 0.59597799, 0.21147017],
+                [0.58662247, -0.27417610, -0.52261711],
+                [0.11448223, -0.32180189, 0.31114694]], dtype=np.float32)
+YIQ_WEIGHTS = np.array([0.5053, 0.299, 0.1957], dtype=np.float32) / np.float32(35215.0)
+LUMA = np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+def load_image(source):
+    """RGB uint8 array from a path or PNG bytes"""
+    image = Image.open(io.BytesIO(source) if isinstance(source, bytes) else source)
+    return np.asarray(image.convert("RGB"))
+
+def viewport_key(image):
+    return f"{image.shape[1]}x{image.shape[0]}"
+
+def mask_from_rects(shape, rects, scale=1.0):
+    """Boolean ignore mask for CSS-pixel (x, y, width, height) rects at a device pixel ratio"""
+    mask = np.zeros(shape[:2], dtype=bool)
+    for x, y, width, height in rects:
+        left, top = max(int(x * scale), 0), max(int(y * scale), 0)
+        mask[top:int(np.ceil((y + height) * scale)), left:int(np.ceil((x + width) * scale))] = True
+    return mask
+
+def color_delta(actual, baseline):
+    """Perceptual distance (0..1) between two (N, 3) arrays of pixels"""
+    diff = actual.astype(np.float32) - baseline
+    yiq = diff @ YIQ
+    return (yiq * yiq) @ YIQ_WEIGHTS
+
+def _tile_counts(ys, xs, grid, tile):
+    """Pixels per tile for the given coordinates"""
+    rows, cols = grid
+    return np.bincount((ys // tile) * cols + xs // tile, minlength=rows * cols).reshape(grid)
+
+def _tile_areas(shape, tile, mask=None):
+    """Compared (non-masked) pixels per tile; edge tiles are smaller"""
+    height, width = shape[:2]
+    grid = (-(-height // tile), -(-width // tile))
+    heights = np.minimum(tile, height - np.arange(grid[0]) * tile)
+    widths = np.minimum(tile, width - np.arange(grid[1]) * tile)
+    areas = np.outer(heights, widths)
+    if mask is not None:
+        areas = areas - _tile_counts(*np.nonzero(mask), grid, tile)
+    return grid, areas
+
+def _changed_rows(actual, baseline):
+    """Rows whose bytes differ, compared 8 bytes at a time where the row length allows"""
+    a = np.ascontiguousarray(actual).reshape(actual.shape[0], -1)
+    b = np.ascontiguousarray(baseline).reshape(baseline.shape[0], -1)
+    if a.shape[1] % 8 == 0:
+        a, b = a.view(np.uint64), b.view(np.uint64)
+    return np.flatnonzero((a != b).any(axis=1))
+
+def diff_images(actual, baseline, mask=None, tile=TILE, threshold=THRESHOLD, tile_tolerance=TILE_TOLERANCE):
+    """Compare two RGB arrays; returns (summary dict, per-pixel delta map or None)
+
+    Only rows whose bytes differ are unpacked into pixels, only differing
+    pixels get a colour delta, and tiles are counted from their coordinates,
+    so cost tracks the size of the change rather than the screenshot.
+    """
+    start = time.perf_counter()
+    if actual.shape != baseline.shape:
+        return {"status": "size_mismatch", "actual_size": viewport_key(actual),
+                "baseline_size": viewport_key(baseline)}, None
+
+    rows = _changed_rows(actual, baseline)
+    ys = xs = values = np.empty(0, dtype=np.intp)
+    if len(rows):
+        unequal = actual[rows] != baseline[rows]
+        changed = unequal[..., 0] | unequal[..., 1] | unequal[..., 2]
+        if mask is not None:
+            changed &= ~mask[rows]
+        local_ys, xs = np.nonzero(changed)
+        ys = rows[local_ys]
+        values = color_delta(actual[ys, xs], baseline[ys, xs])
+
+    differs = values > threshold * threshold
+    grid, areas = _tile_areas(actual.shape, tile, mask)
+    ratios = _tile_counts(ys[differs], xs[differs], grid, tile) / np.maximum(areas, 1)
+    failed = np.argwhere(ratios > tile_tolerance)
+    diff_pixels = int(differs.sum())
+    summary = {
+        "status": "failed" if len(failed) else "passed",
+        "diff_pixels": diff_pixels,
+        "diff_ratio": round(diff_pixels / max(int(areas.sum()), 1), 6),
+        "max_delta": round(float(np.sqrt(values.max())), 4) if len(values) else 0.0,
+        "failed_tiles": [[int(c) * tile, int(r) * tile, round(float(ratios[r, c]), 4)] for r, c in failed],
+        "tile": tile,
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 2),
+    }
+    delta = None
+    if len(failed):
+        delta = np.zeros(actual.shape[:2], dtype=np.float32)
+        delta[ys, xs] = values
+    return summary, delta
+
+def write_heatmap(path, baseline, delta, failed_tiles, tile, mask=None, threshold=THRESHOLD):
+    """Dimmed baseline with differences in red, masked areas in blue and failing tiles outlined"""
+    gray = (baseline @ LUMA) * 0.3 + 170
+    out = np.repeat(gray[..., None], 3, axis=2)
+    if mask is not None:
+        out[mask] = out[mask] * 0.6 + np.array([0, 0, 255]) * 0.4
+    strength = np.clip(np.sqrt(delta) / max(threshold, 1e-6) / 4, 0, 1)[..., None]
+    out = out * (1 - strength) + np.array([255, 0, 0]) * strength
+    for x, y, _ in failed_tiles:
+        box = out[y:y + tile, x:x + tile]
+        box[:2], box[-2:], box[:, :2], box[:, -2:] = (255, 200, 0), (255, 200, 0), (255, 200, 0), (255, 200, 0)
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    Image.fromarray(out.astype(np.uint8)).save(path)
+    return str(path)
+
+def load_masks(baseline_dir=BASELINE_DIR):
+    """{screen: {"rects": [[x, y, w, h], ...], "labels": [regex, ...]}} from masks.json"""
+    path = Path(baseline_dir) / MASKS_FILE
+    return json.loads(path.read_text()) if path.exists() else {}
+
+def masks_for(masks, name):
+    rects, labels = [], []
+    for key in ("*", name):
+        rects += masks.get(key, {}).get("rects", [])
+        labels += masks.get(key, {}).get("labels", [])
+    return rects, labels
+
+def compare_file(job):
+    """One comparison; top-level so process pool workers can run it"""
+    name, actual_path, baseline_dir, report_dir, rects, scale, settings = job
+    actual = load_image(actual_path)
+    baseline_path = Path(baseline_dir) / viewport_key(actual) / f"{name}.png"
+    result = {"name": name, "viewport": viewport_key(actual), "actual": str(actual_path),
+              "baseline": str(baseline_path)}
+    if settings.get("update"):
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        Image.fromarray(actual).save(baseline_path)
+        result["status"] = "updated"
+        return result
+    if not baseline_path.exists():
+        # Recording it implicitly would make a first run (or a typo in the name) always pass
+        result["status"] = "missing"
+        return result
+
+    baseline = load_image(baseline_path)
+    mask = mask_from_rects(actual.shape, rects, scale) if rects else None
+    summary, delta = diff_images(actual, baseline, mask, settings.get("tile", TILE),
+                                 settings.get("threshold", THRESHOLD), settings.get("tile_tolerance", TILE_TOLERANCE))
+    result.update(summary)
+    result["masked_ratio"] = round(float(mask.mean()), 4) if mask is not None else 0.0
+    if summary["status"] == "failed":
+        result["heatmap"] = write_heatmap(Path(report_dir) / f"{name}@{result['viewport']}_heatmap.png",
+                                          baseline, delta, summary["failed_tiles"], summary["tile"], mask,
+                                          settings.get("threshold", THRESHOLD))
+    return result
+
+def compare_files(jobs, workers=None):
+    """Run compare_file over many jobs, in a process pool when there is more than one"""
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(jobs) <= 1:
+        return [compare_file(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+        return list(pool.map(compare_file, jobs))
+
+def label_rects(driver, patterns, max_ratio=MAX_MASK_RATIO):
+    """CSS-pixel rects of semantics nodes whose own label matches any pattern
+
+    Rects covering more than max_ratio of the viewport are skipped with a
+    warning, so a loose pattern can't mask most of the screen.
+    """
+    if not patterns:
+        return []
+    from flutter_idle import wait_for_flutter_idle
+    from semantics_snapshot import SemanticsSnapshot
+    # The flt-semantics nodes only exist once semantics is on; it adds no pixels to the canvas
+    if SemanticsSnapshot.enable_semantics(driver):
+        wait_for_flutter_idle(driver)
+    snapshot = SemanticsSnapshot(driver).capture()
+    compiled = [re.compile(p, re.IGNORECASE) for p in patterns]
+    width, height = driver.execute_script("return [window.innerWidth, window.innerHeight];")
+    rects = []
+    for node in snapshot.nodes.values():
+        if not node.label or not any(p.search(node.label) for p in compiled):
+            continue
+        share = node.rect[2] * node.rect[3] / max(width * height, 1)
+        if share > max_ratio:
+            print(f"⚠️ Not masking '{node.label[:40]}': it covers {share:.0%} of the viewport")
+            continue
+        rects.append(list(node.rect))
+    return rects
+
+class VisualCheck:
+    """Screenshot-vs-baseline checks for a live driver"""
+
+    def __init__(self, baseline_dir=BASELINE_DIR, report_dir=REPORT_DIR, update=False, ignore_labels=()):
+        self.baseline_dir = Path(baseline_dir)
+        self.report_dir = Path(report_dir)
+        self.update = update
+        self.ignore_labels = list(ignore_labels)
+        self.masks = load_masks(self.baseline_dir)
+
+    def check(self, driver, name, ignore_labels=()):
+        """Capture the page and compare it; the screenshot is kept next to the heatmap"""
+        rects, labels = masks_for(self.masks, name)
+        rects = rects + label_rects(driver, self.ignore_labels + labels + list(ignore_labels))
+        actual_path = self.report_dir / "actual" / f"{name}.png"
+        actual_path.parent.mkdir(parents=True, exist_ok=True)
+        actual_path.write_bytes(driver.get_screenshot_as_png())
+        scale = driver.execute_script("return window.devicePixelRatio;") or 1.0
+        return compare_file((name, actual_path, self.baseline_dir, self.report_dir, rects, scale,
+                             {"update": self.update}))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare screenshots against visual baselines")
+    parser.add_argument("screenshots", nargs="+", help="PNG files; the file stem is the baseline name")
+    parser.add_argument("--baselines", default=str(BASELINE_DIR))
+    parser.add_argument("--out", default=str(REPORT_DIR))
+    parser.add_argument("--update", action="store_true", help="accept the screenshots as the new baselines")
+    parser.add_argument("--scale", type=float, default=1.0, help="device pixel ratio the screenshots were taken at")
+    parser.add_argument("--tile", type=int, default=TILE)
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    parser.add_argument("--tile-tolerance", type=float, default=TILE_TOLERANCE)
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: one per CPU)")
+    args = parser.parse_args(argv)
+
+    masks = load_masks(args.baselines)
+    settings = {"update": args.update, "tile": args.tile, "threshold": args.threshold,
+                "tile_tolerance": args.tile_tolerance}
+    jobs = [(Path(p).stem, p, args.baselines, args.out, masks_for(masks, Path(p).stem)[0], args.scale, settings)
+            for p in args.screenshots]
+    start = time.perf_counter()
+    results = compare_files(jobs, args.workers)
+    elapsed = time.perf_counter() - start
+
+    for r in results:
+        icon = {"passed": "✅", "updated": "🔄"}.get(r["status"], "❌")
+        detail = f"{r['diff_ratio']:.4%} differs, {len(r['failed_tiles'])} tile(s), {r['elapsed_ms']} ms" \
+            if "diff_ratio" in r else r.get("baseline", "")
+        if r["status"] == "missing":
+            detail += " (record it with --update)"
+        print(f"{icon} {r['name']} [{r['viewport']}] {r['status']}: {detail}")
+        if r.get("heatmap"):
+            print(f"   heatmap: {r['heatmap']}")
+    Path(args.out).mkdir(parents=True, exist_ok=True)
+    (Path(args.out) / "summary.json").write_text(json.dumps(results, indent=2))
+    print(f"\n{len(results)} screenshot(s) compared in {elapsed:.2f}s")
+    return all(r["status"] in ("passed", "updated") for r in results)
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
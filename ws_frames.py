@@ -0,0 +1,106 @@
+"""
+Minimal RFC 6455 websocket framing shared by the local stubs and the CDP client
+"""
+import base64
+import hashlib
+import os
+import struct
+
+GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+OP_CONTINUATION = 0x0
+OP_TEXT = 0x1
+OP_BINARY = 0x2
+OP_CLOSE = 0x8
+OP_PING = 0x9
+OP_PONG = 0xA
+
+class WebSocketClosed(Exception):
+    """The peer sent a close frame or the connection dropped mid-frame"""
+
+def accept_key(client_key):
+    """Sec-WebSocket-Accept value for a client's Sec-WebSocket-Key"""
+    return base64.b64encode(hashlib.sha1((client_key + GUID).encode()).digest()).decode()
+
+def new_client_key():
+    return base64.b64encode(os.urandom(16)).decode()
+
+def _apply_mask(payload, mask):
+    # XOR against the repeated 4-byte key in one big-int operation
+    if not payload:
+        return payload
+    repeated = (mask * (len(payload) // 4 + 1))[:len(payload)]
+    return (int.from_bytes(payload, "big") ^ int.from_bytes(repeated, "big")).to_bytes(len(payload), "big")
+
+def encode_frame(payload, opcode=OP_TEXT, mask=False):
+    """One unfragmented frame; clients must mask, servers must not"""
+    if isinstance(payload, str):
+        payload = payload.encode("utf-8")
+    header = bytearray([0x80 | opcode])
+    mask_bit = 0x80 if mask else 0
+    length = len(payload)
+    if length < 126:
+        header.append(mask_bit | length)
+    elif length < 1 << 16:
+        header.append(mask_bit | 126)
+        header += struct.pack("!H", length)
+    else:
+        header.append(mask_bit | 127)
+        header += struct.pack("!Q", length)
+    if mask:
+        key = os.urandom(4)
+        return bytes(header) + key + _apply_mask(payload, key)
+    return bytes(header) + payload
+
+def _parse_header(first_two):
+    fin = bool(first_two[0] & 0x80)
+    opcode = first_two[0] & 0x0F
+    masked = bool(first_two[1] & 0x80)
+    length = first_two[1] & 0x7F
+    return fin, opcode, masked, length
+
+def read_frame(read_exactly):
+    """(opcode, payload) of the next frame; read_exactly(n) must return n bytes or raise"""
+    fin, opcode, masked, length = _parse_header(read_exactly(2))
+    if length == 126:
+        length = struct.unpack("!H", read_exactly(2))[0]
+    elif length == 127:
+        length = struct.unpack("!Q", read_exactly(8))[0]
+    key = read_exactly(4) if masked else None
+    payload = read_exactly(length) if length else b""
+    return fin, opcode, _apply_mask(payload, key) if key else payload
+
+async def read_frame_async(reader):
+    """asyncio version of read_frame over a StreamReader"""
+    fin, opcode, masked, length = _parse_header(await reader.readexactly(2))
+    if length == 126:
+        length = struct.unpack("!H", await reader.readexactly(2))[0]
+    elif length == 127:
+        length = struct.unpack("!Q", await reader.readexactly(8))[0]
+    key = await reader.readexactly(4) if masked else None
+    payload = await reader.readexactly(length) if length else b""
+    return fin, opcode, _apply_mask(payload, key) if key else payload
+
+class MessageAssembler:
+    """Joins fragmented frames into messages and answers control frames"""
+
+    def __init__(self):
+        self.opcode = None
+        self.parts = []
+
+    def feed(self, fin, opcode, payload):
+        """Returns (kind, data): ('message', bytes|str), ('ping', bytes), ('close', bytes) or (None, None)"""
+        if opcode == OP_CLOSE:
+            return "close", payload
+        if opcode == OP_PING:
+            return "ping", payload
+        if opcode == OP_PONG:
+            return None, None
+        if opcode != OP_CONTINUATION:
+            self.opcode, self.parts = opcode, []
+        self.parts.append(payload)
+        if not fin:
+            return None, None
+        data = b"".join(self.parts)
+        self.parts = []
+        return "message", data.decode("utf-8") if self.opcode == OP_TEXT else data